@@ -4,13 +4,15 @@ VetBuddy Passport AI Assistant Backend API Testing Script
 Tests all AI endpoints as specified in review request
 """
 
-import requests
+from tests.harness import ai_bench, client
 import json
 import sys
-import time
 
 BASE_URL = "https://clinic-report-review.preview.emergentagent.com/api"
 
+# Shared by every AI call: rate limits (429) pause the next call instead of fixed sleeps
+AI_BACKOFF = ai_bench.AdaptiveBackoff()
+
 # Test counters
 tests_passed = 0
 tests_failed = 0
@@ -28,11 +30,16 @@ def print_test(name, passed, details=""):
         if details:
             print(f"   {details}")
 
+def post_ai(url, **kwargs):
+    """client.post that waits out LLM rate limits before returning"""
+    response, _, _ = ai_bench.post_with_backoff(url, AI_BACKOFF, **kwargs)
+    return response
+
 def test_get_ai_tools():
     """Test 1: GET /api/ai - Should return list of available tools"""
     print(f"\n📋 Test 1: GET /api/ai - List Available Tools")
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/ai",
             timeout=10
         )
@@ -78,7 +85,7 @@ def test_summarize_lab_report():
     """Test 2: POST /api/ai with summarize_lab_report tool"""
     print(f"\n🔬 Test 2: POST /api/ai - Summarize Lab Report")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "summarize_lab_report",
@@ -127,7 +134,7 @@ def test_extract_dates():
     """Test 3: POST /api/ai with extract_dates tool"""
     print(f"\n📅 Test 3: POST /api/ai - Extract Dates")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "extract_dates",
@@ -172,7 +179,7 @@ def test_generate_pet_sitter_instructions():
     """Test 4: POST /api/ai with generate_pet_sitter_instructions tool"""
     print(f"\n🐕 Test 4: POST /api/ai - Generate Pet Sitter Instructions")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "generate_pet_sitter_instructions",
@@ -225,7 +232,7 @@ def test_generate_travel_checklist():
     """Test 5: POST /api/ai with generate_travel_checklist tool"""
     print(f"\n✈️ Test 5: POST /api/ai - Generate Travel Checklist")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "generate_travel_checklist",
@@ -274,7 +281,7 @@ def test_passport_suggest_missing():
     """Test 6: POST /api/ai with passport_suggest_missing tool"""
     print(f"\n📊 Test 6: POST /api/ai - Passport Suggest Missing")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "passport_suggest_missing",
@@ -331,7 +338,7 @@ def test_non_passport_tool_no_disclaimer():
     # Test summarize_visit (non-passport tool)
     print(f"\n   Testing summarize_visit (should NOT have disclaimer)...")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "summarize_visit",
@@ -363,7 +370,7 @@ def test_non_passport_tool_no_disclaimer():
     # Test draft_message (non-passport tool)
     print(f"\n   Testing draft_message (should NOT have disclaimer)...")
     try:
-        response = requests.post(
+        response = post_ai(
             f"{BASE_URL}/ai",
             json={
                 "tool": "draft_message",
@@ -397,7 +404,7 @@ def test_invalid_tool():
     """Test 9: POST /api/ai with invalid tool"""
     print(f"\n❌ Test 9: POST /api/ai - Invalid Tool (Error Handling)")
     try:
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/ai",
             json={
                 "tool": "invalid_tool",
@@ -428,7 +435,7 @@ def test_missing_input():
     """Test 10: POST /api/ai with missing input"""
     print(f"\n❌ Test 10: POST /api/ai - Missing Input (Error Handling)")
     try:
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/ai",
             json={
                 "tool": "summarize_lab_report"
@@ -466,27 +473,21 @@ def main():
     
     # Test 2: POST /api/ai - summarize_lab_report
     test_summarize_lab_report()
-    time.sleep(1)  # Small delay between AI calls
     
     # Test 3: POST /api/ai - extract_dates
     test_extract_dates()
-    time.sleep(1)
     
     # Test 4: POST /api/ai - generate_pet_sitter_instructions
     test_generate_pet_sitter_instructions()
-    time.sleep(1)
     
     # Test 5: POST /api/ai - generate_travel_checklist
     test_generate_travel_checklist()
-    time.sleep(1)
     
     # Test 6: POST /api/ai - passport_suggest_missing
     test_passport_suggest_missing()
-    time.sleep(1)
     
     # Test 7-8: Verify non-passport tools do NOT have disclaimer
     test_non_passport_tool_no_disclaimer()
-    time.sleep(1)
     
     # Test 9: Invalid tool error handling
     test_invalid_tool()
@@ -1,7 +1,7 @@
 // modules/constants.js - Shared constants for VetBuddy API
-import Stripe from 'stripe';
+import { createStripe } from '@/lib/stripe';
 
-export const stripe = new Stripe(process.env.STRIPE_SECRET_KEY || 'missing_stripe_key');
+export const stripe = createStripe(process.env.STRIPE_SECRET_KEY || 'missing_stripe_key');
 
 export const GOOGLE_CLIENT_ID = process.env.GOOGLE_CLIENT_ID;
 export const GOOGLE_CLIENT_SECRET = process.env.GOOGLE_CLIENT_SECRET;
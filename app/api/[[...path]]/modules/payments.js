@@ -3,7 +3,7 @@ import { NextResponse } from 'next/server';
 import { v4 as uuidv4 } from 'uuid';
 import { getCollection } from '@/lib/db';
 import { getUserFromRequest } from '@/lib/auth';
-import Stripe from 'stripe';
+import { createStripe } from '@/lib/stripe';
 import { stripe, SUBSCRIPTION_PLANS, corsHeaders } from './constants';
 
 export async function handlePaymentsGet(path, request) {
@@ -124,7 +124,7 @@ export async function handlePaymentsPost(path, request, body) {
     const appointment = await appointments.findOne({ id: appointmentId });
     if (!appointment || !appointment.price) return NextResponse.json({ error: 'Appuntamento non trovato o senza prezzo' }, { status: 400, headers: corsHeaders });
     try {
-      const clinicStripe = new Stripe(clinic.stripeSecretKey);
+      const clinicStripe = createStripe(clinic.stripeSecretKey);
       const successUrl = `${originUrl}/owner/dashboard?payment=success&session_id={CHECKOUT_SESSION_ID}`;
       const cancelUrl = `${originUrl}/owner/dashboard?payment=cancelled`;
       const session = await clinicStripe.checkout.sessions.create({
@@ -182,7 +182,7 @@ export async function handlePaymentsPost(path, request, body) {
     const clinic = await users.findOne({ id: user.id });
     
     try {
-      const labStripe = new Stripe(lab.stripeSecretKey);
+      const labStripe = createStripe(lab.stripeSecretKey);
       const baseUrl = originUrl || process.env.NEXT_PUBLIC_BASE_URL;
       const successUrl = `${baseUrl}?lab_payment=success&session_id={CHECKOUT_SESSION_ID}&request_id=${labRequestId}`;
       const cancelUrl = `${baseUrl}?lab_payment=cancelled`;
@@ -60,7 +60,11 @@ export async function POST(request) {
     const openaiKey = process.env.OPENAI_API_KEY;
     
     let apiKey, apiUrl;
-    if (emergentKey && emergentKey.startsWith('sk-emergent-')) {
+    if (process.env.LLM_API_URL) {
+      // Local stand-in (tests/harness/mock_llm.py) for offline benchmarking
+      apiKey = 'mock'; // never send a real provider key to an overridden URL
+      apiUrl = process.env.LLM_API_URL;
+    } else if (emergentKey && emergentKey.startsWith('sk-emergent-')) {
       apiKey = emergentKey;
       apiUrl = EMERGENT_API_URL;
       console.log('Using Emergent LLM proxy');
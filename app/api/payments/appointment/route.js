@@ -1,10 +1,10 @@
 import { NextResponse } from 'next/server';
-import Stripe from 'stripe';
+import { createStripe } from '@/lib/stripe';
 import clientPromise from '@/lib/db';
 import { v4 as uuidv4 } from 'uuid';
 import { verifyToken } from '@/lib/auth';
 
-const stripe = new Stripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
+const stripe = createStripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
 
 // POST - Crea sessione Stripe per pagamento appuntamento
 export async function POST(request) {
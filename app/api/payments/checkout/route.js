@@ -1,9 +1,9 @@
 import { NextResponse } from 'next/server';
-import Stripe from 'stripe';
+import { createStripe } from '@/lib/stripe';
 import clientPromise from '@/lib/db';
 import { v4 as uuidv4 } from 'uuid';
 
-const stripe = new Stripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
+const stripe = createStripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
 
 // Piani tariffari fissi (sicurezza: non accettare prezzi dal frontend)
 const PLANS = {
@@ -1,8 +1,8 @@
 import { NextResponse } from 'next/server';
-import Stripe from 'stripe';
+import { createStripe } from '@/lib/stripe';
 import clientPromise from '@/lib/db';
 
-const stripe = new Stripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
+const stripe = createStripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
 
 export async function GET(request, { params }) {
   try {
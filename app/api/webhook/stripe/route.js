@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import Stripe from 'stripe';
+import { createStripe } from '@/lib/stripe';
 import clientPromise from '@/lib/db';
 import { v4 as uuidv4 } from 'uuid';
 import { sendEmail } from '@/lib/email';
@@ -8,7 +8,7 @@ import { generateInvoicePDF, saveInvoicePDFAsDocument } from '@/lib/invoicePDF';
 // Force dynamic rendering to prevent static generation errors
 export const dynamic = 'force-dynamic';
 
-const stripe = new Stripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
+const stripe = createStripe(process.env.STRIPE_API_KEY || process.env.STRIPE_SECRET_KEY);
 
 // Funzione per generare numero fattura progressivo
 async function generateInvoiceNumber(db, clinicId) {
@@ -6,7 +6,7 @@ TESTING COMPLETO BACKEND VETBUDDY - VERIFICA FUNZIONALE INTEGRALE
 Tests all backend APIs systematically following the review request sequence.
 """
 
-import requests
+from tests.harness import client
 import json
 import os
 from datetime import datetime, timedelta
@@ -76,7 +76,7 @@ def login(role):
     """Login with specified role and store token"""
     try:
         creds = CREDENTIALS[role]
-        response = requests.post(
+        response = client.post(
             f"{API_URL}/auth/login",
             json=creds,
             headers={"Content-Type": "application/json"},
@@ -102,19 +102,12 @@ def make_request(method, endpoint, role=None, data=None, params=None):
     
     url = f"{API_URL}/{endpoint}"
     
+    if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+        return None
+    
     try:
-        if method == 'GET':
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-        elif method == 'POST':
-            response = requests.post(url, headers=headers, json=data, timeout=10)
-        elif method == 'PUT':
-            response = requests.put(url, headers=headers, json=data, timeout=10)
-        elif method == 'DELETE':
-            response = requests.delete(url, headers=headers, timeout=10)
-        else:
-            return None
-        
-        return response
+        return client.request(method, url, headers=headers, params=params,
+                              json=data if method in ('POST', 'PUT') else None, timeout=10)
     except Exception as e:
         print(f"   Request error: {str(e)}")
         return None
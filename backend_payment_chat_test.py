@@ -5,6 +5,8 @@ Testing Payment APIs and Virtual Assistant Chat functionality
 """
 
 import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import os
 import time
@@ -45,14 +47,10 @@ def make_request(method, endpoint, headers=None, data=None, json_data=None, auth
         default_headers.update(headers)
     
     try:
-        if method.upper() == 'GET':
-            response = requests.get(url, headers=default_headers, timeout=30)
-        elif method.upper() == 'POST':
-            if json_data:
-                default_headers['Content-Type'] = 'application/json'
-                response = requests.post(url, headers=default_headers, json=json_data, timeout=30)
-            else:
-                response = requests.post(url, headers=default_headers, data=data, timeout=30)
+        if json_data:
+            default_headers['Content-Type'] = 'application/json'
+        response = client.request(method.upper(), url, headers=default_headers,
+                                  json=json_data or None, data=None if json_data else data, timeout=30)
         
         log_test(f"{method} {endpoint} -> Status: {response.status_code}")
         return response
@@ -72,7 +70,12 @@ def login_user(email, password):
         "password": password
     }
     
-    response = make_request('POST', 'auth/login', json_data=login_data)
+    try:
+        response = cached_login(f"{BASE_URL}/auth/login", json=login_data, timeout=30)
+        log_test(f"POST auth/login -> Status: {response.status_code}")
+    except requests.exceptions.RequestException as e:
+        log_test(f"Request error for POST auth/login: {str(e)}", False)
+        response = None
     
     if not response or response.status_code != 200:
         log_test(f"Login failed for {email}: {response.status_code if response else 'No response'}", False)
@@ -4,7 +4,7 @@ VetBuddy Payment System & Chat API Backend Test - Clean Version
 Testing Payment APIs and Virtual Assistant Chat functionality
 """
 
-import requests
+from tests.harness import client
 import json
 import time
 from datetime import datetime
@@ -37,7 +37,7 @@ def test_payment_create_checkout():
             "originUrl": "https://clinic-report-review.preview.emergentagent.com"
         }
         
-        response = requests.post(f"{BASE_URL}/payments/appointment", json=test_data, timeout=30)
+        response = client.post(f"{BASE_URL}/payments/appointment", json=test_data, timeout=30)
         log_test(f"POST payments/appointment -> Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -91,7 +91,7 @@ def test_payment_missing_appointment():
             "originUrl": "https://clinic-report-review.preview.emergentagent.com"
         }
         
-        response = requests.post(f"{BASE_URL}/payments/appointment", json=test_data, timeout=30)
+        response = client.post(f"{BASE_URL}/payments/appointment", json=test_data, timeout=30)
         log_test(f"POST payments/appointment -> Status: {response.status_code}")
         
         if response.status_code == 400:
@@ -123,7 +123,7 @@ def test_payment_non_existent_appointment():
             "originUrl": "https://clinic-report-review.preview.emergentagent.com"
         }
         
-        response = requests.post(f"{BASE_URL}/payments/appointment", json=test_data, timeout=30)
+        response = client.post(f"{BASE_URL}/payments/appointment", json=test_data, timeout=30)
         log_test(f"POST payments/appointment -> Status: {response.status_code}")
         
         if response.status_code == 404:
@@ -149,7 +149,7 @@ def test_payment_status_get():
     log_test("=" * 60)
     
     try:
-        response = requests.get(f"{BASE_URL}/payments/appointment?appointmentId={TEST_APPOINTMENT_ID}", timeout=30)
+        response = client.get(f"{BASE_URL}/payments/appointment?appointmentId={TEST_APPOINTMENT_ID}", timeout=30)
         log_test(f"GET payments/appointment -> Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -193,7 +193,7 @@ def test_payment_status_missing_id():
     log_test("=" * 60)
     
     try:
-        response = requests.get(f"{BASE_URL}/payments/appointment", timeout=30)
+        response = client.get(f"{BASE_URL}/payments/appointment", timeout=30)
         log_test(f"GET payments/appointment -> Status: {response.status_code}")
         
         if response.status_code == 400:
@@ -229,7 +229,7 @@ def test_chat_api():
             "sessionId": "test_session_" + str(int(time.time()))
         }
         
-        response = requests.post(f"{BASE_URL}/chat", json=chat_data, timeout=30)
+        response = client.post(f"{BASE_URL}/chat", json=chat_data, timeout=30)
         log_test(f"POST chat -> Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -286,7 +286,7 @@ def test_chat_invalid_messages():
             "sessionId": "test_session"
         }
         
-        response = requests.post(f"{BASE_URL}/chat", json=chat_data, timeout=30)
+        response = client.post(f"{BASE_URL}/chat", json=chat_data, timeout=30)
         log_test(f"POST chat -> Status: {response.status_code}")
         
         if response.status_code == 400:
@@ -330,7 +330,7 @@ def test_chat_multiple_messages():
             "sessionId": "test_conversation_" + str(int(time.time()))
         }
         
-        response = requests.post(f"{BASE_URL}/chat", json=chat_data, timeout=30)
+        response = client.post(f"{BASE_URL}/chat", json=chat_data, timeout=30)
         log_test(f"POST chat -> Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -7,7 +7,8 @@ Test rapido di 2 nuovi endpoint backend (Fase backlog):
 - Regression tests
 """
 
-import requests
+from tests.harness import client, stream_json
+from tests.harness.auth_cache import cached_login
 import json
 import sys
 from datetime import datetime
@@ -44,7 +45,7 @@ def login(email, password, role_name):
     """Login and get JWT token"""
     try:
         print(f"\n🔐 Logging in as {role_name} ({email})...")
-        response = requests.post(
+        response = cached_login(
             f"{BASE_URL}/auth/login",
             json={"email": email, "password": password},
             headers={"Content-Type": "application/json"}
@@ -71,16 +72,30 @@ def test_directory_clinics():
     print_test("1.1 - GET /api/directory/clinics (no auth)")
     
     try:
-        response = requests.get(f"{BASE_URL}/directory/clinics")
+        required_fields = ['id', 'name', 'city', 'address', 'phone', 'services', 
+                         'hasOnlineBooking', 'photo', 'slug', 'verified']
+        samples = []
+        
+        def check_clinic(clinic):
+            error = stream_json.require_fields(*required_fields)(clinic)
+            if error:
+                return error
+            if clinic['verified'] != True:
+                return f"Expected verified=true, got {clinic['verified']}"
+            if not samples:
+                samples.append(clinic)
         
-        if response.status_code != 200:
-            return print_result(False, f"Expected 200, got {response.status_code}")
+        # Every clinic is validated as it streams in, not just the first one
+        result = stream_json.validate_list(f"{BASE_URL}/directory/clinics", key='clinics', validate=check_clinic)
         
-        data = response.json()
+        if result['status'] != 200:
+            return print_result(False, f"Expected 200, got {result['status']}")
+        
+        data = result['fields']
         
         # Verify response structure
-        if 'clinics' not in data:
-            return print_result(False, "Missing 'clinics' field in response")
+        if 'parse_error' in result:
+            return print_result(False, f"Missing 'clinics' field in response ({result['parse_error']})")
         
         if 'total' not in data:
             return print_result(False, "Missing 'total' field in response")
@@ -88,27 +103,20 @@ def test_directory_clinics():
         if not isinstance(data['total'], int):
             return print_result(False, f"'total' should be number, got {type(data['total'])}")
         
-        clinics = data['clinics']
-        print(f"Found {len(clinics)} clinics (total: {data['total']})")
+        print(f"Found {result['items']} clinics (total: {data['total']})")
+        print(f"Streamed: {stream_json.format_result(result)}")
         
-        # Verify clinic structure if any clinics exist
-        if len(clinics) > 0:
-            clinic = clinics[0]
-            required_fields = ['id', 'name', 'city', 'address', 'phone', 'services', 
-                             'hasOnlineBooking', 'photo', 'slug', 'verified']
-            
-            for field in required_fields:
-                if field not in clinic:
-                    return print_result(False, f"Missing required field '{field}' in clinic object")
-            
-            if clinic['verified'] != True:
-                return print_result(False, f"Expected verified=true, got {clinic['verified']}")
-            
+        if result['errors']:
+            index, error = result['errors'][0]
+            return print_result(False, f"Clinic #{index}: {error} ({result['error_count']} invalid)")
+        
+        if samples:
+            clinic = samples[0]
             print(f"Sample clinic: {clinic['name']} - {clinic['city']}")
             print(f"  Services: {len(clinic['services'])} services")
             print(f"  Online booking: {clinic['hasOnlineBooking']}")
         
-        return print_result(True, f"Directory clinics endpoint working correctly ({len(clinics)} clinics)")
+        return print_result(True, f"Directory clinics endpoint working correctly ({result['items']} clinics)")
         
     except Exception as e:
         return print_result(False, f"Exception: {str(e)}")
@@ -118,7 +126,7 @@ def test_directory_clinics_filter_city():
     print_test("1.2 - GET /api/directory/clinics?city=milano")
     
     try:
-        response = requests.get(f"{BASE_URL}/directory/clinics?city=milano")
+        response = client.get(f"{BASE_URL}/directory/clinics?city=milano")
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -146,7 +154,7 @@ def test_directory_clinics_filter_service():
     print_test("1.3 - GET /api/directory/clinics?service=vaccini")
     
     try:
-        response = requests.get(f"{BASE_URL}/directory/clinics?service=vaccini")
+        response = client.get(f"{BASE_URL}/directory/clinics?service=vaccini")
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -167,16 +175,31 @@ def test_directory_labs():
     print_test("1.4 - GET /api/directory/labs (no auth)")
     
     try:
-        response = requests.get(f"{BASE_URL}/directory/labs")
+        required_fields = ['id', 'name', 'city', 'address', 'phone', 'pickupAvailable',
+                         'averageReportTime', 'examTypesCount', 'specializations', 
+                         'photo', 'verified']
+        samples = []
+        
+        def check_lab(lab):
+            error = stream_json.require_fields(*required_fields)(lab)
+            if error:
+                return error
+            if lab['verified'] != True:
+                return f"Expected verified=true, got {lab['verified']}"
+            if not samples:
+                samples.append(lab)
         
-        if response.status_code != 200:
-            return print_result(False, f"Expected 200, got {response.status_code}")
+        # Every lab is validated as it streams in, not just the first one
+        result = stream_json.validate_list(f"{BASE_URL}/directory/labs", key='labs', validate=check_lab)
         
-        data = response.json()
+        if result['status'] != 200:
+            return print_result(False, f"Expected 200, got {result['status']}")
+        
+        data = result['fields']
         
         # Verify response structure
-        if 'labs' not in data:
-            return print_result(False, "Missing 'labs' field in response")
+        if 'parse_error' in result:
+            return print_result(False, f"Missing 'labs' field in response ({result['parse_error']})")
         
         if 'total' not in data:
             return print_result(False, "Missing 'total' field in response")
@@ -184,28 +207,20 @@ def test_directory_labs():
         if not isinstance(data['total'], int):
             return print_result(False, f"'total' should be number, got {type(data['total'])}")
         
-        labs = data['labs']
-        print(f"Found {len(labs)} labs (total: {data['total']})")
+        print(f"Found {result['items']} labs (total: {data['total']})")
+        print(f"Streamed: {stream_json.format_result(result)}")
         
-        # Verify lab structure if any labs exist
-        if len(labs) > 0:
-            lab = labs[0]
-            required_fields = ['id', 'name', 'city', 'address', 'phone', 'pickupAvailable',
-                             'averageReportTime', 'examTypesCount', 'specializations', 
-                             'photo', 'verified']
-            
-            for field in required_fields:
-                if field not in lab:
-                    return print_result(False, f"Missing required field '{field}' in lab object")
-            
-            if lab['verified'] != True:
-                return print_result(False, f"Expected verified=true, got {lab['verified']}")
-            
+        if result['errors']:
+            index, error = result['errors'][0]
+            return print_result(False, f"Lab #{index}: {error} ({result['error_count']} invalid)")
+        
+        if samples:
+            lab = samples[0]
             print(f"Sample lab: {lab['name']} - {lab['city']}")
             print(f"  Exam types: {lab['examTypesCount']}")
             print(f"  Pickup available: {lab['pickupAvailable']}")
         
-        return print_result(True, f"Directory labs endpoint working correctly ({len(labs)} labs)")
+        return print_result(True, f"Directory labs endpoint working correctly ({result['items']} labs)")
         
     except Exception as e:
         return print_result(False, f"Exception: {str(e)}")
@@ -215,7 +230,7 @@ def test_directory_labs_filter_city():
     print_test("1.5 - GET /api/directory/labs?city=roma")
     
     try:
-        response = requests.get(f"{BASE_URL}/directory/labs?city=roma")
+        response = client.get(f"{BASE_URL}/directory/labs?city=roma")
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -235,7 +250,7 @@ def test_directory_labs_filter_exam():
     print_test("1.6 - GET /api/directory/labs?examType=sangue")
     
     try:
-        response = requests.get(f"{BASE_URL}/directory/labs?examType=sangue")
+        response = client.get(f"{BASE_URL}/directory/labs?examType=sangue")
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -260,7 +275,7 @@ def test_morning_briefing_clinic():
     
     try:
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.get(f"{BASE_URL}/clinic/morning-briefing", headers=headers)
+        response = client.get(f"{BASE_URL}/clinic/morning-briefing", headers=headers)
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code} - {response.text}")
@@ -336,7 +351,7 @@ def test_morning_briefing_owner():
     
     try:
         headers = {"Authorization": f"Bearer {owner_token}"}
-        response = requests.get(f"{BASE_URL}/clinic/morning-briefing", headers=headers)
+        response = client.get(f"{BASE_URL}/clinic/morning-briefing", headers=headers)
         
         if response.status_code != 403:
             return print_result(False, f"Expected 403, got {response.status_code}")
@@ -357,7 +372,7 @@ def test_morning_briefing_no_auth():
     print_test("2.3 - GET /api/clinic/morning-briefing without auth")
     
     try:
-        response = requests.get(f"{BASE_URL}/clinic/morning-briefing")
+        response = client.get(f"{BASE_URL}/clinic/morning-briefing")
         
         if response.status_code not in [401, 403]:
             return print_result(False, f"Expected 401 or 403, got {response.status_code}")
@@ -377,7 +392,7 @@ def test_regression_connect_stats():
     
     try:
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.get(f"{BASE_URL}/connect/stats", headers=headers)
+        response = client.get(f"{BASE_URL}/connect/stats", headers=headers)
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -397,7 +412,7 @@ def test_regression_connect_invitations():
     
     try:
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.get(f"{BASE_URL}/connect/invitations", headers=headers)
+        response = client.get(f"{BASE_URL}/connect/invitations", headers=headers)
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -417,7 +432,7 @@ def test_regression_connect_completion():
     
     try:
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.get(f"{BASE_URL}/connect/completion-score", headers=headers)
+        response = client.get(f"{BASE_URL}/connect/completion-score", headers=headers)
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -432,7 +447,7 @@ def test_regression_stripe_plans():
     print_test("3.4 - GET /api/stripe/plans (regression)")
     
     try:
-        response = requests.get(f"{BASE_URL}/stripe/plans")
+        response = client.get(f"{BASE_URL}/stripe/plans")
         
         if response.status_code != 200:
             return print_result(False, f"Expected 200, got {response.status_code}")
@@ -4,7 +4,8 @@ VetBuddy Sistema Anti-Spreco Backend Test
 Tests authentication, lab reports workflow, and value dashboard API
 """
 
-import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import time
 import sys
@@ -34,7 +35,7 @@ def test_clinic_authentication():
     print("="*80)
     
     try:
-        response = requests.post(
+        response = cached_login(
             f"{BASE_URL}/auth/login",
             json={"email": CLINIC_EMAIL, "password": CLINIC_PASSWORD},
             timeout=15
@@ -72,7 +73,7 @@ def test_value_metrics_month():
         return False
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/clinic/value-metrics?period=month",
             headers={"Authorization": f"Bearer {clinic_token}"},
             timeout=15
@@ -124,7 +125,7 @@ def test_value_metrics_quarter():
         return False
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/clinic/value-metrics?period=quarter",
             headers={"Authorization": f"Bearer {clinic_token}"},
             timeout=15
@@ -161,7 +162,7 @@ def test_value_metrics_year():
         return False
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/clinic/value-metrics?period=year",
             headers={"Authorization": f"Bearer {clinic_token}"},
             timeout=15
@@ -194,7 +195,7 @@ def test_value_metrics_unauthorized():
     print("="*80)
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/clinic/value-metrics",
             timeout=15
         )
@@ -225,7 +226,7 @@ def test_lab_reports_send_to_owner():
     
     # First, get lab requests to find a report
     try:
-        lab_requests_response = requests.get(
+        lab_requests_response = client.get(
             f"{BASE_URL}/lab-requests",
             headers={"Authorization": f"Bearer {clinic_token}"},
             timeout=15
@@ -255,7 +256,7 @@ def test_lab_reports_send_to_owner():
         if not report_id:
             # Try to test with error handling instead
             print("No reports found to send. Testing error handling...")
-            response = requests.post(
+            response = client.post(
                 f"{BASE_URL}/lab-reports/send-to-owner",
                 json={
                     "reportId": "non-existent-report-id",
@@ -279,7 +280,7 @@ def test_lab_reports_send_to_owner():
                 return False
         
         # Test sending report to owner
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/lab-reports/send-to-owner",
             json={
                 "reportId": report_id,
@@ -317,7 +318,7 @@ def test_lab_reports_unauthorized():
     print("="*80)
     
     try:
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/lab-reports/send-to-owner",
             json={
                 "reportId": "test-report-id",
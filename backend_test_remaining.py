@@ -5,11 +5,11 @@ Pre-visita API tests 1-2 were ALREADY DONE and PASSED - NOT retesting
 Running REMAINING tests: Server Health, Public Pages, Appointment Hook, Consensi E2E, Cron, Auth, Regression
 """
 
-import requests
+from tests.harness import client, mongo
+from tests.harness.auth_cache import cached_login
 import json
 import time
 from datetime import datetime, timedelta
-from pymongo import MongoClient
 import os
 
 # Configuration
@@ -29,7 +29,6 @@ clinic_token = None
 owner_token = None
 clinic_id = None
 owner_id = None
-mongo_client = None
 db = None
 
 # Test tracking
@@ -46,10 +45,9 @@ def log_test(test_name, passed, message=""):
 
 def setup_mongo():
     """Setup MongoDB connection"""
-    global mongo_client, db
+    global db
     try:
-        mongo_client = MongoClient(MONGO_URL)
-        db = mongo_client[DB_NAME]
+        db = mongo.get_db(MONGO_URL, DB_NAME)
         print(f"✅ MongoDB connected to {DB_NAME}")
         return True
     except Exception as e:
@@ -58,15 +56,14 @@ def setup_mongo():
 
 def cleanup_mongo():
     """Close MongoDB connection"""
-    if mongo_client:
-        mongo_client.close()
-        print("✅ MongoDB connection closed")
+    mongo.close()
+    print("✅ MongoDB connection closed")
 
 def login_clinic():
     """Login as clinic and get token"""
     global clinic_token, clinic_id
     try:
-        response = requests.post(f"{API_URL}/auth/login", json={
+        response = cached_login(f"{API_URL}/auth/login", json={
             "email": CLINIC_EMAIL,
             "password": CLINIC_PASSWORD
         })
@@ -87,7 +84,7 @@ def login_owner():
     """Login as owner and get token"""
     global owner_token, owner_id
     try:
-        response = requests.post(f"{API_URL}/auth/login", json={
+        response = cached_login(f"{API_URL}/auth/login", json={
             "email": OWNER_EMAIL,
             "password": OWNER_PASSWORD
         })
@@ -112,7 +109,7 @@ def test_1_server_health():
     
     try:
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.get(f"{API_URL}/auth/me", headers=headers)
+        response = client.get(f"{API_URL}/auth/me", headers=headers)
         
         if response.status_code != 200:
             log_test("Test 1 - Server Health", False, f"Status {response.status_code}")
@@ -139,7 +136,7 @@ def test_2_public_pages():
     try:
         # 2a. GET /previsit/test-id?t=test
         print("\n2a. Testing previsit public page...")
-        response = requests.get(f"{BASE_URL}/previsit/test-id?t=test")
+        response = client.get(f"{BASE_URL}/previsit/test-id?t=test")
         
         if response.status_code != 200:
             log_test("Test 2a - Previsit Page", False, f"Status {response.status_code}")
@@ -155,7 +152,7 @@ def test_2_public_pages():
         
         # 2b. GET /consent/test-id?t=test
         print("\n2b. Testing consent public page...")
-        response = requests.get(f"{BASE_URL}/consent/test-id?t=test")
+        response = client.get(f"{BASE_URL}/consent/test-id?t=test")
         
         if response.status_code != 200:
             log_test("Test 2b - Consent Page", False, f"Status {response.status_code}")
@@ -191,7 +188,7 @@ def test_3_appointment_hook():
         
         tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
         
-        response = requests.post(f"{API_URL}/appointments", headers=headers, json={
+        response = client.post(f"{API_URL}/appointments", headers=headers, json={
             "clinicId": clinic_id,
             "ownerId": owner_id,
             "petName": "TestHookPet",
@@ -242,7 +239,7 @@ def test_3_appointment_hook():
         
         # 3e. Cleanup: Delete appointment
         print("\n3e. Cleaning up - deleting appointment...")
-        response = requests.delete(f"{API_URL}/appointments/{appointment_id}", headers=headers)
+        response = client.delete(f"{API_URL}/appointments/{appointment_id}", headers=headers)
         
         if response.status_code == 200:
             log_test("Test 3e - Cleanup", True, "Appointment deleted")
@@ -258,7 +255,7 @@ def test_3_appointment_hook():
         if appointment_id:
             try:
                 headers = {"Authorization": f"Bearer {clinic_token}"}
-                requests.delete(f"{API_URL}/appointments/{appointment_id}", headers=headers)
+                client.delete(f"{API_URL}/appointments/{appointment_id}", headers=headers)
             except:
                 pass
         return False
@@ -276,7 +273,7 @@ def test_4_consents_e2e():
         # 4a. POST /api/consents (clinic) - Create consent
         print("\n4a. Creating consent...")
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.post(f"{API_URL}/consents", headers=headers, json={
+        response = client.post(f"{API_URL}/consents", headers=headers, json={
             "type": "chirurgia",
             "ownerName": "Test Owner",
             "ownerEmail": OWNER_EMAIL,
@@ -312,7 +309,7 @@ def test_4_consents_e2e():
         
         # 4c. GET /api/consents?id=<id>&t=<token> (no auth) - Public access
         print("\n4c. Public GET with valid token...")
-        response = requests.get(f"{API_URL}/consents?id={consent_id}&t={token}")
+        response = client.get(f"{API_URL}/consents?id={consent_id}&t={token}")
         
         if response.status_code != 200:
             log_test("Test 4c - Public GET", False, f"Status {response.status_code}")
@@ -330,7 +327,7 @@ def test_4_consents_e2e():
         
         # 4d. POST /api/consents - Sign consent
         print("\n4d. Signing consent...")
-        response = requests.post(f"{API_URL}/consents", json={
+        response = client.post(f"{API_URL}/consents", json={
             "id": consent_id,
             "token": token,
             "sign": True,
@@ -350,7 +347,7 @@ def test_4_consents_e2e():
         
         # 4e. POST same sign again - Should fail
         print("\n4e. Trying to sign again (should fail)...")
-        response = requests.post(f"{API_URL}/consents", json={
+        response = client.post(f"{API_URL}/consents", json={
             "id": consent_id,
             "token": token,
             "sign": True,
@@ -366,7 +363,7 @@ def test_4_consents_e2e():
         # 4f. GET /api/consents (clinic) - List consents
         print("\n4f. Clinic GET - List consents...")
         headers = {"Authorization": f"Bearer {clinic_token}"}
-        response = requests.get(f"{API_URL}/consents", headers=headers)
+        response = client.get(f"{API_URL}/consents", headers=headers)
         
         if response.status_code != 200:
             log_test("Test 4f - Clinic List", False, f"Status {response.status_code}")
@@ -406,7 +403,7 @@ def test_5_cron_daily():
     
     try:
         print("\n5a. Calling GET /api/cron/daily ONCE...")
-        response = requests.get(f"{API_URL}/cron/daily")
+        response = client.get(f"{API_URL}/cron/daily")
         
         if response.status_code != 200:
             log_test("Test 5a - Cron Call", False, f"Status {response.status_code}: {response.text}")
@@ -467,7 +464,7 @@ def test_6_auth_checks():
     try:
         # 6a. GET /api/previsit without token (no id/t params)
         print("\n6a. GET /api/previsit without token...")
-        response = requests.get(f"{API_URL}/previsit")
+        response = client.get(f"{API_URL}/previsit")
         
         if response.status_code != 401:
             log_test("Test 6a - Previsit No Auth", False, f"Expected 401, got {response.status_code}")
@@ -478,7 +475,7 @@ def test_6_auth_checks():
         # 6b. POST /api/consents with owner token (clinic-only endpoint)
         print("\n6b. POST /api/consents with owner token...")
         headers = {"Authorization": f"Bearer {owner_token}"}
-        response = requests.post(f"{API_URL}/consents", headers=headers, json={
+        response = client.post(f"{API_URL}/consents", headers=headers, json={
             "type": "chirurgia",
             "ownerName": "Test",
             "ownerEmail": "test@test.com",
@@ -509,7 +506,7 @@ def test_7_regression():
         
         # 7a. GET /api/automations/log
         print("\n7a. GET /api/automations/log...")
-        response = requests.get(f"{API_URL}/automations/log", headers=headers)
+        response = client.get(f"{API_URL}/automations/log", headers=headers)
         
         if response.status_code != 200:
             log_test("Test 7a - Automation Log", False, f"Status {response.status_code}")
@@ -526,7 +523,7 @@ def test_7_regression():
         
         # 7b. GET /api/automations/settings
         print("\n7b. GET /api/automations/settings...")
-        response = requests.get(f"{API_URL}/automations/settings", headers=headers)
+        response = client.get(f"{API_URL}/automations/settings", headers=headers)
         
         if response.status_code != 200:
             log_test("Test 7b - Automation Settings", False, f"Status {response.status_code}")
@@ -4,7 +4,8 @@ VetBuddy Backend API Testing Script - ROI Dashboard Sistema Anti-Spreco
 Tests the ROI Dashboard API endpoint that aggregates data from all Sistema Anti-Spreco modules
 """
 
-import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import os
 from datetime import datetime
@@ -38,7 +39,7 @@ def login_clinic():
     print_test_header("Clinic Authentication")
     
     try:
-        response = requests.post(
+        response = cached_login(
             f"{API_URL}/auth/login",
             json={
                 "email": CLINIC_EMAIL,
@@ -68,7 +69,7 @@ def test_roi_dashboard_authentication():
     try:
         # Test without authentication
         print("\n🔒 Testing unauthorized access (no token)...")
-        response = requests.get(f"{API_URL}/roi-dashboard")
+        response = client.get(f"{API_URL}/roi-dashboard")
         
         if response.status_code == 401:
             print_result(True, f"Unauthorized access correctly blocked (401)")
@@ -80,7 +81,7 @@ def test_roi_dashboard_authentication():
             
         # Test with clinic authentication
         print("\n🔓 Testing authorized access (clinic token)...")
-        response = requests.get(
+        response = client.get(
             f"{API_URL}/roi-dashboard",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -101,7 +102,7 @@ def test_roi_dashboard_data_aggregation():
     print_test_header("Test 2: Data Aggregation Structure")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{API_URL}/roi-dashboard",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -169,7 +170,7 @@ def test_roi_dashboard_module_breakdown():
     print_test_header("Test 3: Module Breakdown (5 Modules)")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{API_URL}/roi-dashboard",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -251,7 +252,7 @@ def test_roi_dashboard_recommendations():
     print_test_header("Test 4: Recommendations Array")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{API_URL}/roi-dashboard",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -309,7 +310,7 @@ def test_roi_dashboard_trends():
     print_test_header("Test 5: Trends Object")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{API_URL}/roi-dashboard",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import requests
+from tests.harness import client
 import json
 
 BASE_URL = "https://clinic-report-review.preview.emergentagent.com/api"
@@ -14,9 +14,9 @@ def make_request(method, endpoint, json_data=None):
     try:
         if method.upper() == 'POST':
             headers = {'Content-Type': 'application/json'}
-            response = requests.post(url, headers=headers, json=json_data, timeout=30)
+            response = client.post(url, headers=headers, json=json_data, timeout=30)
         else:
-            response = requests.get(url, timeout=30)
+            response = client.get(url, timeout=30)
         
         print(f"Response status: {response.status_code}")
         print(f"Response object: {response}")
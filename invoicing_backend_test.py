@@ -5,10 +5,17 @@ VetBuddy Invoicing/Billing API Backend Tests
 Testing all invoicing API endpoints as specified in the review request
 """
 
-import requests
+from tests.harness import client, stream_json
+from tests.harness.auth_cache import cached_login
+import argparse
 import json
+import random
+import statistics
+import sys
 import time
 import csv
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 
 # Configuration
@@ -41,6 +48,46 @@ def print_header(message):
     print(f"{Colors.BOLD}{Colors.BLUE}{message}{Colors.END}")
     print(f"{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.END}")
 
+# Price list used by the numbering stress test (a mix below and above the €77.47 bollo threshold)
+STRESS_ITEMS = [
+    ("Visita clinica completa", 45.00),
+    ("Vaccino antirabbica", 25.00),
+    ("Esami del sangue", 60.00),
+    ("Ecografia addominale", 65.00),
+    ("Pulizia dentale", 120.00),
+]
+
+def expected_totals(items):
+    """Totals the API should compute for items (mirrors calculateTotals in /api/invoices)"""
+    subtotal = sum(item.get('quantity', 1) * item['unitPrice'] for item in items)
+    vat_amount = subtotal * 0.22
+    bollo = 2.00 if subtotal > 77.47 else 0
+    return {
+        'subtotal': round(subtotal, 2),
+        'vatRate': 22,
+        'vatAmount': round(vat_amount, 2),
+        'bolloAmount': bollo,
+        'total': round(subtotal + vat_amount + bollo, 2),
+    }
+
+def vat_errors(totals, expected=None):
+    """Same checks as test_vat_calculations (22% VAT, total = subtotal + VAT + bollo), plus expected values"""
+    errors = []
+    subtotal = totals.get('subtotal', 0)
+    vat_amount = totals.get('vatAmount', 0)
+    if abs(vat_amount - subtotal * 0.22) >= 0.01:
+        errors.append(f"VAT €{vat_amount:.2f} is not 22% of €{subtotal:.2f}")
+    if abs(totals.get('total', 0) - (subtotal + vat_amount + totals.get('bolloAmount', 0))) >= 0.01:
+        errors.append(f"total €{totals.get('total', 0):.2f} != subtotal + VAT + bollo")
+    for field, value in (expected or {}).items():
+        if abs(totals.get(field, 0) - value) >= 0.01:
+            errors.append(f"{field} €{totals.get(field, 0)} != expected €{value}")
+    return errors
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
 class VetBuddyInvoicingTester:
     def __init__(self):
         self.base_url = BASE_URL
@@ -59,7 +106,7 @@ class VetBuddyInvoicingTester:
                 "password": TEST_CLINIC_PASSWORD
             }
             
-            response = requests.post(f"{self.base_url}/auth/login", json=login_data)
+            response = cached_login(f"{self.base_url}/auth/login", json=login_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -93,12 +140,17 @@ class VetBuddyInvoicingTester:
         print_header("📋 GET /api/invoices - LIST INVOICES TEST")
         
         try:
-            response = requests.get(f"{self.base_url}/invoices", headers=self.get_headers())
+            # Streamed item by item, so the check scales to clinics with tens of thousands of invoices
+            result = stream_json.validate_list(f"{self.base_url}/invoices", key='invoices', headers=self.get_headers(),
+                                               validate=stream_json.require_fields('id', 'status'))
             
-            if response.status_code == 200:
-                data = response.json()
+            if result['status'] == 200 and 'parse_error' not in result:
+                data = result['fields']
                 print_success("Invoice list retrieved successfully")
-                print_info(f"Total invoices: {len(data.get('invoices', []))}")
+                print_info(f"Total invoices: {result['items']}")
+                print_info(f"Streamed: {stream_json.format_result(result)}")
+                for index, error in result['errors']:
+                    print_warning(f"Invoice #{index}: {error}")
                 
                 # Check stats structure
                 if 'stats' in data:
@@ -110,21 +162,20 @@ class VetBuddyInvoicingTester:
                 print_info("Testing filters...")
                 
                 # Filter by status (draft)
-                response_draft = requests.get(f"{self.base_url}/invoices?status=draft", headers=self.get_headers())
+                response_draft = client.get(f"{self.base_url}/invoices?status=draft", headers=self.get_headers())
                 if response_draft.status_code == 200:
                     draft_data = response_draft.json()
                     print_success(f"Draft filter working: {len(draft_data.get('invoices', []))} drafts found")
                 
                 # Filter by status (paid)
-                response_paid = requests.get(f"{self.base_url}/invoices?status=paid", headers=self.get_headers())
+                response_paid = client.get(f"{self.base_url}/invoices?status=paid", headers=self.get_headers())
                 if response_paid.status_code == 200:
                     paid_data = response_paid.json()
                     print_success(f"Paid filter working: {len(paid_data.get('invoices', []))} paid invoices found")
                 
                 return True
             else:
-                print_error(f"Failed to get invoices: {response.status_code}")
-                print_error(f"Response: {response.text}")
+                print_error(f"Failed to get invoices: {stream_json.format_result(result)}")
                 return False
                 
         except Exception as e:
@@ -160,7 +211,7 @@ class VetBuddyInvoicingTester:
                 "isDraft": True
             }
             
-            response = requests.post(f"{self.base_url}/invoices", json=invoice_data, headers=self.get_headers())
+            response = client.post(f"{self.base_url}/invoices", json=invoice_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -209,7 +260,7 @@ class VetBuddyInvoicingTester:
                 "status": "issued"
             }
             
-            response = requests.put(f"{self.base_url}/invoices", json=update_data, headers=self.get_headers())
+            response = client.put(f"{self.base_url}/invoices", json=update_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -253,7 +304,7 @@ class VetBuddyInvoicingTester:
                 "status": "paid"
             }
             
-            response = requests.put(f"{self.base_url}/invoices", json=update_data, headers=self.get_headers())
+            response = client.put(f"{self.base_url}/invoices", json=update_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -293,7 +344,7 @@ class VetBuddyInvoicingTester:
                 "isDraft": False  # Create as issued
             }
             
-            response = requests.post(f"{self.base_url}/invoices", json=invoice_data, headers=self.get_headers())
+            response = client.post(f"{self.base_url}/invoices", json=invoice_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -326,7 +377,7 @@ class VetBuddyInvoicingTester:
         print_header("📄 GET /api/invoices/export - CSV EXPORT TEST")
         
         try:
-            response = requests.get(f"{self.base_url}/invoices/export?format=csv", headers=self.get_headers())
+            response = client.get(f"{self.base_url}/invoices/export?format=csv", headers=self.get_headers())
             
             if response.status_code == 200:
                 print_success("CSV export successful")
@@ -368,7 +419,7 @@ class VetBuddyInvoicingTester:
         print_header("📊 GET /api/invoices/export - JSON EXPORT TEST")
         
         try:
-            response = requests.get(f"{self.base_url}/invoices/export?format=json", headers=self.get_headers())
+            response = client.get(f"{self.base_url}/invoices/export?format=json", headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -407,7 +458,7 @@ class VetBuddyInvoicingTester:
             return False
         
         try:
-            response = requests.get(
+            response = client.get(
                 f"{self.base_url}/invoices/export?format=html&id={self.test_invoice_id}", 
                 headers=self.get_headers()
             )
@@ -449,7 +500,7 @@ class VetBuddyInvoicingTester:
         print_header("🏥 GET /api/services - LIST SERVICES TEST")
         
         try:
-            response = requests.get(f"{self.base_url}/services", headers=self.get_headers())
+            response = client.get(f"{self.base_url}/services", headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -495,7 +546,7 @@ class VetBuddyInvoicingTester:
                 "vatIncluded": True
             }
             
-            response = requests.post(f"{self.base_url}/services", json=service_data, headers=self.get_headers())
+            response = client.post(f"{self.base_url}/services", json=service_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -537,7 +588,7 @@ class VetBuddyInvoicingTester:
                 "isDraft": True
             }
             
-            response = requests.post(f"{self.base_url}/invoices", json=invoice_data, headers=self.get_headers())
+            response = client.post(f"{self.base_url}/invoices", json=invoice_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -575,6 +626,113 @@ class VetBuddyInvoicingTester:
             print_error(f"VAT calculations test error: {str(e)}")
             return False
     
+    def stress_invoice_numbering(self, count=200, workers=32, seed=None):
+        """Convert `count` drafts to issued in parallel; numbers must be unique and gap-free"""
+        print_header(f"🏎️  INVOICE NUMBERING STRESS TEST ({count} invoices, {workers} workers)")
+        rnd = random.Random(seed)
+        year = str(time.localtime().tm_year)
+        
+        # Items are drawn up front so a --seed run sends the same invoices
+        planned = [[{"description": description, "quantity": rnd.randint(1, 2), "unitPrice": price}
+                    for description, price in rnd.sample(STRESS_ITEMS, rnd.randint(1, 3))]
+                   for _ in range(count)]
+        
+        def create_draft(i):
+            items = planned[i]
+            response = client.post(f"{self.base_url}/invoices", headers=self.get_headers(), json={
+                "customerName": f"Stress Test {i}", "customerEmail": f"stress{i}@vetbuddy.test",
+                "items": items, "notes": "Invoice numbering stress test", "isDraft": True,
+            })
+            return (response.json().get('id') if response.status_code == 200 else None), items
+        
+        def issue(invoice_id):
+            started = time.perf_counter()
+            response = client.put(f"{self.base_url}/invoices", headers=self.get_headers(),
+                                  json={"id": invoice_id, "status": "issued"})
+            elapsed = time.perf_counter() - started
+            data = response.json() if response.status_code == 200 else {}
+            return invoice_id, response.status_code, data, elapsed
+        
+        # Drafts first (no number is assigned), so the timed phase is only the numbering race
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            drafts = list(pool.map(create_draft, range(count)))
+        draft_seconds = time.perf_counter() - started
+        items_by_id = {invoice_id: items for invoice_id, items in drafts if invoice_id}
+        print_info(f"{len(items_by_id)}/{count} drafts created in {draft_seconds:.1f}s "
+                   f"({len(items_by_id) / draft_seconds:.1f}/s)")
+        if not items_by_id:
+            print_error("No drafts created")
+            return False
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            issued = list(pool.map(issue, list(items_by_id)))
+        issue_seconds = time.perf_counter() - started
+        latencies = [elapsed * 1000 for _, status, _, elapsed in issued if status == 200]
+        print_info(f"{len(latencies)}/{len(issued)} conversions in {issue_seconds:.1f}s: "
+                   f"{len(latencies) / issue_seconds:.1f} invoices/s, p50 {_percentile(latencies, 0.5):.0f}ms, "
+                   f"p95 {_percentile(latencies, 0.95):.0f}ms, max {max(latencies, default=0):.0f}ms")
+        
+        ok = True
+        failures = [(invoice_id, status) for invoice_id, status, _, _ in issued if status != 200]
+        if failures:
+            ok = False
+            print_error(f"{len(failures)} conversions failed, e.g. {failures[:3]}")
+        
+        # Numbers handed out to our conversions
+        numbers = [data.get('invoiceNumber') for _, status, data, _ in issued if status == 200]
+        malformed = [n for n in numbers if not n or n.split('/')[0] != year or not n.split('/')[-1].isdigit()]
+        duplicates = {n: c for n, c in Counter(numbers).items() if c > 1}
+        if malformed:
+            ok = False
+            print_error(f"{len(malformed)} malformed invoice numbers, e.g. {malformed[:5]}")
+        if duplicates:
+            ok = False
+            print_error(f"{len(duplicates)} invoice numbers issued more than once, e.g. "
+                        f"{dict(list(duplicates.items())[:5])}")
+        else:
+            print_success(f"All {len(numbers)} invoice numbers are unique")
+        
+        # Gaps across the clinic's whole year, streamed so a busy clinic's list is fine
+        year_numbers = []
+        def collect(invoice):
+            number = invoice.get('invoiceNumber') or ''
+            if number.startswith(f"{year}/") and number.split('/')[-1].isdigit():
+                year_numbers.append(int(number.split('/')[-1]))
+        stream_json.validate_list(f"{self.base_url}/invoices", key='invoices', headers=self.get_headers(),
+                                  validate=collect, measure_memory=False)
+        ours = [int(n.split('/')[-1]) for n in numbers if n not in malformed]
+        if ours:
+            present = Counter(year_numbers)
+            missing = [n for n in range(min(ours), max(ours) + 1) if not present[n]]
+            repeated = [n for n in range(min(ours), max(ours) + 1) if present[n] > 1]
+            if missing or repeated:
+                ok = False
+                print_error(f"Numbering {year}/{min(ours):03d}-{year}/{max(ours):03d}: "
+                            f"{len(missing)} gaps {missing[:10]}, {len(repeated)} stored twice {repeated[:10]}")
+            else:
+                print_success(f"Numbering {year}/{min(ours):03d}-{year}/{max(ours):03d} is gap-free")
+        
+        # Totals must survive the conversion unchanged and match the VAT rules
+        bad_totals = [(invoice_id, errors) for invoice_id, status, data, _ in issued if status == 200
+                      for errors in [vat_errors(data.get('totals', {}), expected_totals(items_by_id[invoice_id]))]
+                      if errors]
+        if bad_totals:
+            ok = False
+            print_error(f"{len(bad_totals)} invoices with wrong totals, e.g. {bad_totals[0]}")
+        else:
+            print_success(f"VAT and totals correct on all {len(numbers)} issued invoices")
+        
+        self.stress_report = {
+            'count': count, 'workers': workers, 'drafts_per_sec': len(items_by_id) / draft_seconds,
+            'issued_per_sec': len(latencies) / issue_seconds,
+            'p50_ms': _percentile(latencies, 0.5), 'p95_ms': _percentile(latencies, 0.95),
+            'mean_ms': statistics.mean(latencies) if latencies else 0.0,
+            'failures': len(failures), 'duplicates': len(duplicates),
+        }
+        return ok
+    
     def run_all_tests(self):
         """Run all invoicing API tests"""
         print_header("🧪 VETBUDDY INVOICING/BILLING API COMPREHENSIVE TESTS")
@@ -660,7 +818,54 @@ class VetBuddyInvoicingTester:
         requirements_passed = sum(1 for _, met in requirements_met if met)
         print(f"\n{Colors.BOLD}Review Requirements: {Colors.GREEN}{requirements_passed}/{len(requirements_met)} met{Colors.END}")
 
+def run_stress(count, workers, seed=None):
+    """Run the numbering stress test against a throwaway fixture clinic.
+
+    Issued invoices cannot be deleted through the API, so the stress test
+    never runs on the demo clinic: a FixtureRun clinic is seeded in MongoDB
+    and removed with everything it issued afterwards.
+    """
+    import os
+    from tests.harness import mongo
+    from tests.harness.fixtures import FixtureRun, ensure_indexes
+    
+    if not os.getenv('MONGO_URL'):
+        print_error("MONGO_URL is not set: the stress test runs on a fixture clinic seeded in MongoDB")
+        return 1
+    db = mongo.get_db()
+    ensure_indexes(db)
+    with FixtureRun(db, seed=seed) as run:
+        scenario = run.clinic_scenario(owners=1, pets=1, appointments=0, prescriptions=0, invoices=0)
+        run.flush()
+        if not scenario['password']:
+            print_error("bcrypt is not installed: the fixture clinic cannot log in")
+            return 1
+        response = cached_login(f"{BASE_URL}/auth/login",
+                                json={"email": scenario['email'], "password": scenario['password']})
+        if response.status_code != 200:
+            print_error(f"Fixture clinic login failed: {response.status_code} {response.text[:200]}")
+            return 1
+        tester = VetBuddyInvoicingTester()
+        tester.auth_token = response.json()['token']
+        try:
+            ok = tester.stress_invoice_numbering(count, workers, seed)
+        finally:
+            # Everything the clinic created carries its clinicId, not the fixture tag
+            removed = db.invoices.delete_many({'clinicId': scenario['clinic_id']}).deleted_count
+            print_info(f"Removed {removed} stress-test invoices")
+    return 0 if ok else 1
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VetBuddy invoicing API tests")
+    parser.add_argument('--stress', type=int, metavar='N',
+                        help="only run the numbering stress test with N concurrent draft->issued conversions")
+    parser.add_argument('--workers', type=int, default=32, help="parallel requests in stress mode")
+    parser.add_argument('--seed', type=int, help="random seed for the stress-test invoices")
+    args = parser.parse_args()
+    
+    if args.stress:
+        sys.exit(run_stress(args.stress, args.workers, args.seed))
+    
     tester = VetBuddyInvoicingTester()
     results = tester.run_all_tests()
     tester.print_summary(results)
\ No newline at end of file
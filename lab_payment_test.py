@@ -4,7 +4,8 @@ VetBuddy Lab Payment Backend API Testing
 Tests all lab payment endpoints with proper authentication and authorization
 """
 
-import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import sys
 from datetime import datetime
@@ -34,7 +35,7 @@ def print_test_result(test_name, success, details=""):
 def login_user(credentials):
     """Login and return JWT token"""
     try:
-        response = requests.post(f"{BASE_URL}/auth/login", json=credentials)
+        response = cached_login(f"{BASE_URL}/auth/login", json=credentials)
         if response.status_code == 200:
             data = response.json()
             return data.get('token'), data.get('user')
@@ -53,7 +54,7 @@ def test_lab_stripe_settings_get(lab_token):
     
     try:
         # Test GET /api/lab/stripe-settings
-        response = requests.get(f"{BASE_URL}/lab/stripe-settings", headers=headers)
+        response = client.get(f"{BASE_URL}/lab/stripe-settings", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -95,7 +96,7 @@ def test_lab_stripe_settings_post(lab_token):
     
     try:
         # Test POST /api/lab/stripe-settings
-        response = requests.post(f"{BASE_URL}/lab/stripe-settings", headers=headers, json=test_data)
+        response = client.post(f"{BASE_URL}/lab/stripe-settings", headers=headers, json=test_data)
         
         if response.status_code == 200:
             data = response.json()
@@ -124,7 +125,7 @@ def test_lab_stripe_settings_verification(lab_token):
     
     try:
         # Test GET /api/lab/stripe-settings again to verify
-        response = requests.get(f"{BASE_URL}/lab/stripe-settings", headers=headers)
+        response = client.get(f"{BASE_URL}/lab/stripe-settings", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -171,7 +172,7 @@ def test_lab_quote_checkout_auth_errors(clinic_token, lab_token):
     
     try:
         # Test without auth - should return 401
-        response = requests.post(f"{BASE_URL}/stripe/checkout/lab-quote", json=test_data)
+        response = client.post(f"{BASE_URL}/stripe/checkout/lab-quote", json=test_data)
         
         if response.status_code == 401:
             print_test_result("Lab Quote Checkout - No Auth", True, 
@@ -183,7 +184,7 @@ def test_lab_quote_checkout_auth_errors(clinic_token, lab_token):
         
         # Test with lab token - should return 401 (only clinics can pay)
         lab_headers = {"Authorization": f"Bearer {lab_token}"}
-        response = requests.post(f"{BASE_URL}/stripe/checkout/lab-quote", headers=lab_headers, json=test_data)
+        response = client.post(f"{BASE_URL}/stripe/checkout/lab-quote", headers=lab_headers, json=test_data)
         
         if response.status_code == 401:
             print_test_result("Lab Quote Checkout - Lab Auth", True, 
@@ -206,7 +207,7 @@ def test_lab_quote_checkout_missing_request(clinic_token):
     
     try:
         # Test with missing labRequestId
-        response = requests.post(f"{BASE_URL}/stripe/checkout/lab-quote", headers=headers, json={})
+        response = client.post(f"{BASE_URL}/stripe/checkout/lab-quote", headers=headers, json={})
         
         if response.status_code == 400:
             data = response.json()
@@ -228,7 +229,7 @@ def test_lab_quote_checkout_missing_request(clinic_token):
             "originUrl": "https://clinic-report-review.preview.emergentagent.com"
         }
         
-        response = requests.post(f"{BASE_URL}/stripe/checkout/lab-quote", headers=headers, json=test_data)
+        response = client.post(f"{BASE_URL}/stripe/checkout/lab-quote", headers=headers, json=test_data)
         
         if response.status_code == 404:
             data = response.json()
@@ -252,7 +253,7 @@ def find_lab_request_with_quote(clinic_token):
     
     try:
         # Get lab requests
-        response = requests.get(f"{BASE_URL}/lab-requests", headers=headers)
+        response = client.get(f"{BASE_URL}/lab-requests", headers=headers)
         
         if response.status_code == 200:
             requests_data = response.json()
@@ -284,7 +285,7 @@ def test_lab_invoices_get(lab_token):
     
     try:
         # Test GET /api/lab/invoices
-        response = requests.get(f"{BASE_URL}/lab/invoices", headers=headers)
+        response = client.get(f"{BASE_URL}/lab/invoices", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -313,7 +314,7 @@ def test_clinic_lab_invoices_get(clinic_token):
     
     try:
         # Test GET /api/clinic/lab-invoices
-        response = requests.get(f"{BASE_URL}/clinic/lab-invoices", headers=headers)
+        response = client.get(f"{BASE_URL}/clinic/lab-invoices", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -351,9 +352,9 @@ def test_auth_required_endpoints():
     for method, endpoint in endpoints:
         try:
             if method == "GET":
-                response = requests.get(f"{BASE_URL}{endpoint}")
+                response = client.get(f"{BASE_URL}{endpoint}")
             else:
-                response = requests.post(f"{BASE_URL}{endpoint}", json={})
+                response = client.post(f"{BASE_URL}{endpoint}", json={})
             
             if response.status_code == 401:
                 print_test_result(f"{method} {endpoint} - No Auth", True, 
@@ -382,7 +383,7 @@ def reset_lab_stripe_settings(lab_token):
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/lab/stripe-settings", headers=headers, json=reset_data)
+        response = client.post(f"{BASE_URL}/lab/stripe-settings", headers=headers, json=reset_data)
         
         if response.status_code == 200:
             print_test_result("Reset Lab Stripe Settings", True, 
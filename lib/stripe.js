@@ -0,0 +1,18 @@
+import Stripe from 'stripe';
+
+// STRIPE_API_BASE (e.g. http://127.0.0.1:12111) sends every Stripe call to a
+// local stand-in (tests/harness/stripe_mock.py) instead of api.stripe.com
+function stripeOptions() {
+  const base = process.env.STRIPE_API_BASE;
+  if (!base) return undefined;
+  const url = new URL(base);
+  return {
+    host: url.hostname,
+    port: url.port || (url.protocol === 'https:' ? 443 : 80),
+    protocol: url.protocol.replace(':', ''),
+  };
+}
+
+export function createStripe(secretKey) {
+  return new Stripe(secretKey, stripeOptions());
+}
@@ -8,7 +8,7 @@ Focus on testing the specific requirements from the review request:
 4. Authentication verification
 """
 
-import requests
+from tests.harness import client
 import json
 import sys
 from typing import Dict, Any, Optional
@@ -16,7 +16,7 @@ from typing import Dict, Any, Optional
 class VetBuddyPetTester:
     def __init__(self, base_url: str):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = client.get_client()
         self.owner_token = None
         self.clinic_token = None
         
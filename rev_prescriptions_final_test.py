@@ -4,7 +4,8 @@ VetBuddy REV Prescriptions Module - Final Comprehensive Test
 Tests all endpoints from the review request with proper data flow
 """
 
-import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import sys
 from datetime import datetime
@@ -32,7 +33,7 @@ def print_test_result(test_name, success, details=""):
 def login_user(credentials):
     """Login and return JWT token"""
     try:
-        response = requests.post(f"{BASE_URL}/auth/login", json=credentials)
+        response = cached_login(f"{BASE_URL}/auth/login", json=credentials)
         if response.status_code == 200:
             data = response.json()
             return data.get('token'), data.get('user')
@@ -54,7 +55,7 @@ def main():
     # 1. GET /api/rev/config (No auth needed)
     print("1️⃣ Testing GET /api/rev/config (No auth needed)")
     try:
-        response = requests.get(f"{BASE_URL}/rev/config")
+        response = client.get(f"{BASE_URL}/rev/config")
         if response.status_code == 200:
             data = response.json()
             expected = {"manualMode": True, "featureEnabled": True, "environment": "sandbox"}
@@ -90,7 +91,7 @@ def main():
     print(f"✅ Owner login successful: {owner_user['email']}")
     
     # Get pet for testing
-    pets_response = requests.get(f"{BASE_URL}/pets", headers=clinic_headers)
+    pets_response = client.get(f"{BASE_URL}/pets", headers=clinic_headers)
     pets = pets_response.json()
     if not pets:
         print("❌ No pets available for testing")
@@ -101,7 +102,7 @@ def main():
     # 2. GET /api/prescriptions/stats (Clinic auth)
     print("2️⃣ Testing GET /api/prescriptions/stats (Clinic auth)")
     try:
-        response = requests.get(f"{BASE_URL}/prescriptions/stats", headers=clinic_headers)
+        response = client.get(f"{BASE_URL}/prescriptions/stats", headers=clinic_headers)
         if response.status_code == 200:
             data = response.json()
             required_fields = ['drafts', 'emittedToday', 'errors', 'total']
@@ -142,7 +143,7 @@ def main():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/prescriptions", headers=clinic_headers, json=prescription_data)
+        response = client.post(f"{BASE_URL}/prescriptions", headers=clinic_headers, json=prescription_data)
         if response.status_code == 201:
             prescription = response.json()
             if prescription.get('status') == 'DRAFT':
@@ -169,7 +170,7 @@ def main():
     # 4. GET /api/prescriptions (List - Clinic auth)
     print("4️⃣ Testing GET /api/prescriptions (List - Clinic auth)")
     try:
-        response = requests.get(f"{BASE_URL}/prescriptions", headers=clinic_headers)
+        response = client.get(f"{BASE_URL}/prescriptions", headers=clinic_headers)
         if response.status_code == 200:
             prescriptions = response.json()
             if isinstance(prescriptions, list) and any(p['id'] == prescription_id for p in prescriptions):
@@ -188,7 +189,7 @@ def main():
     # 5. GET /api/prescriptions/:id (Detail)
     print("5️⃣ Testing GET /api/prescriptions/:id (Detail)")
     try:
-        response = requests.get(f"{BASE_URL}/prescriptions/{prescription_id}", headers=clinic_headers)
+        response = client.get(f"{BASE_URL}/prescriptions/{prescription_id}", headers=clinic_headers)
         if response.status_code == 200:
             prescription = response.json()
             if prescription.get('id') == prescription_id and 'items' in prescription and len(prescription['items']) > 0:
@@ -208,7 +209,7 @@ def main():
     print("6️⃣ Testing PUT /api/prescriptions/:id (Update draft)")
     try:
         update_data = {"diagnosisNote": "Updated diagnosis"}
-        response = requests.put(f"{BASE_URL}/prescriptions/{prescription_id}", headers=clinic_headers, json=update_data)
+        response = client.put(f"{BASE_URL}/prescriptions/{prescription_id}", headers=clinic_headers, json=update_data)
         if response.status_code == 200:
             updated = response.json()
             if updated.get('diagnosisNote') == "Updated diagnosis":
@@ -233,7 +234,7 @@ def main():
             "issueDate": "2026-04-16",
             "notes": "Test registration"
         }
-        response = requests.post(f"{BASE_URL}/prescriptions/{prescription_id}/register-manual", 
+        response = client.post(f"{BASE_URL}/prescriptions/{prescription_id}/register-manual", 
                                headers=clinic_headers, json=manual_data)
         if response.status_code == 200:
             result = response.json()
@@ -253,7 +254,7 @@ def main():
     # 8. GET /api/prescriptions/:id/audit (Audit trail)
     print("8️⃣ Testing GET /api/prescriptions/:id/audit (Audit trail)")
     try:
-        response = requests.get(f"{BASE_URL}/prescriptions/{prescription_id}/audit", headers=clinic_headers)
+        response = client.get(f"{BASE_URL}/prescriptions/{prescription_id}/audit", headers=clinic_headers)
         if response.status_code == 200:
             audit_events = response.json()
             if isinstance(audit_events, list) and len(audit_events) > 0:
@@ -272,7 +273,7 @@ def main():
     # 9. POST /api/prescriptions/:id/publish (Publish to owner)
     print("9️⃣ Testing POST /api/prescriptions/:id/publish (Publish to owner)")
     try:
-        response = requests.post(f"{BASE_URL}/prescriptions/{prescription_id}/publish", headers=clinic_headers)
+        response = client.post(f"{BASE_URL}/prescriptions/{prescription_id}/publish", headers=clinic_headers)
         if response.status_code == 200:
             result = response.json()
             if result.get('success'):
@@ -291,7 +292,7 @@ def main():
     # 10. GET /api/prescriptions with Owner token
     print("🔟 Testing GET /api/prescriptions with Owner token")
     try:
-        response = requests.get(f"{BASE_URL}/prescriptions", headers=owner_headers)
+        response = client.get(f"{BASE_URL}/prescriptions", headers=owner_headers)
         if response.status_code == 200:
             owner_prescriptions = response.json()
             if isinstance(owner_prescriptions, list):
@@ -323,7 +324,7 @@ def main():
     
     # Test without auth
     try:
-        response = requests.post(f"{BASE_URL}/prescriptions", json={})
+        response = client.post(f"{BASE_URL}/prescriptions", json={})
         if response.status_code in [401, 403]:
             print_test_result("POST /api/prescriptions without auth", True, f"✅ Correctly blocked with {response.status_code}")
             auth_test_1 = True
@@ -336,7 +337,7 @@ def main():
     
     # Test with owner token
     try:
-        response = requests.post(f"{BASE_URL}/prescriptions", headers=owner_headers, json={})
+        response = client.post(f"{BASE_URL}/prescriptions", headers=owner_headers, json={})
         if response.status_code == 403:
             print_test_result("POST /api/prescriptions with owner token", True, f"✅ Correctly blocked owner with 403")
             auth_test_2 = True
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Estimate the client-bundle weight that each component and route imports.
+
+Walks the static import graph from the extracted components in
+app/components/* and from every app/**/page.js, resolving '@/...'
+aliases, relative paths and node_modules packages. Module weight is the
+gzip size of the module's source, so it is an estimate of shipped bytes:
+
+    lucide-react   one icons/<name>.js per named icon, plus the shared
+                   createLucideIcon runtime once
+    packages       the package's ESM entry plus its package.json
+                   dependencies (transitively, each counted once)
+    local files    the file itself plus everything it imports
+
+react, react-dom and next are the framework baseline every route pays;
+they are not counted. import() and next/dynamic edges are reported as
+lazy weight, not added to the route's first load.
+
+    python scripts/bundle_report.py [--threshold-kb 40] [--json report.json]
+    python scripts/extract_components.py --report
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import sys
+
+from js_lexer import parse_imports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPONENTS_DIR = os.path.join(ROOT, 'app', 'components')
+NODE_MODULES = os.path.join(ROOT, 'node_modules')
+ALIASES = [('@/components/', 'components/'), ('@/lib/', 'lib/'), ('@/app/', 'app/'), ('@/', '')]
+EXTENSIONS = ['', '.js', '.jsx', '.mjs', '.ts', '.tsx', '/index.js', '/index.jsx', '/index.mjs']
+FRAMEWORK = ('react', 'react-dom', 'next', 'scheduler')
+LUCIDE_RUNTIME = ['createLucideIcon.js', 'Icon.js', 'defaultAttributes.js', 'shared/src/utils.js']
+DEFAULT_THRESHOLD_KB = 40
+
+
+def package_name(specifier):
+    parts = specifier.split('/')
+    return '/'.join(parts[:2]) if specifier.startswith('@') else parts[0]
+
+
+def kebab(name):
+    """'CheckCircle2' -> 'check-circle-2' (lucide icon file names)"""
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1-\2', name)
+    name = re.sub(r'([A-Za-z])([0-9])', r'\1-\2', name)
+    return name.lower()
+
+
+class ModuleGraph:
+    """Resolve imports to weighted modules; every lookup is cached"""
+
+    def __init__(self, root=ROOT, node_modules=NODE_MODULES):
+        self.root = root
+        self.node_modules = node_modules
+        self.weights = {}       # module id -> (raw bytes, gzip bytes)
+        self.edges = {}         # module id -> (static deps, lazy deps)
+        self.unresolved = set()
+
+    def weigh(self, module_id, path):
+        if module_id not in self.weights:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self.unresolved.add(module_id)
+                data = b''
+            self.weights[module_id] = (len(data), len(gzip.compress(data, 9)) if data else 0)
+        return module_id
+
+    def resolve_file(self, base):
+        for ext in EXTENSIONS:
+            path = base + ext
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def resolve(self, specifier, importer_dir, names=()):
+        """Module ids that `import {names} from specifier` pulls in"""
+        if specifier.startswith('.'):
+            path = self.resolve_file(os.path.normpath(os.path.join(importer_dir, specifier)))
+            return [self.local(path)] if path else []
+        for alias, target in ALIASES:
+            if specifier.startswith(alias):
+                path = self.resolve_file(os.path.join(self.root, target + specifier[len(alias):]))
+                if path:
+                    return [self.local(path)]
+                self.unresolved.add(specifier)
+                return []
+        package = package_name(specifier)
+        if package in FRAMEWORK or specifier.endswith('.css'):
+            return []
+        if package == 'lucide-react':
+            return self.lucide(names)
+        return [self.package(package)]
+
+    def local(self, path):
+        module_id = os.path.relpath(path, self.root)
+        if module_id not in self.edges:
+            self.weigh(module_id, path)
+            self.edges[module_id] = ([], [])
+            if path.endswith(('.js', '.jsx', '.mjs', '.ts', '.tsx')):
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    source = f.read()
+                static, lazy = self.edges[module_id]
+                for imp in parse_imports(source):
+                    targets = self.resolve(imp.source, os.path.dirname(path), [n for n, _ in imp.names])
+                    (lazy if imp.kind == 'dynamic' else static).extend(targets)
+        return module_id
+
+    def lucide(self, names):
+        icons_dir = os.path.join(self.node_modules, 'lucide-react', 'dist', 'esm', 'icons')
+        runtime = []
+        for name in LUCIDE_RUNTIME:
+            module_id = f"lucide-react/{name}"
+            runtime.append(self.weigh(module_id, os.path.join(self.node_modules, 'lucide-react', 'dist', 'esm', name)))
+            self.edges.setdefault(module_id, ([], []))
+        icons = []
+        for name in names:
+            module_id = f"lucide-react/icons/{kebab(name)}"
+            self.weigh(module_id, os.path.join(icons_dir, f"{kebab(name)}.js"))
+            self.edges.setdefault(module_id, (runtime, []))
+            icons.append(module_id)
+        return icons
+
+    def package(self, package):
+        module_id = f"pkg:{package}"
+        if module_id in self.edges:
+            return module_id
+        self.edges[module_id] = ([], [])
+        package_dir = os.path.join(self.node_modules, package)
+        try:
+            with open(os.path.join(package_dir, 'package.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self.unresolved.add(package)
+            self.weights[module_id] = (0, 0)
+            return module_id
+        entry = meta.get('module') or meta.get('main') or 'index.js'
+        exports = meta.get('exports')
+        if isinstance(exports, dict):
+            dot = exports.get('.', exports)
+            if isinstance(dot, dict):
+                dot = dot.get('import') or dot.get('module') or dot.get('default') or entry
+                if isinstance(dot, dict):
+                    dot = dot.get('default', entry)
+            entry = dot if isinstance(dot, str) else entry
+        self.weigh(module_id, self.resolve_file(os.path.join(package_dir, entry)) or os.path.join(package_dir, entry))
+        self.edges[module_id][0].extend(self.package(dep) for dep in meta.get('dependencies', {})
+                                        if package_name(dep) not in FRAMEWORK)
+        return module_id
+
+    def closure(self, roots):
+        """All modules statically reachable from roots, plus the lazy edges leaving that set"""
+        seen, lazy = set(), set()
+        stack = list(roots)
+        while stack:
+            module_id = stack.pop()
+            if module_id in seen:
+                continue
+            seen.add(module_id)
+            static, dynamic = self.edges.get(module_id, ([], []))
+            stack.extend(static)
+            lazy.update(dynamic)
+        return seen, lazy - seen
+
+    def size(self, modules):
+        raw = sum(self.weights.get(m, (0, 0))[0] for m in modules)
+        gz = sum(self.weights.get(m, (0, 0))[1] for m in modules)
+        return raw, gz
+
+
+def breakdown(graph, modules):
+    """Group a module set by origin: icons, each package, local files"""
+    groups = {}
+    for module_id in modules:
+        if module_id.startswith('lucide-react/'):
+            group = 'lucide-react'
+        elif module_id.startswith('pkg:'):
+            group = module_id[4:]
+        elif module_id.startswith('components/ui/'):
+            group = 'shadcn'
+        else:
+            group = 'local'
+        raw, gz = graph.weights.get(module_id, (0, 0))
+        entry = groups.setdefault(group, {'modules': 0, 'raw': 0, 'gzip': 0})
+        entry['modules'] += 1
+        entry['raw'] += raw
+        entry['gzip'] += gz
+    return dict(sorted(groups.items(), key=lambda item: -item[1]['gzip']))
+
+
+def analyze(graph, files):
+    results = {}
+    for path in files:
+        module_id = graph.local(path)
+        modules, lazy = graph.closure([module_id])
+        lazy_modules, _ = graph.closure(lazy)
+        raw, gz = graph.size(modules)
+        results[module_id] = {
+            'raw': raw,
+            'gzip': gz,
+            'modules': len(modules),
+            'icons': sum(1 for m in modules if m.startswith('lucide-react/icons/')),
+            'packages': sorted(m[4:] for m in modules if m.startswith('pkg:')),
+            'groups': breakdown(graph, modules),
+            'lazy_gzip': graph.size(lazy_modules - modules)[1],
+        }
+    return results
+
+
+def print_table(title, results, threshold_kb):
+    print(f"\n{title}")
+    print(f"{'module':<60} {'gzip':>8} {'raw':>9} {'icons':>5} {'pkgs':>4} {'lazy':>8}  heaviest")
+    for module_id, r in sorted(results.items(), key=lambda item: -item[1]['gzip']):
+        heaviest = ', '.join(f"{g} {v['gzip'] / 1024:.1f}K" for g, v in list(r['groups'].items())[:3])
+        flag = ' ⚠️' if r['gzip'] > threshold_kb * 1024 else ''
+        print(f"{module_id[-60:]:<60} {r['gzip'] / 1024:>7.1f}K {r['raw'] / 1024:>8.1f}K "
+              f"{r['icons']:>5} {len(r['packages']):>4} {r['lazy_gzip'] / 1024:>7.1f}K  {heaviest}{flag}")
+
+
+def report(components_dir=COMPONENTS_DIR, routes_glob=None, threshold_kb=DEFAULT_THRESHOLD_KB, json_path=None):
+    graph = ModuleGraph()
+    component_files = sorted(p for p in glob.glob(os.path.join(components_dir, '*', '*.js'))
+                             if os.sep + 'ui' + os.sep not in p)
+    route_files = sorted(glob.glob(routes_glob or os.path.join(ROOT, 'app', '**', 'page.js'), recursive=True))
+    components = analyze(graph, component_files)
+    routes = analyze(graph, route_files)
+
+    print_table("COMPONENTS (static import closure, gzip estimate)", components, threshold_kb)
+    print_table("ROUTES (first-load estimate, framework excluded)", routes, threshold_kb)
+    heavy = [m for m, r in components.items() if r['gzip'] > threshold_kb * 1024]
+    print(f"\n{len(heavy)} component(s) above {threshold_kb}KB gzip: dynamic-import candidates")
+    for module_id in sorted(heavy, key=lambda m: -components[m]['gzip']):
+        print(f"  ⚠️  {module_id} ({components[module_id]['gzip'] / 1024:.1f}KB, "
+              f"{components[module_id]['icons']} icons, packages: {', '.join(components[module_id]['packages']) or '-'})")
+    if graph.unresolved:
+        missing = sorted(graph.unresolved)
+        print(f"\n⚠️  {len(missing)} import(s) could not be sized (run yarn install for node_modules sizes): "
+              f"{', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump({'threshold_kb': threshold_kb, 'components': components, 'routes': routes,
+                       'unresolved': sorted(graph.unresolved)}, f, indent=2)
+        print(f"\nReport written to {json_path}")
+    return components, routes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate per-component and per-route import weight")
+    parser.add_argument('--components-dir', default=COMPONENTS_DIR)
+    parser.add_argument('--routes', help="glob of route entry files (default app/**/page.js)")
+    parser.add_argument('--threshold-kb', type=float, default=DEFAULT_THRESHOLD_KB,
+                        help="flag components whose gzip import weight exceeds this")
+    parser.add_argument('--json', help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    report(args.components_dir, args.routes, args.threshold_kb, args.json)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,83 @@
 #!/usr/bin/env python3
-"""Extract large components from page.js into separate files."""
+"""Extract large components from page.js into separate files.
 
+Extraction is incremental: .extract-manifest.json in the components
+directory records, per generated file, the hash of its source span and of
+the output written. A file is only rewritten when its span, this script,
+js_lexer.py or the file on disk changed, so untouched components keep
+their mtimes and next build keeps its cache. --force regenerates everything.
+
+Any number of files or globs can be given; each one is split in its own
+worker process and the results go into the one manifest:
+
+    python scripts/extract_components.py                  # app/page.js
+    python scripts/extract_components.py 'app/**/page.js' app/components/landing/*.js -j 4
+
+Components from files other than app/page.js take their imports from the
+source file itself; one that needs a module-level constant or a component
+left behind is skipped. replace_components.py with the same arguments then
+swaps the extracted definitions for imports.
+
+Generated import lists are pruned with the lexer: a name is only imported
+if the component references it as an identifier or JSX tag, not merely in
+a comment or string. --prune [--dry-run] applies the same pass to the
+existing files in the components directory and reports the bytes saved.
+
+With --report, nothing is extracted: the import weight of the generated
+components and of each route is estimated instead (see bundle_report.py).
+"""
+
+import argparse
+import glob
+import hashlib
+import json
 import re
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import js_lexer
+from js_lexer import component_spans, parse_imports, tokenize, top_level_declarations
 
 PAGE_JS = '/app/app/page.js'
 COMPONENTS_DIR = '/app/app/components'
+MANIFEST_NAME = '.extract-manifest.json'
+
+# app/page.js components to extract with their target directories
+TO_EXTRACT = {
+    'ClinicAgenda': 'clinic',
+    'ClinicPatients': 'clinic',
+    'ClinicSettings': 'clinic',
+    'ClinicInvoicing': 'clinic',
+    'ClinicLabAnalysis': 'clinic',
+    'ClinicTemplates': 'clinic',
+    'ClinicReports': 'clinic',
+    'ClinicDocuments': 'clinic',
+    'ClinicRewardsManagement': 'clinic',
+    'ClinicServices': 'clinic',
+    'ClinicVideoConsult': 'clinic',
+    'ClinicEvents': 'clinic',
+    'ClinicAutomations': 'clinic',
+    'ClinicArchive': 'clinic',
+    'ClinicFeedbackPage': 'clinic',
+    'ClinicReviews': 'clinic',
+    'OwnerAppointments': 'owner',
+    'OwnerDocuments': 'owner',
+    'OwnerMessages': 'owner',
+    'OwnerPets': 'owner',
+    'OwnerEvents': 'owner',
+    'OwnerRewardsSection': 'owner',
+    'OwnerReviews': 'owner',
+    'OwnerInvoices': 'owner',
+    'OwnerProfile': 'owner',
+    'PetProfile': 'owner',
+    'FindClinic': 'owner',
+    'InviteClinic': 'owner',
+    'LabDashboard': 'lab',
+    'AdminDashboard': 'admin',
+    'StaffDashboard': 'staff',
+}
 
 # All known lucide-react icons used in the project
 ALL_ICONS = [
@@ -72,63 +144,79 @@ SHARED_IMPORTS = {
 }
 
 
-def find_used_icons(code):
+# One pass over the source: every identifier, and which of them open/close a JSX tag
+TOKEN_RE = re.compile(r'(</?)?([A-Za-z_$][\w$]*)')
+ICON_SET = frozenset(ALL_ICONS)
+REACT_HOOKS = ['useState', 'useEffect', 'useRef', 'useCallback', 'useMemo']
+SHARED_UTILS = ['getPetSpeciesInfo', 'PetAvatar', 'NewBrandLogo', 'calculateAge']
+
+
+def scan_identifiers(code):
+    """Tokenize once; return (identifiers, jsx_tag_names) referenced in the code."""
+    identifiers = set()
+    tags = set()
+    for match in TOKEN_RE.finditer(code):
+        name = match.group(2)
+        identifiers.add(name)
+        if match.group(1):
+            tags.add(name)
+    return identifiers, tags
+
+
+def find_used_icons(identifiers):
     """Find all lucide-react icons used in component code."""
-    used = set()
-    for icon in ALL_ICONS:
-        # Match <IconName or icon={IconName} or Icon={IconName}
-        patterns = [
-            rf'<{icon}[\s/>]',
-            rf'icon=\{{{icon}\}}',
-            rf'Icon=\{{{icon}\}}',
-            rf'\b{icon}\b',
-        ]
-        for pat in patterns:
-            if re.search(pat, code):
-                used.add(icon)
-                break
+    used = identifiers & ICON_SET
     # Special case: Image is both an icon and a keyword
-    if 'Image' in used and 'ImageIcon' in code:
+    if 'Image' in used and 'ImageIcon' in identifiers:
         used.add('ImageIcon')
     return sorted(used)
 
 
-def find_used_shadcn(code):
-    """Find all shadcn components used in component code."""
+def find_used_shadcn(tags):
+    """Find all shadcn components used as JSX tags."""
     used = {}
-    for comp, path in ALL_SHADCN.items():
-        if re.search(rf'<{comp}[\s/>]|</{comp}>', code):
-            if path not in used:
-                used[path] = []
-            used[path].append(comp)
+    for comp in sorted(tags & ALL_SHADCN.keys()):
+        used.setdefault(ALL_SHADCN[comp], []).append(comp)
     return used
 
 
-def find_react_hooks(code):
+def find_react_hooks(identifiers):
     """Find React hooks used."""
-    hooks = []
-    for hook in ['useState', 'useEffect', 'useRef', 'useCallback', 'useMemo']:
-        if hook in code:
-            hooks.append(hook)
-    return hooks
+    return [hook for hook in REACT_HOOKS if hook in identifiers]
+
+
+DECLARATION_KEYWORDS = ('function', 'class', 'const', 'let', 'var')
+
+
+def declared_names(tokens):
+    """Names the code binds with function/class/const/let/var (simple bindings only)."""
+    names = set()
+    for previous, token in zip(tokens, tokens[1:]):
+        if token.kind == 'ident' and previous.kind == 'ident' and previous.value in DECLARATION_KEYWORDS:
+            names.add(token.value)
+    return names
 
 
 def generate_imports(code, func_name):
     """Generate all necessary imports for a component."""
     imports = ["'use client';\n"]
+    identifiers, tags = scan_identifiers(code)
+    # Never import a name the component declares itself (e.g. NewBrandLogo from shared/utils)
+    identifiers -= declared_names(tokenize(code)) | {func_name}
+    tags &= identifiers
     
     # React hooks
-    hooks = find_react_hooks(code)
+    hooks = find_react_hooks(identifiers)
     if hooks:
         imports.append(f"import {{ {', '.join(hooks)} }} from 'react';")
     
     # Shadcn components
-    shadcn = find_used_shadcn(code)
+    shadcn = find_used_shadcn(tags)
     for path, comps in sorted(shadcn.items()):
         imports.append(f"import {{ {', '.join(sorted(set(comps)))} }} from '{path}';")
     
     # Lucide icons
-    icons = find_used_icons(code)
+    icons = find_used_icons(identifiers)
     if icons:
         # Handle Image/ImageIcon alias
         icon_imports = []
@@ -143,121 +231,380 @@ def generate_imports(code, func_name):
             imports.append(f"import {{ {', '.join(icon_imports)} }} from 'lucide-react';")
     
     # API
-    if 'api.' in code or "api.get" in code or "api.post" in code or "api.put" in code or "api.delete" in code:
+    if 'api' in identifiers and 'api.' in code:
         imports.append("import api from '@/app/lib/api';")
     
     # Shared utils
-    shared_needed = []
-    if 'getPetSpeciesInfo' in code:
-        shared_needed.append('getPetSpeciesInfo')
-    if 'PetAvatar' in code:
-        shared_needed.append('PetAvatar')
-    if 'NewBrandLogo' in code:
-        shared_needed.append('NewBrandLogo')
-    if 'calculateAge' in code and 'const calculateAge' not in code:
-        shared_needed.append('calculateAge')
+    shared_needed = [name for name in SHARED_UTILS if name in identifiers]
     if shared_needed:
         imports.append(f"import {{ {', '.join(shared_needed)} }} from '@/app/components/shared/utils';")
     
     return '\n'.join(imports)
 
 
-def extract_component(lines, func_name, start_idx, end_idx):
-    """Extract a component and generate its standalone file."""
-    code_lines = lines[start_idx:end_idx + 1]
-    code = '\n'.join(code_lines)
+# Never pruned: the classic JSX runtime needs React in scope without naming it
+KEEP_IMPORTS = {'React'}
+
+
+def referenced_names(tokens, skip=()):
+    """Names the code really uses: identifiers and JSX tag roots.
+
+    Strings, comments, JSX text and property names (`x.Check`) don't count,
+    nor do tokens inside the (start, end) ranges in skip, i.e. the imports.
+    """
+    names = set()
+    previous = None
+    for token in tokens:
+        if any(start <= token.start < end for start, end in skip):
+            continue
+        if token.kind == 'ident' and not (previous and previous.kind == 'punct' and previous.value in ('.', '?.')):
+            names.add(token.value)
+        elif token.kind == 'jsx_tag':
+            names.add(token.value.split('.')[0])
+        previous = token
+    return names
+
+
+def import_statement(imp, default, names, quote):
+    specifiers = [default] if default else []
+    if names:
+        specifiers.append('{ ' + ', '.join(a if a == b else f'{a} as {b}' for a, b in names) + ' }')
+    return f"import {', '.join(specifiers)} from {quote}{imp.source}{quote};"
+
+
+def prune_imports(content):
+    """Drop imported names the file never references; returns (content, removed names).
+
+    Import statements that lose nothing are left exactly as written; ones
+    that lose everything are removed with their line.
+    """
+    tokens = tokenize(content)
+    imports = [imp for imp in parse_imports(content, tokens) if imp.kind == 'static']
+    used = referenced_names(tokens, [(imp.start, imp.end) for imp in imports]) | KEEP_IMPORTS
+    removed = []
+    for imp in reversed(imports):
+        if imp.namespace:
+            if imp.namespace in used:
+                continue
+            default, names, dropped = None, [], [imp.namespace]
+        else:
+            default = imp.default if imp.default in used else None
+            names = [(a, b) for a, b in imp.names if b in used]
+            dropped = [local for local in [imp.default] + [b for a, b in imp.names] if local and local not in used]
+            if not dropped:
+                continue
+        removed = dropped + removed
+        start, end = imp.start, imp.end
+        if default or names:
+            quote = '"' if f'"{imp.source}"' in content[start:end] else "'"
+            replacement = import_statement(imp, default, names, quote)
+        else:
+            replacement = ''
+            if content[end:end + 1] == '\n':
+                end += 1
+        content = content[:start] + replacement + content[end:]
+    return content, removed
+
+
+def rebase_specifier(specifier, source_dir, file_dir):
+    """Rewrite a relative import so it still resolves from file_dir"""
+    if not specifier.startswith('.'):
+        return specifier
+    rebased = os.path.relpath(os.path.normpath(os.path.join(source_dir, specifier)), file_dir)
+    return rebased if rebased.startswith('.') else './' + rebased
+
+
+def source_imports(source, page_path, span, file_dir, siblings):
+    """Imports a component lifted out of a file other than PAGE_JS needs.
+
+    The curated import maps only describe app/page.js, so the header is
+    built from the source file itself: its directive, its own static imports
+    the span references (relative paths rebased onto file_dir) and a default
+    import for each sibling component extracted alongside it. Returns
+    (header, unresolved): any other top-level binding of the source the span
+    references (a module constant, a component left behind) can't be carried
+    over, and the caller skips the component.
+    """
+    code = source[span.start:span.end]
+    tokens = tokenize(code)
+    used = referenced_names(tokens) - declared_names(tokens)
+    header = []
+    if re.match(r"\s*(['\"])use client\1", source):
+        header.append("'use client';\n")
+    bound = set()
+    source_dir = os.path.dirname(os.path.abspath(page_path))
+    for imp in parse_imports(source):
+        if imp.kind != 'static':
+            continue
+        if imp.namespace:
+            if imp.namespace not in used:
+                continue
+            bound.add(imp.namespace)
+            target = rebase_specifier(imp.source, source_dir, file_dir)
+            header.append(f"import * as {imp.namespace} from '{target}';")
+            continue
+        default = imp.default if imp.default in used else None
+        names = [(a, b) for a, b in imp.names if b in used]
+        if not (default or names):
+            continue
+        bound.update([default] if default else [])
+        bound.update(b for a, b in names)
+        header.append(import_statement(imp._replace(source=rebase_specifier(imp.source, source_dir, file_dir)),
+                                       default, names, "'"))
+    unresolved = []
+    for declaration in top_level_declarations(source):
+        name = declaration.name
+        if not name or declaration.start == span.start or name not in used or name in bound:
+            continue
+        if name in siblings:
+            header.append(f"import {name} from './{name}';")
+        else:
+            unresolved.append(name)
+    return '\n'.join(header), sorted(unresolved)
+
+
+def extract_component(source, func_name, span, header=None):
+    """Extract a component and generate its standalone file.
+
+    header replaces the generated imports (see source_imports).
+    """
+    code = source[span.start:span.end]
+    
+    imports = generate_imports(code, func_name) if header is None else header
     
-    imports = generate_imports(code, func_name)
+    # Build the file (`export default function X` already exports itself)
+    footer = '' if span.default else f"\n\nexport default {func_name};"
+    file_content = f"{imports}\n\n{code}{footer}\n"
+    # generate_imports matches words anywhere, comments and strings included
+    return prune_imports(file_content)[0]
+
+
+def prune_components(components_dir, dry_run=False):
+    """Prune imports in every generated component file and report bytes saved"""
+    total = 0
+    for path in sorted(glob.glob(os.path.join(components_dir, '*', '*.js'))):
+        if os.sep + 'ui' + os.sep in path:
+            continue
+        before = read_text(path)
+        after, removed = prune_imports(before)
+        if not removed:
+            continue
+        saved = len(before.encode('utf-8')) - len(after.encode('utf-8'))
+        total += saved
+        print(f"  ✂️  {os.path.relpath(path, components_dir)}: -{saved} bytes ({', '.join(removed)})")
+        if not dry_run:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(after)
+    print(f"\n{total} bytes of unused imports {'found' if dry_run else 'removed'}")
+    return total
+
+
+def sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# Any change to the generator or to the lexer that finds the spans invalidates every manifest entry
+GENERATOR_FILES = (os.path.abspath(__file__), os.path.abspath(js_lexer.__file__))
+_generator_hash = hashlib.sha256()
+for _path in GENERATOR_FILES:
+    with open(_path, 'rb') as _f:
+        _generator_hash.update(_f.read())
+GENERATOR_HASH = _generator_hash.hexdigest()[:16]
+
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('generator') != GENERATOR_HASH:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(path, files):
+    with open(path, 'w') as f:
+        json.dump({'generator': GENERATOR_HASH, 'files': files}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def read_text(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_if_changed(source, func_name, span, file_path, entry, force=False, header=None):
+    """Regenerate file_path unless its manifest entry is still current.
+
+    Returns (status, manifest entry); status is 'unchanged', 'written' or
+    'same' (regenerated, but identical to the file on disk: not rewritten).
+    """
+    span_hash = sha256(source[span.start:span.end] + (header or ''))
+    on_disk = read_text(file_path)
+    disk_hash = sha256(on_disk) if on_disk is not None else None
+    if (not force and entry and entry.get('span') == span_hash
+            and disk_hash is not None and entry.get('output') == disk_hash):
+        return 'unchanged', entry
     
-    # Build the file
-    file_content = f"{imports}\n\n{code}\n\nexport default {func_name};\n"
-    return file_content
+    file_content = extract_component(source, func_name, span, header)
+    output_hash = sha256(file_content)
+    entry = {'span': span_hash, 'output': output_hash}
+    if output_hash == disk_hash:
+        return 'same', entry
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(file_content)
+    return 'written', entry
+
+
+def plan_extraction(page_path, source, func_ranges, min_lines=0):
+    """{component: subdir} to extract from one file.
 
+    PAGE_JS uses the curated TO_EXTRACT map. Any other file gives up every
+    top-level component except its own default export / namesake and
+    dynamic(() => import(...)) wrappers, into a subdir named after the
+    file's directory (app/admin/page.js -> admin/, app/blog/[slug] -> slug/).
+    replace_components.py then swaps them for imports in that file.
+    """
+    if os.path.abspath(page_path) == os.path.abspath(PAGE_JS):
+        return dict(TO_EXTRACT)
+    subdir = os.path.basename(os.path.dirname(os.path.abspath(page_path))).strip('[]()')
+    own_name = os.path.splitext(os.path.basename(page_path))[0]
+    return {name: subdir for name, span in func_ranges.items()
+            if not span.default and name != own_name
+            and 'import(' not in source[span.start:span.end]
+            and span.end_line - span.start_line + 1 >= min_lines}
 
-def main():
-    with open(PAGE_JS, 'r') as f:
-        lines = f.readlines()
+
+def extract_file(page_path, components_dir, manifest, force=False, min_lines=0):
+    """Extract one file's components; runs in a worker process for multi-file runs"""
+    started = time.perf_counter()
+    with open(page_path, 'r', encoding='utf-8') as f:
+        source = f.read()
     
-    lines_content = [l.rstrip('\n') for l in lines]
+    # Exact top-level component spans (function, export function, arrow consts...)
+    func_ranges = component_spans(source)
+    results, entries = [], {}
+    plan = plan_extraction(page_path, source, func_ranges, min_lines)
+    for func_name in [name for name in plan if name not in func_ranges]:
+        results.append((func_name, None, 'missing', 0))
+        del plan[func_name]
     
-    # Find all function definitions
-    functions = []
-    for i, line in enumerate(lines_content):
-        if line.startswith('function '):
-            match = re.match(r'function\s+(\w+)', line)
-            if match:
-                functions.append((i, match.group(1)))
+    # Other files carry their own imports; drop components that depend on
+    # module-level code, until every sibling import points at a real file
+    headers = {}
+    while os.path.abspath(page_path) != os.path.abspath(PAGE_JS):
+        blocked = {}
+        for func_name, subdir in plan.items():
+            file_dir = os.path.join(os.path.abspath(components_dir), subdir)
+            headers[func_name], unresolved = source_imports(
+                source, page_path, func_ranges[func_name], file_dir, plan)
+            if unresolved:
+                blocked[func_name] = unresolved
+        if not blocked:
+            break
+        for func_name, unresolved in blocked.items():
+            span = func_ranges[func_name]
+            results.append((func_name, ', '.join(unresolved), 'unresolved', span.end_line - span.start_line + 1))
+            del plan[func_name]
     
-    # Map function -> (start_idx, end_idx)
-    func_ranges = {}
-    for idx, (start, name) in enumerate(functions):
-        if idx + 1 < len(functions):
-            end = functions[idx + 1][0] - 1
-        else:
-            end = len(lines_content) - 1
-        func_ranges[name] = (start, end)
+    for func_name, subdir in plan.items():
+        span = func_ranges[func_name]
+        size = span.end_line - span.start_line + 1
+        os.makedirs(os.path.join(components_dir, subdir), exist_ok=True)
+        
+        # Generate file (only written when its inputs changed)
+        rel_path = f'{subdir}/{func_name}.js'
+        status, entry = write_if_changed(
+            source, func_name, span, os.path.join(components_dir, rel_path), manifest.get(rel_path), force,
+            headers.get(func_name))
+        entries[rel_path] = dict(entry, source=page_path)
+        results.append((func_name, rel_path, status, size))
+    return {'path': page_path, 'seconds': time.perf_counter() - started, 'results': results, 'entries': entries}
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            print(f"  SKIP: {pattern} matches no files")
+        paths.extend(p for p in matches if p not in paths)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract large components into app/components/<subdir>/")
+    parser.add_argument('inputs', nargs='*', default=[PAGE_JS],
+                        help="files or globs to split, e.g. 'app/**/page.js' (default app/page.js)")
+    parser.add_argument('--components-dir', default=COMPONENTS_DIR)
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for multi-file runs")
+    parser.add_argument('--min-lines', type=int, default=0,
+                        help="only extract components at least this long (files other than app/page.js)")
+    parser.add_argument('--force', action='store_true', help="ignore the manifest and regenerate everything")
+    parser.add_argument('--report', action='store_true',
+                        help="estimate import weight of the extracted components instead of extracting")
+    parser.add_argument('--prune', action='store_true',
+                        help="only drop unused imports from the existing component files")
+    parser.add_argument('--dry-run', action='store_true', help="with --prune: report, don't rewrite")
+    args = parser.parse_args(argv)
     
-    # Components to extract with their target directories
-    to_extract = {
-        'ClinicAgenda': 'clinic',
-        'ClinicPatients': 'clinic',
-        'ClinicSettings': 'clinic',
-        'ClinicInvoicing': 'clinic',
-        'ClinicLabAnalysis': 'clinic',
-        'ClinicTemplates': 'clinic',
-        'ClinicReports': 'clinic',
-        'ClinicDocuments': 'clinic',
-        'ClinicRewardsManagement': 'clinic',
-        'ClinicServices': 'clinic',
-        'ClinicVideoConsult': 'clinic',
-        'ClinicEvents': 'clinic',
-        'ClinicAutomations': 'clinic',
-        'ClinicArchive': 'clinic',
-        'ClinicFeedbackPage': 'clinic',
-        'ClinicReviews': 'clinic',
-        'OwnerAppointments': 'owner',
-        'OwnerDocuments': 'owner',
-        'OwnerMessages': 'owner',
-        'OwnerPets': 'owner',
-        'OwnerEvents': 'owner',
-        'OwnerRewardsSection': 'owner',
-        'OwnerReviews': 'owner',
-        'OwnerInvoices': 'owner',
-        'OwnerProfile': 'owner',
-        'PetProfile': 'owner',
-        'FindClinic': 'owner',
-        'InviteClinic': 'owner',
-        'LabDashboard': 'lab',
-        'AdminDashboard': 'admin',
-        'StaffDashboard': 'staff',
-    }
+    if args.report:
+        from bundle_report import report
+        report(args.components_dir)
+        return
+    if args.prune:
+        prune_components(args.components_dir, args.dry_run)
+        return
     
-    # Extract each component
+    paths = expand_inputs(args.inputs)
+    manifest_path = os.path.join(args.components_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    started = time.perf_counter()
+    
+    jobs = max(1, min(args.jobs, len(paths)))
+    if jobs == 1:
+        outcomes = [extract_file(p, args.components_dir, manifest, args.force, args.min_lines) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(extract_file, paths, repeat(args.components_dir), repeat(manifest),
+                                     repeat(args.force), repeat(args.min_lines)))
+    
+    # Report per file, in input order, and merge into one manifest
     total_extracted = 0
-    for func_name, subdir in to_extract.items():
-        if func_name not in func_ranges:
-            print(f"  SKIP: {func_name} not found")
-            continue
-        
-        start, end = func_ranges[func_name]
-        size = end - start + 1
-        
-        # Create directory
-        dir_path = os.path.join(COMPONENTS_DIR, subdir)
-        os.makedirs(dir_path, exist_ok=True)
-        
-        # Generate file
-        file_content = extract_component(lines_content, func_name, start, end)
-        file_path = os.path.join(dir_path, f'{func_name}.js')
-        
-        with open(file_path, 'w') as f:
-            f.write(file_content)
-        
-        total_extracted += size
-        print(f"  ✅ {func_name} -> components/{subdir}/{func_name}.js ({size} lines)")
+    written = unchanged = 0
+    owners = {}
+    for outcome in outcomes:
+        print(f"\n{outcome['path']} ({outcome['seconds'] * 1000:.0f}ms)")
+        if not outcome['results']:
+            print("  no components to extract")
+        for func_name, rel_path, status, size in outcome['results']:
+            if status == 'missing':
+                print(f"  SKIP: {func_name} not found")
+                continue
+            if status == 'unresolved':
+                print(f"  SKIP: {func_name} uses module-level {rel_path}, which is not carried over")
+                continue
+            if rel_path in owners:
+                print(f"  ⚠️  {rel_path} also extracted from {owners[rel_path]}; last one wins")
+            owners[rel_path] = outcome['path']
+            total_extracted += size
+            if status == 'written':
+                written += 1
+                print(f"  ✅ {func_name} -> components/{rel_path} ({size} lines)")
+            else:
+                unchanged += 1
+                print(f"  ·  {func_name} unchanged ({size} lines)")
+        manifest.update(outcome['entries'])
     
-    print(f"\nTotal extracted: {total_extracted} lines")
-    print(f"Files created in {COMPONENTS_DIR}/")
+    save_manifest(manifest_path, manifest)
+    print(f"\nTotal extracted: {total_extracted} lines from {len(paths)} file(s) "
+          f"in {time.perf_counter() - started:.2f}s ({jobs} worker(s))")
+    print(f"{written} file(s) written, {unchanged} unchanged in {args.components_dir}/")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""Minimal JS/JSX lexer for finding exact top-level declaration spans.
+
+One linear pass splits the source into identifiers, punctuation, strings,
+template literals, regex literals, comments and JSX text. Each token is
+tagged with its bracket depth. Nesting is tracked on one stack, so braces
+and parentheses inside strings, templates (including ${...}), regexes,
+comments and JSX text never count. That gives exact spans for:
+
+    function X() {...}              export function X() {...}
+    export default function X() {}  async function X() {...}
+    const X = (props) => {...};     const X = () => (<div>...</div>)
+    class X extends Y {...}         export const X = memo(function () {...});
+
+Nested helpers stay inside their parent's span, and trailing constants
+are separate declarations.
+
+    python scripts/js_lexer.py app/admin/page.js   # list declarations
+"""
+
+import bisect
+import re
+import sys
+from collections import namedtuple
+
+Token = namedtuple('Token', 'kind value start end depth')
+Declaration = namedtuple('Declaration', 'name kind start end start_line end_line exported default')
+# kind: 'static' (import ... from), 'side_effect' (import 'x'), 'reexport' (export ... from), 'dynamic' (import('x'))
+Import = namedtuple('Import', 'source kind default namespace names start end')
+
+WHITESPACE_RE = re.compile(r'\s+')
+IDENT_RE = re.compile(r'[A-Za-z_$\u00c0-\uffff][\w$\u00c0-\uffff]*')
+NUMBER_RE = re.compile(r'\.?\d[\w.]*')
+STRING_RE = {
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'?", re.S),
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"?', re.S),
+}
+JSX_STRING_RE = {"'": re.compile(r"'[^']*'?"), '"': re.compile(r'"[^"]*"?')}
+LINE_COMMENT_RE = re.compile(r'//[^\n]*')
+BLOCK_COMMENT_RE = re.compile(r'/\*.*?(?:\*/|\Z)', re.S)
+REGEX_RE = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+TEMPLATE_CHUNK_RE = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*', re.S)
+PUNCT_RE = re.compile(r'=>|\.\.\.|[=!]==?|&&=?|\|\|=?|\?\?=?|\?\.(?!\d)|<<=?|>>>?=?|[<>]=|\+\+|--|[-+*/%&|^]=|.', re.S)
+JSX_NAME_RE = re.compile(r'[A-Za-z_$][\w$.:-]*')
+JSX_TEXT_RE = re.compile(r'[^<{]+')
+
+# After these, `/` starts a regex and `<` starts JSX rather than being an operator
+EXPRESSION_KEYWORDS = frozenset([
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await', 'export', 'default',
+])
+VALUE_PUNCT = frozenset([')', ']'])
+OPENERS = {'{': '}', '(': ')', '[': ']'}
+CLOSERS = frozenset(['}', ')', ']', '>', '/>'])
+DECLARATION_KEYWORDS = frozenset(['function', 'class', 'const', 'let', 'var'])
+# A line starting with one of these continues the previous statement
+CONTINUATION_PUNCT = frozenset([
+    '.', '?.', '?', ':', ',', '=', '=>', '+', '-', '*', '/', '%', '&&', '||', '??', '&', '|', '^',
+    '==', '===', '!=', '!==', '<', '>', '<=', '>=', 'instanceof', 'in',
+])
+
+
+class JSLexer:
+    """Tokenize JS/JSX source; frames on self.stack track brackets, templates and JSX"""
+
+    def __init__(self, source):
+        self.src = source
+        self.pos = 0
+        self.tokens = []
+        self.stack = []
+        self.expression_allowed = True
+
+    def emit(self, kind, start, end, depth=None):
+        self.tokens.append(Token(kind, self.src[start:end], start, end,
+                                 len(self.stack) if depth is None else depth))
+        self.pos = end
+
+    def run(self):
+        src = self.src
+        while self.pos < len(src):
+            frame = self.stack[-1][0] if self.stack else None
+            if frame == 'jsx_tag':
+                self.lex_jsx_tag()
+            elif frame == 'jsx_children':
+                self.lex_jsx_children()
+            else:
+                self.lex_js()
+        return self.tokens
+
+    # JavaScript
+
+    def lex_js(self):
+        src, pos = self.src, self.pos
+        ch = src[pos]
+        match = WHITESPACE_RE.match(src, pos)
+        if match:
+            self.pos = match.end()
+            return
+        if src.startswith('//', pos):
+            self.emit('comment', pos, LINE_COMMENT_RE.match(src, pos).end())
+            return
+        if src.startswith('/*', pos):
+            self.emit('comment', pos, BLOCK_COMMENT_RE.match(src, pos).end())
+            return
+        if ch in STRING_RE:
+            self.emit('string', pos, STRING_RE[ch].match(src, pos).end())
+            self.expression_allowed = False
+            return
+        if ch == '`':
+            self.lex_template(pos, pos + 1)
+            return
+        match = IDENT_RE.match(src, pos)
+        if match:
+            self.emit('ident', pos, match.end())
+            self.expression_allowed = match.group() in EXPRESSION_KEYWORDS
+            return
+        match = NUMBER_RE.match(src, pos)
+        if match:
+            self.emit('number', pos, match.end())
+            self.expression_allowed = False
+            return
+        if ch == '/' and self.expression_allowed:
+            match = REGEX_RE.match(src, pos)
+            if match:
+                self.emit('regex', pos, match.end())
+                self.expression_allowed = False
+                return
+        if ch == '<' and self.expression_allowed and pos + 1 < len(src) \
+                and (src[pos + 1] == '>' or IDENT_RE.match(src, pos + 1)):
+            self.emit('punct', pos, pos + 1)
+            self.stack.append(['jsx_tag', False, None])
+            return
+        if ch in OPENERS:
+            self.emit('punct', pos, pos + 1)
+            self.stack.append([ch, None, None])
+            self.expression_allowed = True
+            return
+        if ch in '}])':
+            self.close(ch, pos)
+            return
+        punct = PUNCT_RE.match(src, pos).group()
+        self.emit('punct', pos, pos + len(punct))
+        self.expression_allowed = punct not in VALUE_PUNCT
+
+    def close(self, ch, pos):
+        """Pop back to the matching opener (tolerating unbalanced input)"""
+        opener = {'}': '{', ')': '(', ']': '['}[ch]
+        while self.stack and self.stack[-1][0] != opener:
+            if self.stack[-1][0] in ('jsx_tag', 'jsx_children'):
+                break
+            self.stack.pop()
+        role = None
+        if self.stack and self.stack[-1][0] == opener:
+            role = self.stack.pop()[1]
+        self.emit('punct', pos, pos + 1)
+        if role == 'template':
+            self.lex_template(self.pos, self.pos)
+        elif role == 'jsx':
+            # Back in a JSX tag or children; the frame below decides
+            self.expression_allowed = False
+        else:
+            self.expression_allowed = ch == '}'
+
+    def lex_template(self, start, pos):
+        """Scan template text up to the closing backtick or the next ${"""
+        src = self.src
+        end = TEMPLATE_CHUNK_RE.match(src, pos).end()
+        if src.startswith('${', end):
+            self.emit('template', start, end + 2)
+            self.stack.append(['{', 'template', None])
+            self.expression_allowed = True
+        else:
+            end = min(len(src), end + 1)
+            self.emit('template', start, end)
+            self.expression_allowed = False
+
+    # JSX
+
+    def lex_jsx_tag(self):
+        src, pos = self.src, self.pos
+        frame = self.stack[-1]
+        match = WHITESPACE_RE.match(src, pos)
+        if match:
+            self.pos = match.end()
+            return
+        ch = src[pos]
+        if src.startswith('//', pos) or src.startswith('/*', pos):
+            pattern = LINE_COMMENT_RE if src[pos + 1] == '/' else BLOCK_COMMENT_RE
+            self.emit('comment', pos, pattern.match(src, pos).end())
+        elif ch == '/' and frame[2] is None and not frame[1]:
+            frame[1] = True  # closing tag: </name> or </>
+            self.emit('punct', pos, pos + 1)
+        elif ch == '/' and src.startswith('/>', pos):
+            self.stack.pop()
+            self.emit('punct', pos, pos + 2)
+            self.end_element()
+        elif ch == '>':
+            closing = frame[1]
+            self.stack.pop()
+            if closing:
+                if self.stack and self.stack[-1][0] == 'jsx_children':
+                    self.stack.pop()
+                self.emit('punct', pos, pos + 1)
+                self.end_element()
+            else:
+                self.stack.append(['jsx_children', None, frame[2]])
+                self.emit('punct', pos, pos + 1)
+        elif ch == '{':
+            self.emit('punct', pos, pos + 1)
+            self.stack.append(['{', 'jsx', None])
+            self.expression_allowed = True
+        elif ch in JSX_STRING_RE:
+            self.emit('string', pos, JSX_STRING_RE[ch].match(src, pos).end())
+        else:
+            match = JSX_NAME_RE.match(src, pos)
+            if match:
+                if frame[2] is None:
+                    frame[2] = match.group()
+                    self.emit('jsx_tag', pos, match.end())
+                else:
+                    self.emit('jsx_attr', pos, match.end())
+            else:
+                self.emit('punct', pos, pos + 1)
+
+    def lex_jsx_children(self):
+        src, pos = self.src, self.pos
+        ch = src[pos]
+        if ch == '{':
+            self.emit('punct', pos, pos + 1)
+            self.stack.append(['{', 'jsx', None])
+            self.expression_allowed = True
+        elif ch == '<':
+            self.emit('punct', pos, pos + 1)
+            self.stack.append(['jsx_tag', False, None])
+        else:
+            end = JSX_TEXT_RE.match(src, pos).end()
+            if src[pos:end].strip():
+                self.emit('jsx_text', pos, end)
+            else:
+                self.pos = end
+
+    def end_element(self):
+        """An element closed; in JS it is a value, in JSX children text resumes"""
+        self.expression_allowed = False
+
+
+def tokenize(source):
+    return JSLexer(source).run()
+
+
+def _complete(token):
+    """Can a statement end with this token?"""
+    if token.kind == 'template':
+        return token.value.endswith('`')
+    if token.kind in ('ident', 'number', 'string', 'regex'):
+        return True
+    return token.value in (')', ']', '}', '>', '/>')
+
+
+def _is_punct(token, value):
+    return token.kind == 'punct' and token.value == value and token.depth == 0
+
+
+class _Declarations:
+    """Walk depth-0 tokens and cut the source into declaration statements"""
+
+    def __init__(self, source, tokens):
+        self.src = source
+        self.tokens = tokens
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+
+    def line_of(self, offset):
+        return bisect.bisect_right(self.line_starts, offset) - 1
+
+    def newline_between(self, a, b):
+        return '\n' in self.src[self.tokens[a].end:self.tokens[b].start]
+
+    def statement_end(self, i):
+        """Index of the last token of the statement declared at tokens[i]"""
+        tokens = self.tokens
+        if tokens[i].value in ('function', 'class'):
+            # The body is the first depth-0 `{` after the name; parameters sit inside parens
+            j = i + 1
+            while j < len(tokens) and not _is_punct(tokens[j], '{'):
+                j += 1
+            j += 1
+            while j < len(tokens) and not _is_punct(tokens[j], '}'):
+                j += 1
+            if j + 1 < len(tokens) and _is_punct(tokens[j + 1], ';'):
+                j += 1
+            return min(j, len(tokens) - 1)
+
+        # const/let/var: up to `;`, or the line break where automatic semicolon insertion applies
+        last = i
+        for j in range(i + 1, len(tokens)):
+            token = tokens[j]
+            if token.kind == 'comment':
+                continue
+            # Closers sit at the depth of their opener but always belong to the statement
+            if token.depth != 0 or (token.kind == 'punct' and token.value in CLOSERS):
+                last = j
+                continue
+            if _is_punct(token, ';'):
+                return j
+            previous = tokens[last]
+            if (self.newline_between(last, j) and _complete(previous)
+                    and token.value not in CONTINUATION_PUNCT and previous.value not in CONTINUATION_PUNCT):
+                return last
+            last = j
+        return last
+
+    def declaration_at(self, i):
+        tokens, src = self.tokens, self.src
+        first = i
+        exported = default = False
+        while first > 0 and tokens[first - 1].depth == 0 and tokens[first - 1].kind == 'ident' \
+                and tokens[first - 1].value in ('export', 'default', 'async'):
+            first -= 1
+            exported = exported or tokens[first].value == 'export'
+            default = default or tokens[first].value == 'default'
+        if first > 0 and tokens[first - 1].kind != 'comment' and not self.newline_between(first - 1, first) \
+                and tokens[first - 1].value not in (';', '}'):
+            return None  # `x = function () {}`: an expression, not a declaration
+        start = tokens[first].start
+        # Attached comments (no blank line in between) belong to the declaration
+        while first > 0 and tokens[first - 1].kind == 'comment' and tokens[first - 1].depth == 0 \
+                and src[tokens[first - 1].end:start].count('\n') <= 1:
+            first -= 1
+            start = tokens[first].start
+
+        keyword = tokens[i].value
+        j = i + 1
+        if j < len(tokens) and tokens[j].value == '*':  # generator
+            j += 1
+        name = tokens[j].value if j < len(tokens) and tokens[j].kind == 'ident' else None
+        end_index = self.statement_end(i)
+        kind = keyword
+        if keyword in ('const', 'let', 'var'):
+            body = tokens[j + 1:end_index + 1]
+            if any(t.value == '=>' and t.depth == 0 for t in body):
+                kind = 'arrow'
+            elif any(t.kind == 'ident' and t.value == 'function' for t in body[:3]):
+                kind = 'function'
+            elif any(t.value in ('=>', 'function') for t in body):
+                kind = 'wrapped'  # memo(() => ...), forwardRef(function ...)
+        end = tokens[end_index].end
+        return Declaration(name, kind, start, end, self.line_of(start), self.line_of(end - 1),
+                           exported, default), end_index
+
+    def all(self):
+        declarations = []
+        i = 0
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.depth == 0 and token.kind == 'ident' and token.value in DECLARATION_KEYWORDS:
+                found = self.declaration_at(i)
+                if found:
+                    declarations.append(found[0])
+                    i = found[1] + 1
+                    continue
+            i += 1
+        return declarations
+
+
+def top_level_declarations(source, tokens=None):
+    """All depth-0 function/class/const/let/var declarations, in source order"""
+    return _Declarations(source, tokens if tokens is not None else tokenize(source)).all()
+
+
+def component_spans(source, tokens=None):
+    """{Name: Declaration} for capitalized top-level functions, classes and function-valued consts"""
+    return {d.name: d for d in top_level_declarations(source, tokens)
+            if d.name and d.name[0].isupper() and not d.name.isupper()
+            and d.kind in ('function', 'class', 'arrow', 'wrapped')}
+
+
+
+def _specifier(token):
+    return token.value[1:-1] if token.kind in ('string', 'template') and len(token.value) >= 2 else None
+
+
+def parse_imports(source, tokens=None):
+    """Import statements, `export ... from` re-exports and import('...') calls, in source order.
+
+    names holds (imported, local) pairs from the braces, e.g. ('Image', 'ImageIcon').
+    """
+    tokens = tokens if tokens is not None else tokenize(source)
+    imports = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token.kind != 'ident' or token.value not in ('import', 'export') or following is None:
+            i += 1
+            continue
+        if token.value == 'import' and following.value == '(':
+            if i + 2 < len(tokens) and _specifier(tokens[i + 2]) is not None:
+                imports.append(Import(_specifier(tokens[i + 2]), 'dynamic', None, None, [],
+                                      token.start, tokens[i + 2].end))
+            i += 1
+            continue
+        if token.depth != 0 or following.value == '.':
+            i += 1
+            continue
+
+        default = namespace = None
+        names = []
+        in_braces = False
+        j = i + 1
+        while j < len(tokens) and tokens[j].kind != 'string':
+            part = tokens[j]
+            if part.value == '{':
+                in_braces = True
+            elif part.value == '}':
+                in_braces = False
+            elif part.kind == 'ident' and part.value not in ('as', 'from', 'type'):
+                after_as = tokens[j - 1].value == 'as'
+                if in_braces:
+                    if after_as:
+                        names[-1] = (names[-1][0], part.value)
+                    else:
+                        names.append((part.value, part.value))
+                elif after_as:
+                    namespace = part.value
+                elif token.value == 'import':
+                    default = part.value
+                else:
+                    break  # export function/const/default ...: not a re-export
+            elif part.kind == 'punct' and part.value not in (',', '*', '{', '}'):
+                break
+            j += 1
+        if j >= len(tokens) or tokens[j].kind != 'string' or (token.value == 'export' and tokens[j - 1].value != 'from'):
+            i = j if j > i else i + 1
+            continue
+        end = j + 1 if j + 1 < len(tokens) and _is_punct(tokens[j + 1], ';') else j
+        if token.value == 'export':
+            kind = 'reexport'
+        else:
+            kind = 'static' if j > i + 1 else 'side_effect'
+        imports.append(Import(_specifier(tokens[j]), kind, default, namespace, names,
+                              token.start, tokens[end].end))
+        i = end + 1
+    return imports
+
+def main():
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            source = f.read()
+        print(f"{path}:")
+        for d in top_level_declarations(source):
+            flags = ' '.join(flag for flag, on in (('export', d.exported), ('default', d.default)) if on)
+            print(f"  {d.start_line + 1:>5}-{d.end_line + 1:<5} {d.kind:<8} {d.name or '-'} {flags}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,30 @@
 #!/usr/bin/env python3
-"""Remove extracted components from page.js and replace with imports."""
+"""Remove extracted components from page.js and replace with imports.
 
+With --lazy, components that only one role's dashboard renders are loaded
+with next/dynamic instead, so e.g. a pet owner never downloads the admin
+or lab dashboards. Only the landing/login path keeps static imports.
+
+    python scripts/replace_components.py --lazy [--role-map roles.json]
+
+Other files split by extract_components.py are given as arguments; their
+components are looked up in the extraction manifest and imported by
+relative path:
+
+    python scripts/replace_components.py 'app/**/page.js'
+"""
+
+import argparse
+import glob
+import json
+import os
 import re
 
+from js_lexer import component_spans, parse_imports
+
 PAGE_JS = '/app/app/page.js'
+COMPONENTS_DIR = '/app/app/components'
+MANIFEST_NAME = '.extract-manifest.json'
 
 # Components that were extracted and their import paths
 COMPONENTS = {
@@ -40,53 +61,98 @@ COMPONENTS = {
     'StaffDashboard': '@/app/components/staff/StaffDashboard',
 }
 
+# Role -> components rendered only inside that role's dashboard (lazy with --lazy)
+ROLE_COMPONENTS = {}
+for _name, _path in COMPONENTS.items():
+    ROLE_COMPONENTS.setdefault(_path.split('/')[-2], []).append(_name)
 
-def main():
-    with open(PAGE_JS, 'r') as f:
-        lines = f.readlines()
-    
-    lines_stripped = [l.rstrip('\n') for l in lines]
-    
-    # Find all function definitions
-    functions = []
-    for i, line in enumerate(lines_stripped):
-        if line.startswith('function '):
-            match = re.match(r'function\s+(\w+)', line)
-            if match:
-                functions.append((i, match.group(1)))
+# Roles on the landing/login path: always imported statically
+STATIC_ROLES = {'landing', 'auth', 'shared'}
+# Spans include the comments attached above a declaration, so skip those first
+LAZY_WRAPPER_RE = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*(?:export\s+)?const\s+\w+\s*=\s*dynamic\(', re.S)
+
+
+def lazy_import_block(components, role_components, existing):
+    """Static imports for the landing/login path, next/dynamic for role-specific components"""
+    role_of = {name: role for role, names in role_components.items() for name in names}
+    static = sorted(name for name in components if role_of.get(name, 'shared') in STATIC_ROLES)
+    lines = []
+    if 'dynamic' not in existing:
+        lines.append("import dynamic from 'next/dynamic';")
+    lines += [f"import {name} from '{components[name]}';" for name in static]
+    for role in sorted({role_of[name] for name in components if name not in static}):
+        lines.append(f"// {role}")
+        for name in sorted(n for n in components if role_of.get(n) == role):
+            lines.append(f"const {name} = dynamic(() => import('{components[name]}'), {{ ssr: false }});")
+    return lines, len(components) - len(static)
+
+
+def manifest_components(path, components_dir):
+    """{Component: relative import path} extracted from path, per the extraction manifest"""
+    try:
+        with open(os.path.join(components_dir, MANIFEST_NAME)) as f:
+            files = json.load(f).get('files', {})
+    except (OSError, ValueError):
+        return {}
+    source_dir = os.path.dirname(os.path.abspath(path))
+    components = {}
+    for rel_path, entry in sorted(files.items()):
+        if os.path.abspath(entry.get('source', '')) != os.path.abspath(path):
+            continue
+        target = os.path.relpath(os.path.join(components_dir, os.path.splitext(rel_path)[0]), source_dir)
+        components[os.path.basename(os.path.splitext(rel_path)[0])] = \
+            target if target.startswith('.') else './' + target
+    return components
+
+
+def replace_file(path, component_paths, lazy=False, role_components=ROLE_COMPONENTS):
+    """Remove component_paths' definitions from path and import them instead"""
+    with open(path, 'r') as f:
+        source = f.read()
     
-    # Map function -> (start_idx, end_idx) (0-based)
-    func_ranges = {}
-    for idx, (start, name) in enumerate(functions):
-        if idx + 1 < len(functions):
-            end = functions[idx + 1][0] - 1
-        else:
-            end = len(lines_stripped) - 1
-        func_ranges[name] = (start, end)
+    # Exact component spans (character offsets) from the shared JS lexer;
+    # `const X = dynamic(() => import(...))` from an earlier --lazy run is not a definition
+    func_ranges = {name: span for name, span in component_spans(source).items()
+                   if not LAZY_WRAPPER_RE.match(source, span.start, span.end)}
     
-    # Collect line ranges to remove (sorted in reverse to avoid index shifting)
+    # Collect spans to remove (sorted in reverse to avoid offset shifting)
     ranges_to_remove = []
-    for comp_name in COMPONENTS:
+    for comp_name in component_paths:
         if comp_name in func_ranges:
-            start, end = func_ranges[comp_name]
-            ranges_to_remove.append((start, end, comp_name))
-            print(f"  Will remove {comp_name}: lines {start+1}-{end+1} ({end-start+1} lines)")
+            span = func_ranges[comp_name]
+            ranges_to_remove.append((span.start, span.end, comp_name))
+            print(f"  Will remove {comp_name}: lines {span.start_line+1}-{span.end_line+1} "
+                  f"({span.end_line-span.start_line+1} lines)")
     
-    # Sort by start line in reverse
+    # Sort by start offset in reverse
     ranges_to_remove.sort(key=lambda x: x[0], reverse=True)
     
-    # Remove the functions from lines (working backwards)
+    # Remove the components from the source (working backwards)
     for start, end, name in ranges_to_remove:
-        # Also remove any blank lines right before the function
-        actual_start = start
-        while actual_start > 0 and lines_stripped[actual_start - 1].strip() == '':
-            actual_start -= 1
-        
-        del lines_stripped[actual_start:end + 1]
-        print(f"  Removed {name} ({end - actual_start + 1} lines)")
+        # Also remove any blank lines right before the component and its line break
+        actual_start = source.rfind('\n', 0, start) + 1
+        while actual_start > 0 and source[source.rfind('\n', 0, actual_start - 1) + 1:actual_start].strip() == '':
+            actual_start = source.rfind('\n', 0, actual_start - 1) + 1
+        actual_end = end + 1 if source[end:end + 1] == '\n' else end
+        removed = source[actual_start:actual_end].count('\n')
+        source = source[:actual_start] + source[actual_end:]
+        print(f"  Removed {name} ({removed} lines)")
+    
+    # Names the file already imports or declares are left alone (re-runs are idempotent)
+    existing = {local for imp in parse_imports(source) for local in
+                [imp.default, imp.namespace] + [local for _, local in imp.names] if local}
+    existing.update(component_spans(source))
+    components = {name: path for name, path in component_paths.items() if name not in existing}
+    
+    lines_stripped = source.split('\n')
     
     # Generate import statements
-    import_lines = [f"import {name} from '{path}';" for name, path in sorted(COMPONENTS.items())]
+    if lazy:
+        import_lines, lazy_count = lazy_import_block(components, role_components, existing)
+        print(f"  {lazy_count} component(s) lazy-loaded with next/dynamic, "
+              f"{len(components) - lazy_count} static")
+    else:
+        import_lines = [f"import {name} from '{path}';" for name, path in sorted(components.items())]
     
     # Find where to insert imports (after existing imports, before first function)
     insert_idx = 0
@@ -95,16 +161,48 @@ def main():
             insert_idx = i + 1
     
     # Insert import block
-    import_block = '\n// Extracted Components\n' + '\n'.join(import_lines) + '\n'
-    lines_stripped.insert(insert_idx, import_block)
+    if import_lines:
+        import_block = '\n// Extracted Components\n' + '\n'.join(import_lines) + '\n'
+        lines_stripped.insert(insert_idx, import_block)
     
     # Write back
-    with open(PAGE_JS, 'w') as f:
+    with open(path, 'w') as f:
         f.write('\n'.join(lines_stripped))
     
     total_lines = len(lines_stripped)
-    print(f"\nDone! page.js now has {total_lines} lines")
+    print(f"\nDone! {os.path.basename(path)} now has {total_lines} lines")
+
 
+def main():
+    parser = argparse.ArgumentParser(description="Replace extracted components in page.js with imports")
+    parser.add_argument('inputs', nargs='*', default=[PAGE_JS],
+                        help="files or globs extract_components.py split (default app/page.js)")
+    parser.add_argument('--components-dir', default=COMPONENTS_DIR,
+                        help="where the extraction manifest lives (files other than app/page.js)")
+    parser.add_argument('--lazy', action='store_true',
+                        help="emit next/dynamic imports for role-specific components")
+    parser.add_argument('--role-map', help="JSON {role: [Component, ...]} overriding ROLE_COMPONENTS")
+    args = parser.parse_args()
+    role_components = ROLE_COMPONENTS
+    if args.role_map:
+        with open(args.role_map) as f:
+            role_components = json.load(f)
+    
+    paths = []
+    for pattern in args.inputs:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            print(f"  SKIP: {pattern} matches no files")
+        paths.extend(p for p in matches if p not in paths)
+    for path in paths:
+        if os.path.abspath(path) == os.path.abspath(PAGE_JS):
+            component_paths = COMPONENTS
+        else:
+            component_paths = manifest_components(path, args.components_dir)
+            if not component_paths:
+                continue
+        print(f"\n{path}")
+        replace_file(path, component_paths, args.lazy, role_components)
 
 if __name__ == '__main__':
     main()
@@ -4,7 +4,7 @@ Specific VetBuddy API Tests
 Tests the specific APIs mentioned in the review request.
 """
 
-import requests
+from tests.harness import client
 import json
 
 BASE_URL = "https://clinic-report-review.preview.emergentagent.com/api"
@@ -19,9 +19,9 @@ def test_api(method, endpoint, data=None, description=""):
     
     try:
         if method.upper() == "GET":
-            response = requests.get(url, headers=headers, timeout=30)
+            response = client.get(url, headers=headers, timeout=30)
         elif method.upper() == "POST":
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = client.post(url, json=data, headers=headers, timeout=30)
         else:
             print(f"❌ Unsupported method: {method}")
             return False
@@ -4,7 +4,8 @@ VetBuddy Stripe Backend API Testing
 Tests the new Stripe endpoints: portal, webhook, and subscription-status
 """
 
-import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import sys
 from datetime import datetime
@@ -39,7 +40,7 @@ def print_test_result(test_name, success, details=""):
 def login_user(credentials):
     """Login and return JWT token"""
     try:
-        response = requests.post(f"{BASE_URL}/auth/login", json=credentials)
+        response = cached_login(f"{BASE_URL}/auth/login", json=credentials)
         if response.status_code == 200:
             data = response.json()
             return data.get('token'), data.get('user')
@@ -66,7 +67,7 @@ def test_stripe_portal_clinic():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/stripe/portal", headers=headers, json=portal_data)
+        response = client.post(f"{BASE_URL}/stripe/portal", headers=headers, json=portal_data)
         
         if response.status_code == 200:
             data = response.json()
@@ -113,7 +114,7 @@ def test_stripe_portal_lab():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/stripe/portal", headers=headers, json=portal_data)
+        response = client.post(f"{BASE_URL}/stripe/portal", headers=headers, json=portal_data)
         
         if response.status_code == 200:
             data = response.json()
@@ -153,7 +154,7 @@ def test_stripe_portal_unauthorized():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/stripe/portal", json=portal_data)
+        response = client.post(f"{BASE_URL}/stripe/portal", json=portal_data)
         
         if response.status_code == 401:
             print_test_result("POST /api/stripe/portal (No Auth)", True, 
@@ -191,7 +192,7 @@ def test_stripe_webhook_checkout_completed():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/webhook/stripe", json=webhook_data)
+        response = client.post(f"{BASE_URL}/webhook/stripe", json=webhook_data)
         
         if response.status_code == 200:
             data = response.json()
@@ -240,7 +241,7 @@ def test_stripe_webhook_trial():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/webhook/stripe", json=webhook_data)
+        response = client.post(f"{BASE_URL}/webhook/stripe", json=webhook_data)
         
         if response.status_code == 200:
             data = response.json()
@@ -285,7 +286,7 @@ def test_stripe_webhook_subscription_deleted():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/webhook/stripe", json=webhook_data)
+        response = client.post(f"{BASE_URL}/webhook/stripe", json=webhook_data)
         
         if response.status_code == 200:
             data = response.json()
@@ -324,7 +325,7 @@ def test_stripe_subscription_status_clinic():
     headers = {"Authorization": f"Bearer {clinic_token}"}
     
     try:
-        response = requests.get(f"{BASE_URL}/stripe/subscription-status", headers=headers)
+        response = client.get(f"{BASE_URL}/stripe/subscription-status", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -361,7 +362,7 @@ def test_stripe_subscription_status_lab():
     headers = {"Authorization": f"Bearer {lab_token}"}
     
     try:
-        response = requests.get(f"{BASE_URL}/stripe/subscription-status", headers=headers)
+        response = client.get(f"{BASE_URL}/stripe/subscription-status", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -390,7 +391,7 @@ def test_stripe_subscription_status_unauthorized():
     print("🔒 Testing Stripe Subscription Status API without Auth...")
     
     try:
-        response = requests.get(f"{BASE_URL}/stripe/subscription-status")
+        response = client.get(f"{BASE_URL}/stripe/subscription-status")
         
         if response.status_code == 401:
             print_test_result("GET /api/stripe/subscription-status (No Auth)", True, 
@@ -6,7 +6,10 @@ Test script for VetBuddy NEW features:
 3. Regression tests
 """
 
-import requests
+from tests.harness import client, mongo
+from tests.harness.auth_cache import cached_login
+from tests.harness.fixtures import FixtureRun
+from tests.harness.uploader import ChunkedUploader, UploadError
 import json
 import os
 import base64
@@ -14,7 +17,6 @@ import hashlib
 from datetime import datetime, timedelta
 import uuid
 import time
-from pymongo import MongoClient
 
 # Load .env file
 def load_env():
@@ -43,7 +45,7 @@ CLINIC_PASSWORD = "VetBuddy2025!Secure"
 test_data = {
     'form_ids': [],
     'media_ids': [],
-    'pet_ids': [],
+    'fixture_runs': [],
     'task_ids': []
 }
 
@@ -59,7 +61,7 @@ def print_result(success, msg):
 def login_clinic():
     """Login as clinic and return token"""
     print_test("Clinic Login")
-    response = requests.post(f"{API_URL}/auth/login", json={
+    response = cached_login(f"{API_URL}/auth/login", json={
         "email": CLINIC_EMAIL,
         "password": CLINIC_PASSWORD
     })
@@ -73,17 +75,13 @@ def login_clinic():
         print_result(False, f"Clinic login failed: {response.text}")
         return None
 
-def get_mongo_client():
-    """Get MongoDB client"""
-    return MongoClient(MONGO_URL)
-
 def test_part1_chunked_upload(clinic_token):
     """Test Part 1: Chunked Upload for Pre-Visit Media"""
     print_test("PART 1: CHUNKED UPLOAD PRE-VISITA")
     
     # Setup: Create a pre-visit form
     print("\n--- Setup: Create Pre-Visit Form ---")
-    response = requests.post(f"{API_URL}/previsit", 
+    response = client.post(f"{API_URL}/previsit", 
         headers={"Authorization": f"Bearer {clinic_token}"},
         json={
             "ownerName": "Test Upload",
@@ -104,8 +102,7 @@ def test_part1_chunked_upload(clinic_token):
     
     # Get form token from MongoDB
     print("\n--- Get Form Token from MongoDB ---")
-    client = get_mongo_client()
-    db = client[DB_NAME]
+    db = mongo.get_db(MONGO_URL, DB_NAME)
     
     # Wait a bit for the form to be saved
     time.sleep(2)
@@ -132,63 +129,29 @@ def test_part1_chunked_upload(clinic_token):
     file_hash = hashlib.sha256(fake_image_data).hexdigest()
     print(f"Generated fake image: {file_size} bytes, hash: {file_hash[:16]}...")
     
-    # Split into 3 chunks of ~512KB each
-    chunk_size = 512000
-    chunks = []
-    for i in range(0, len(fake_image_data), chunk_size):
-        chunks.append(fake_image_data[i:i+chunk_size])
-    
-    print(f"Split into {len(chunks)} chunks")
-    
-    upload_id = str(uuid.uuid4())
+    # Upload 3 chunks of ~512KB each concurrently, streamed from disk
+    uploader = ChunkedUploader(API_URL, form_id, form_token, chunk_size=512000, concurrency=3)
     file_name = "test.jpg"
     mime_type = "image/jpeg"
+    try:
+        upload = uploader.upload_bytes(fake_image_data, mime_type, file_name)
+    except UploadError as e:
+        print_result(False, f"Chunked upload failed after chunks {e.acked}: {e}")
+        return False
     
-    # Upload chunks
-    for idx, chunk in enumerate(chunks):
-        chunk_b64 = base64.b64encode(chunk).decode('utf-8')
-        print(f"\nUploading chunk {idx+1}/{len(chunks)} ({len(chunk)} bytes, {len(chunk_b64)} b64 chars)...")
-        
-        response = requests.post(f"{API_URL}/previsit/upload", json={
-            "formId": form_id,
-            "token": form_token,
-            "uploadId": upload_id,
-            "chunkIndex": idx,
-            "totalChunks": len(chunks),
-            "fileName": file_name,
-            "mimeType": mime_type,
-            "dataBase64": chunk_b64
-        })
-        
-        print(f"Chunk {idx+1} status: {response.status_code}")
-        if response.status_code != 200:
-            print_result(False, f"Chunk {idx+1} upload failed: {response.text}")
-            return False
-        
-        result = response.json()
-        if idx < len(chunks) - 1:
-            # First 2 chunks should return completed: false
-            if result.get('completed') == False:
-                print_result(True, f"Chunk {idx+1} uploaded, not completed yet")
-            else:
-                print_result(False, f"Chunk {idx+1} should not be completed yet")
-                return False
-        else:
-            # Last chunk should return completed: true with mediaId
-            if result.get('completed') == True:
-                media_id = result.get('mediaId')
-                media_size = result.get('size')
-                test_data['media_ids'].append(media_id)
-                print_result(True, f"Upload completed! mediaId: {media_id}, size: {media_size} bytes")
-            else:
-                print_result(False, "Last chunk should be completed")
-                return False
+    if upload.total_chunks != 3:
+        print_result(False, f"Expected 3 chunks, got {upload.total_chunks}")
+        return False
+    media_id = upload.media_id
+    test_data['media_ids'].append(media_id)
+    print_result(True, f"Upload completed! mediaId: {media_id}, size: {upload.size} bytes, "
+                       f"{upload.total_chunks} chunks in {upload.elapsed:.2f}s ({upload.throughput_mbps:.2f} MB/s)")
     
     # Test 2: Download media and verify integrity
     print("\n--- Test 2: Download Media and Verify Integrity ---")
     
     # Download with form token
-    response = requests.get(f"{API_URL}/previsit/upload?mediaId={media_id}&t={form_token}")
+    response = client.get(f"{API_URL}/previsit/upload?mediaId={media_id}&t={form_token}")
     print(f"Download with token status: {response.status_code}")
     if response.status_code != 200:
         print_result(False, f"Download failed: {response.text}")
@@ -208,7 +171,7 @@ def test_part1_chunked_upload(clinic_token):
         return False
     
     # Download with clinic token
-    response = requests.get(f"{API_URL}/previsit/upload?mediaId={media_id}",
+    response = client.get(f"{API_URL}/previsit/upload?mediaId={media_id}",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"Download with clinic auth status: {response.status_code}")
     if response.status_code == 200:
@@ -221,7 +184,7 @@ def test_part1_chunked_upload(clinic_token):
     print("\n--- Test 3: List Media ---")
     
     # List with form token
-    response = requests.get(f"{API_URL}/previsit/upload?formId={form_id}&t={form_token}")
+    response = client.get(f"{API_URL}/previsit/upload?formId={form_id}&t={form_token}")
     print(f"List with token status: {response.status_code}")
     if response.status_code != 200:
         print_result(False, f"List failed: {response.text}")
@@ -236,7 +199,7 @@ def test_part1_chunked_upload(clinic_token):
         return False
     
     # List with clinic token
-    response = requests.get(f"{API_URL}/previsit/upload?formId={form_id}",
+    response = client.get(f"{API_URL}/previsit/upload?formId={form_id}",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"List with clinic auth status: {response.status_code}")
     if response.status_code == 200:
@@ -249,7 +212,7 @@ def test_part1_chunked_upload(clinic_token):
     print("\n--- Test 4: Security Checks ---")
     
     # Download without token and without auth
-    response = requests.get(f"{API_URL}/previsit/upload?mediaId={media_id}")
+    response = client.get(f"{API_URL}/previsit/upload?mediaId={media_id}")
     print(f"Download without auth status: {response.status_code}")
     if response.status_code == 401:
         print_result(True, "Download without auth correctly blocked (401)")
@@ -257,7 +220,7 @@ def test_part1_chunked_upload(clinic_token):
         print_result(False, f"Download without auth should return 401, got {response.status_code}")
     
     # Download with wrong token
-    response = requests.get(f"{API_URL}/previsit/upload?mediaId={media_id}&t=wrong_token")
+    response = client.get(f"{API_URL}/previsit/upload?mediaId={media_id}&t=wrong_token")
     print(f"Download with wrong token status: {response.status_code}")
     if response.status_code == 401:
         print_result(True, "Download with wrong token correctly blocked (401)")
@@ -265,7 +228,7 @@ def test_part1_chunked_upload(clinic_token):
         print_result(False, f"Download with wrong token should return 401, got {response.status_code}")
     
     # Upload chunk with PDF mime type (should fail)
-    response = requests.post(f"{API_URL}/previsit/upload", json={
+    response = client.post(f"{API_URL}/previsit/upload", json={
         "formId": form_id,
         "token": form_token,
         "uploadId": str(uuid.uuid4()),
@@ -282,7 +245,7 @@ def test_part1_chunked_upload(clinic_token):
         print_result(False, f"PDF upload should return 400, got {response.status_code}")
     
     # Upload with 50 total chunks (should fail)
-    response = requests.post(f"{API_URL}/previsit/upload", json={
+    response = client.post(f"{API_URL}/previsit/upload", json={
         "formId": form_id,
         "token": form_token,
         "uploadId": str(uuid.uuid4()),
@@ -299,7 +262,7 @@ def test_part1_chunked_upload(clinic_token):
         print_result(False, f"50 chunks upload should return 400, got {response.status_code}")
     
     # Upload with wrong form token
-    response = requests.post(f"{API_URL}/previsit/upload", json={
+    response = client.post(f"{API_URL}/previsit/upload", json={
         "formId": form_id,
         "token": "wrong_token",
         "uploadId": str(uuid.uuid4()),
@@ -324,7 +287,7 @@ def test_part1_chunked_upload(clinic_token):
         small_b64 = base64.b64encode(small_data).decode('utf-8')
         small_upload_id = str(uuid.uuid4())
         
-        response = requests.post(f"{API_URL}/previsit/upload", json={
+        response = client.post(f"{API_URL}/previsit/upload", json={
             "formId": form_id,
             "token": form_token,
             "uploadId": small_upload_id,
@@ -353,7 +316,7 @@ def test_part1_chunked_upload(clinic_token):
     fourth_b64 = base64.b64encode(fourth_data).decode('utf-8')
     fourth_upload_id = str(uuid.uuid4())
     
-    response = requests.post(f"{API_URL}/previsit/upload", json={
+    response = client.post(f"{API_URL}/previsit/upload", json={
         "formId": form_id,
         "token": form_token,
         "uploadId": fourth_upload_id,
@@ -375,7 +338,7 @@ def test_part1_chunked_upload(clinic_token):
     
     # Delete the 3rd media (last small file)
     third_media_id = test_data['media_ids'][2]
-    response = requests.delete(f"{API_URL}/previsit/upload?mediaId={third_media_id}&t={form_token}")
+    response = client.delete(f"{API_URL}/previsit/upload?mediaId={third_media_id}&t={form_token}")
     print(f"Delete media status: {response.status_code}")
     if response.status_code == 200:
         print_result(True, "Media deleted successfully")
@@ -385,7 +348,7 @@ def test_part1_chunked_upload(clinic_token):
         return False
     
     # Try to download deleted media (should fail)
-    response = requests.get(f"{API_URL}/previsit/upload?mediaId={third_media_id}&t={form_token}")
+    response = client.get(f"{API_URL}/previsit/upload?mediaId={third_media_id}&t={form_token}")
     print(f"Download deleted media status: {response.status_code}")
     if response.status_code == 404:
         print_result(True, "Deleted media correctly returns 404")
@@ -396,7 +359,7 @@ def test_part1_chunked_upload(clinic_token):
     print("\n--- Test 7: Block Upload/Delete After Submission ---")
     
     # Submit the form
-    response = requests.post(f"{API_URL}/previsit", json={
+    response = client.post(f"{API_URL}/previsit", json={
         "id": form_id,
         "token": form_token,
         "answers": {
@@ -412,7 +375,7 @@ def test_part1_chunked_upload(clinic_token):
         return False
     
     # Try to upload new chunk (should fail)
-    response = requests.post(f"{API_URL}/previsit/upload", json={
+    response = client.post(f"{API_URL}/previsit/upload", json={
         "formId": form_id,
         "token": form_token,
         "uploadId": str(uuid.uuid4()),
@@ -430,7 +393,7 @@ def test_part1_chunked_upload(clinic_token):
     
     # Try to delete with form token (should fail)
     remaining_media_id = test_data['media_ids'][0]
-    response = requests.delete(f"{API_URL}/previsit/upload?mediaId={remaining_media_id}&t={form_token}")
+    response = client.delete(f"{API_URL}/previsit/upload?mediaId={remaining_media_id}&t={form_token}")
     print(f"Delete after submit with token status: {response.status_code}")
     if response.status_code == 400:
         print_result(True, "Delete after submit with token correctly blocked (400)")
@@ -438,7 +401,7 @@ def test_part1_chunked_upload(clinic_token):
         print_result(False, f"Delete after submit with token should return 400, got {response.status_code}")
     
     # Delete with clinic auth (should succeed)
-    response = requests.delete(f"{API_URL}/previsit/upload?mediaId={remaining_media_id}",
+    response = client.delete(f"{API_URL}/previsit/upload?mediaId={remaining_media_id}",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"Delete after submit with clinic auth status: {response.status_code}")
     if response.status_code == 200:
@@ -450,7 +413,7 @@ def test_part1_chunked_upload(clinic_token):
     # Test 8: MediaCount in GET /api/previsit
     print("\n--- Test 8: MediaCount in GET /api/previsit ---")
     
-    response = requests.get(f"{API_URL}/previsit",
+    response = client.get(f"{API_URL}/previsit",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"Get previsit list status: {response.status_code}")
     if response.status_code == 200:
@@ -476,8 +439,9 @@ def test_part2_cron_automations(clinic_token):
     # Setup test data in MongoDB
     print("\n--- Setup: Create Test Data in MongoDB ---")
     
-    client = get_mongo_client()
-    db = client[DB_NAME]
+    db = mongo.get_db(MONGO_URL, DB_NAME)
+    fixture_run = FixtureRun(db)
+    test_data['fixture_runs'].append(fixture_run)
     
     # Get demo clinic ID
     clinic = db.users.find_one({"email": CLINIC_EMAIL})
@@ -505,7 +469,6 @@ def test_part2_cron_automations(clinic_token):
     # a) Create pet for weightAlert test
     print("\n--- Create Pet for weightAlert Test ---")
     weight_pet_id = str(uuid.uuid4())
-    test_data['pet_ids'].append(weight_pet_id)
     
     weight_pet = {
         "id": weight_pet_id,
@@ -521,13 +484,12 @@ def test_part2_cron_automations(clinic_token):
         ],
         "createdAt": datetime.utcnow().isoformat()
     }
-    db.pets.insert_one(weight_pet)
-    print_result(True, f"Weight test pet created: {weight_pet_id}")
+    fixture_run.add('pets', weight_pet)
+    print_result(True, f"Weight test pet prepared: {weight_pet_id}")
     
     # b) Create pet for griefFollowup test
     print("\n--- Create Pet for griefFollowup Test ---")
     grief_pet_id = str(uuid.uuid4())
-    test_data['pet_ids'].append(grief_pet_id)
     
     thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
     grief_pet = {
@@ -542,8 +504,11 @@ def test_part2_cron_automations(clinic_token):
         "deceasedAt": thirty_days_ago,
         "createdAt": datetime.utcnow().isoformat()
     }
-    db.pets.insert_one(grief_pet)
-    print_result(True, f"Grief test pet created: {grief_pet_id}, deceased 30 days ago")
+    fixture_run.add('pets', grief_pet)
+    print_result(True, f"Grief test pet prepared: {grief_pet_id}, deceased 30 days ago")
+    
+    counts = fixture_run.flush()
+    print_result(True, f"Test pets inserted in one batch: {counts.get('pets', 0)} (tag {fixture_run.tag})")
     
     # c) dentalHygiene and referralProgram will use existing data
     print("\n--- dentalHygiene and referralProgram will use existing data ---")
@@ -551,7 +516,7 @@ def test_part2_cron_automations(clinic_token):
     
     # Call cron job ONCE
     print("\n--- Call Cron Job (ONCE - sends real emails) ---")
-    response = requests.get(f"{API_URL}/cron/daily")
+    response = client.get(f"{API_URL}/cron/daily")
     print(f"Cron job status: {response.status_code}")
     
     if response.status_code != 200:
@@ -642,7 +607,7 @@ def test_part3_regression(clinic_token):
     
     # Test 1: GET /api/tasks
     print("\n--- Test 1: GET /api/tasks ---")
-    response = requests.get(f"{API_URL}/tasks",
+    response = client.get(f"{API_URL}/tasks",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"GET /api/tasks status: {response.status_code}")
     if response.status_code == 200:
@@ -652,7 +617,7 @@ def test_part3_regression(clinic_token):
     
     # Test 2: GET /api/previsit
     print("\n--- Test 2: GET /api/previsit ---")
-    response = requests.get(f"{API_URL}/previsit",
+    response = client.get(f"{API_URL}/previsit",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"GET /api/previsit status: {response.status_code}")
     if response.status_code == 200:
@@ -662,7 +627,7 @@ def test_part3_regression(clinic_token):
     
     # Test 3: GET /api/auth/me
     print("\n--- Test 3: GET /api/auth/me ---")
-    response = requests.get(f"{API_URL}/auth/me",
+    response = client.get(f"{API_URL}/auth/me",
         headers={"Authorization": f"Bearer {clinic_token}"})
     print(f"GET /api/auth/me status: {response.status_code}")
     if response.status_code == 200:
@@ -677,8 +642,7 @@ def cleanup():
     """Cleanup test data from MongoDB"""
     print_test("CLEANUP: Remove Test Data from MongoDB")
     
-    client = get_mongo_client()
-    db = client[DB_NAME]
+    db = mongo.get_db(MONGO_URL, DB_NAME)
     
     # Delete previsit forms
     if test_data['form_ids']:
@@ -696,11 +660,10 @@ def cleanup():
         result = db.previsit_media_chunks.delete_many({"uploadId": {"$in": test_data['media_ids']}})
         print(f"Deleted {result.deleted_count} previsit media chunks")
     
-    # Delete test pets
-    if test_data['pet_ids']:
-        print(f"\n--- Delete {len(test_data['pet_ids'])} test pets ---")
-        result = db.pets.delete_many({"id": {"$in": test_data['pet_ids']}})
-        print(f"Deleted {result.deleted_count} test pets")
+    # Delete fixture documents (test pets), one delete per collection and run
+    for fixture_run in test_data['fixture_runs']:
+        print(f"\n--- Delete fixtures of run {fixture_run.tag} ---")
+        print(f"Deleted {fixture_run.teardown()}")
     
     # Delete automation logs for test pets
     print("\n--- Delete automation logs for test pets ---")
@@ -4,10 +4,10 @@ VetBuddy Connect Module - Completion Score Endpoint Testing
 Test rapido del nuovo endpoint GET /api/connect/completion-score (Fase 4 del riposizionamento Ecosistema)
 """
 
-import requests
+from tests.harness import client, mongo
+from tests.harness.auth_cache import cached_login
 import json
 import time
-from pymongo import MongoClient
 import os
 
 # Configuration
@@ -46,7 +46,7 @@ def login(email, password, role_name):
     """Login and return JWT token"""
     print_test_header(f"Login {role_name}")
     try:
-        response = requests.post(
+        response = cached_login(
             f"{BASE_URL}/auth/login",
             json={"email": email, "password": password},
             headers={"Content-Type": "application/json"}
@@ -63,17 +63,13 @@ def login(email, password, role_name):
         print_result(False, f"{role_name} login error: {str(e)}")
         return None
 
-def get_mongo_client():
-    """Get MongoDB client"""
-    return MongoClient(MONGO_URL)
-
 # ==================== TEST 1: COMPLETION SCORE PER RUOLO ====================
 def test_1_1_completion_score_clinic():
     """TEST 1.1 - GET /api/connect/completion-score come CLINIC"""
     print_test_header("TEST 1.1 - Completion Score CLINIC")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/connect/completion-score",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -139,7 +135,7 @@ def test_1_2_completion_score_owner():
     print_test_header("TEST 1.2 - Completion Score OWNER")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/connect/completion-score",
             headers={"Authorization": f"Bearer {owner_token}"}
         )
@@ -198,7 +194,7 @@ def test_1_3_completion_score_lab():
     print_test_header("TEST 1.3 - Completion Score LAB")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/connect/completion-score",
             headers={"Authorization": f"Bearer {lab_token}"}
         )
@@ -248,7 +244,7 @@ def test_1_4_completion_score_no_auth():
     print_test_header("TEST 1.4 - Completion Score NO AUTH (NEGATIVE)")
     
     try:
-        response = requests.get(f"{BASE_URL}/connect/completion-score")
+        response = client.get(f"{BASE_URL}/connect/completion-score")
         
         if response.status_code != 401:
             print_result(False, f"Expected 401, got {response.status_code}")
@@ -267,7 +263,7 @@ def test_2_1_connect_stats():
     print_test_header("TEST 2.1 - Connect Stats Regression")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/connect/stats",
             headers={"Authorization": f"Bearer {clinic_token}"}
         )
@@ -305,7 +301,7 @@ def test_2_2_connect_invitations():
     print_test_header("TEST 2.2 - Connect Invitations Regression")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/connect/invitations",
             headers={"Authorization": f"Bearer {owner_token}"}
         )
@@ -340,7 +336,7 @@ def test_2_3_connect_invite():
     global test_invitation_id
     
     try:
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/connect/invite",
             headers={
                 "Authorization": f"Bearer {clinic_token}",
@@ -384,8 +380,7 @@ def test_2_4_cleanup():
     global test_invitation_id
     
     try:
-        client = get_mongo_client()
-        db = client[DB_NAME]
+        db = mongo.get_db(MONGO_URL, DB_NAME)
         
         # Delete invitation
         if test_invitation_id:
@@ -396,7 +391,6 @@ def test_2_4_cleanup():
         result = db.provisional_profiles.delete_one({"email": "test_completion@example.com"})
         print_result(True, f"Deleted provisional profile: {result.deleted_count} document(s)")
         
-        client.close()
         return True
         
     except Exception as e:
@@ -8,7 +8,8 @@ Tests:
 4. POST /api/automations/passport-completion-reminder (NO auth, dryRun: true)
 """
 
-import requests
+from tests.harness import client
+from tests.harness.auth_cache import cached_login
 import json
 import sys
 
@@ -38,7 +39,7 @@ def test_admin_login():
     print(f"{'='*80}")
     
     try:
-        response = requests.post(
+        response = cached_login(
             f"{BASE_URL}/auth/login",
             json={"email": "admin@vetbuddy.it", "password": "Admin2025!"},
             timeout=10
@@ -76,7 +77,7 @@ def test_admin_passport_stats(admin_token):
     print(f"{'='*80}")
     
     try:
-        response = requests.get(
+        response = client.get(
             f"{BASE_URL}/admin/passport-stats",
             headers={"Authorization": f"Bearer {admin_token}"},
             timeout=10
@@ -151,7 +152,7 @@ def test_passport_vaccine_reminder():
     print(f"{'='*80}")
     
     try:
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/automations/passport-vaccine-reminder",
             json={"daysAhead": 30, "dryRun": True},
             timeout=15
@@ -213,7 +214,7 @@ def test_passport_completion_reminder():
     print(f"{'='*80}")
     
     try:
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/automations/passport-completion-reminder",
             json={"minCompletionThreshold": 60, "dryRun": True},
             timeout=15
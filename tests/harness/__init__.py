@@ -0,0 +1,6 @@
+"""
+VetBuddy test harness
+Shared tooling for the backend test scripts in the repository root.
+"""
+
+from tests.harness.client import ApiClient, endpoint_key, get_client
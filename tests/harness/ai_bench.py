@@ -0,0 +1,403 @@
+"""
+Latency and throughput benchmark for the POST /api/ai tools.
+
+Each tool runs its corpus of inputs --repeat times with up to
+--concurrency requests in flight. For every tool the benchmark reports
+end-to-end latency (p50/p95/max), output length, output chars/sec and
+an estimated tokens/sec (~4 chars per token; the route does not return
+usage).
+
+The upstream LLM rate-limits us. The route reports that as HTTP 500
+{"error": "Errore AI: 429"}, and a gateway in front of it may return a
+plain 429. Both are treated as rate limits by AdaptiveBackoff, which
+replaces fixed sleeps between calls:
+
+    on a rate limit   wait Retry-After if the response has one, otherwise
+                      exponential backoff with jitter; halve the number
+                      of requests allowed in flight
+    on success        after a full window of successes, allow one more
+                      request in flight again (up to --concurrency)
+
+Rate-limited attempts are retried up to --max-retries times. They count
+towards 'rate_limited' and 'backoff_s', not towards the latency figures.
+With --mock (a tests.harness.mock_llm server the backend is pointed at
+through LLM_API_URL) each tool also reports the upstream latency the mock
+added and the backend overhead: mean endpoint latency minus mean upstream
+latency. Results are written to test_reports/ai_bench/.
+
+    python -m tests.harness.ai_bench --tools summarize_lab_report,extract_dates --concurrency 4 --repeat 5
+    python -m tests.harness.ai_bench --corpus corpus.jsonl
+    python -m tests.harness.ai_bench --mock http://127.0.0.1:8790
+
+A corpus file is JSONL, one {"tool", "input", "context"} per line, or a
+JSON object {tool: [{"input", "context"}, ...]}.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from tests.harness import client
+from tests.harness.histogram import LatencyHistogram
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'test_reports', 'ai_bench')
+
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_RETRIES = 5
+
+MAX = {'nome': 'Max', 'specie': 'Cane', 'razza': 'Golden Retriever'}
+LUNA = {'nome': 'Luna', 'specie': 'Gatto', 'razza': 'Europeo'}
+
+# The inputs ai_backend_test.py asserts on, plus a longer variant per tool
+DEFAULT_CORPUS = {
+    'summarize_lab_report': [
+        {'input': "Emocromo completo: Globuli rossi: 6.8 x10^12/L (rif. 5.5-8.5), Emoglobina: 14.2 g/dL "
+                  "(rif. 12-18), Globuli bianchi: 18.5 x10^9/L (rif. 5.5-16.9) ↑, Piastrine: 280 x10^9/L "
+                  "(rif. 175-500)",
+         'context': {'nome': 'Max', 'specie': 'Cane'}},
+        {'input': "Profilo biochimico: Creatinina 2.4 mg/dL (rif. 0.8-1.8) ↑, Urea 78 mg/dL (rif. 30-60) ↑, "
+                  "ALT 45 U/L (rif. 20-100), ALP 60 U/L (rif. 14-111), Glucosio 110 mg/dL (rif. 74-159), "
+                  "Fosforo 6.9 mg/dL (rif. 3.1-7.5), SDMA 19 µg/dL (rif. 0-14) ↑, Peso specifico urine 1.018",
+         'context': LUNA},
+    ],
+    'extract_dates': [
+        {'input': "Vaccino antirabbica effettuato il 15/03/2025, richiamo previsto il 15/03/2026. "
+                  "Assicurazione scade il 30/06/2026."},
+        {'input': "Trattamento antiparassitario il 01/04/2025, da ripetere ogni 3 mesi. Prossima visita di "
+                  "controllo il 20/09/2025. Microchip impiantato il 12/01/2021, polizza rinnovata fino al "
+                  "31/12/2025."},
+    ],
+    'generate_pet_sitter_instructions': [
+        {'input': "Genera istruzioni per il pet sitter di Max.",
+         'context': dict(MAX, allergie='Pollo, Grano', farmaci='Nessuno', dieta='Non indicata')},
+        {'input': "Genera istruzioni per il pet sitter di Luna per una settimana.",
+         'context': dict(LUNA, allergie='Nessuna', farmaci='Semintra 1 ml al giorno', dieta='Renale umido')},
+    ],
+    'generate_travel_checklist': [
+        {'input': "Viaggio in auto a Barcellona (Spagna) dal 15 al 25 agosto.",
+         'context': {'nome': 'Max', 'vaccini': 'Antirabbica - 15/03/2025 (prossimo: 15/03/2026)'}},
+        {'input': "Volo per Londra (Regno Unito) dal 2 al 9 dicembre, animale in cabina.",
+         'context': dict(LUNA, vaccini='Trivalente - 10/02/2025', microchip='380260000123456')},
+    ],
+    'passport_suggest_missing': [
+        {'input': "Analizza il Passport di Max e suggerisci cosa manca.",
+         'context': dict(MAX, completamentoPassport='83%', datiMancanti='photo, documents', qrAttivo='Sì',
+                         lostPetMode='No')},
+        {'input': "Analizza il Passport di Luna e suggerisci cosa manca.",
+         'context': dict(LUNA, completamentoPassport='40%', datiMancanti='vaccini, assicurazione, contatti',
+                         qrAttivo='No', lostPetMode='No')},
+    ],
+    'summarize_visit': [
+        {'input': "Visita di controllo per Max. Cane in buona salute, peso 25kg. Nessuna anomalia rilevata."},
+    ],
+    'draft_message': [
+        {'input': "Scrivi un messaggio per confermare l'appuntamento di domani alle 10:00 per Max."},
+    ],
+}
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds (delta-seconds or HTTP-date); None when absent or unparseable"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_rate_limited(response):
+    """A 429 from a gateway, or the route's 500 wrapping the provider's 429"""
+    if response.status_code == 429:
+        return True
+    return response.status_code >= 500 and '429' in response.text[:500]
+
+
+class AdaptiveBackoff:
+    """Concurrency limit and shared pause that adapt to rate-limit responses.
+
+    Every caller holds a slot (acquire/release) for the length of one
+    request. A rate limit pauses all callers until the backoff expires
+    and halves the slots; a window of successes adds one slot back.
+    """
+
+    def __init__(self, max_concurrency=1, base=1.0, cap=30.0):
+        self.max_concurrency = max_concurrency
+        self.base = base
+        self.cap = cap
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.resume_at = 0.0
+        self.streak = 0
+        self.successes = 0
+        self.rate_limited = 0
+        self.backoff_seconds = 0.0
+        self.min_limit = max_concurrency
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self.resume_at - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def throttled(self, retry_after=None):
+        """Record a rate limit; returns the pause applied, in seconds"""
+        with self._cond:
+            self.rate_limited += 1
+            self.limit = max(1, self.limit // 2)
+            self.min_limit = min(self.min_limit, self.limit)
+            self.successes = 0
+            if retry_after is None:
+                retry_after = min(self.cap, self.base * 2 ** self.streak) * random.uniform(0.5, 1.0)
+            self.streak += 1
+            resume_at = time.monotonic() + retry_after
+            if resume_at > self.resume_at:
+                self.backoff_seconds += resume_at - max(self.resume_at, time.monotonic())
+                self.resume_at = resume_at
+            self._cond.notify_all()
+            return retry_after
+
+    def succeeded(self):
+        with self._cond:
+            self.streak = 0
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self.successes = 0
+                self._cond.notify_all()
+
+
+def post_with_backoff(url, backoff=None, max_retries=DEFAULT_MAX_RETRIES, **kwargs):
+    """client.post that waits out rate limits instead of sleeping between calls.
+
+    Returns (response, attempts, seconds of the last attempt). After
+    max_retries rate-limited retries the last rate-limited response is
+    returned as is.
+    """
+    backoff = backoff or AdaptiveBackoff()
+    attempt = 0
+    while True:
+        attempt += 1
+        backoff.acquire()
+        started = time.perf_counter()
+        try:
+            response = client.post(url, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            backoff.release()
+        if not is_rate_limited(response):
+            backoff.succeeded()
+            return response, attempt, elapsed
+        if attempt > max_retries:
+            return response, attempt, elapsed
+        backoff.throttled(parse_retry_after(response.headers.get('Retry-After')))
+
+
+def load_corpus(path):
+    """{tool: [entry, ...]} from a JSONL file of {tool, input, context} or a JSON object"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = None
+    if isinstance(data, dict):
+        return {tool: list(entries) for tool, entries in data.items()}
+    corpus = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if 'tool' not in entry or 'input' not in entry:
+            raise ValueError(f"{path}:{number}: every line needs 'tool' and 'input'")
+        corpus.setdefault(entry.pop('tool'), []).append(entry)
+    return corpus
+
+
+class ToolStats:
+    """Thread-safe per-tool counters and latency histogram"""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.latency = LatencyHistogram()
+        self.requests = self.ok = self.failed = self.retries = 0
+        self.chars = 0
+        self.ok_seconds = 0.0
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def record(self, ok, seconds, chars=0, retries=0, error=None):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            if ok:
+                self.ok += 1
+                self.chars += chars
+                self.ok_seconds += seconds
+                self.latency.record(seconds)
+            else:
+                self.failed += 1
+                if error and len(self.errors) < 5:
+                    self.errors.append(error)
+
+    def summary(self, wall_seconds, backoff):
+        chars_per_sec = self.chars / self.ok_seconds if self.ok_seconds else 0.0
+        return {
+            'tool': self.tool,
+            'requests': self.requests,
+            'ok': self.ok,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rate_limited': backoff.rate_limited,
+            'backoff_s': backoff.backoff_seconds,
+            'min_concurrency': backoff.min_limit,
+            'wall_s': wall_seconds,
+            'requests_per_sec': self.ok / wall_seconds if wall_seconds else 0.0,
+            'mean_chars': self.chars / self.ok if self.ok else 0.0,
+            'chars_per_sec': chars_per_sec,
+            'est_tokens_per_sec': chars_per_sec / CHARS_PER_TOKEN,
+            'latency': self.latency.summary(),
+            'errors': self.errors,
+        }
+
+
+class AiBench:
+    """Runs each tool's corpus with bounded, rate-limit-aware concurrency"""
+
+    def __init__(self, concurrency=1, repeat=1, max_retries=DEFAULT_MAX_RETRIES, timeout=None, mock_url=None):
+        self.concurrency = concurrency
+        self.repeat = repeat
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.mock_url = mock_url.rstrip('/') if mock_url else None
+
+    def call(self, tool, entry, stats, backoff):
+        payload = {'tool': tool, 'input': entry['input']}
+        if entry.get('context'):
+            payload['context'] = entry['context']
+        try:
+            response, attempts, seconds = post_with_backoff(f"{API_URL}/ai", backoff, self.max_retries,
+                                                            json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            stats.record(False, 0.0, error=f"{type(e).__name__}: {e}")
+            return
+        if response.status_code != 200:
+            stats.record(False, seconds, retries=attempts - 1, error=f"{response.status_code}: {response.text[:200]}")
+            return
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        result = data.get('result') or ''
+        if data.get('success') is not True or data.get('tool') != tool or not result:
+            stats.record(False, seconds, retries=attempts - 1, error=f"unexpected body: {response.text[:200]}")
+            return
+        stats.record(True, seconds, chars=len(result), retries=attempts - 1)
+
+    def run_tool(self, tool, entries):
+        stats = ToolStats(tool)
+        backoff = AdaptiveBackoff(max_concurrency=self.concurrency)
+        jobs = [entry for _ in range(self.repeat) for entry in entries]
+        if self.mock_url:
+            client.post(f"{self.mock_url}/stats/reset", timeout=5)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for future in [pool.submit(self.call, tool, entry, stats, backoff) for entry in jobs]:
+                future.result()
+        summary = stats.summary(time.perf_counter() - started, backoff)
+        if self.mock_url:
+            upstream = client.get(f"{self.mock_url}/stats", timeout=5).json()['latency']
+            summary['upstream_latency'] = upstream
+            summary['overhead_ms'] = summary['latency']['mean_ms'] - upstream['mean_ms'] if stats.ok else None
+        return summary
+
+
+def print_header():
+    print(f"\n{'tool':<34} {'ok':>7} {'429':>4} {'p50':>8} {'p95':>8} {'max':>8} {'chars':>6} "
+          f"{'chars/s':>8} {'tok/s':>6} {'backoff':>8} {'overhead':>9}")
+
+
+def print_row(r):
+    lat = r['latency']
+    flag = '✅' if r['ok'] and not r['failed'] else '❌'
+    overhead = f"{r['overhead_ms']:>7.0f}ms" if r.get('overhead_ms') is not None else f"{'-':>9}"
+    print(f"{r['tool']:<34} {r['ok']:>3}/{r['requests']:<3} {r['rate_limited']:>4} {lat['p50_ms']:>6.0f}ms "
+          f"{lat['p95_ms']:>6.0f}ms {lat['max_ms']:>6.0f}ms {r['mean_chars']:>6.0f} {r['chars_per_sec']:>8.0f} "
+          f"{r['est_tokens_per_sec']:>6.0f} {r['backoff_s']:>7.1f}s {overhead} {flag}")
+    for error in r['errors'][:2]:
+        print(f"    {error[:120]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput benchmark for /api/ai tools")
+    parser.add_argument('--tools', help="comma-separated tools (default: every tool in the corpus)")
+    parser.add_argument('--corpus', help="JSONL or JSON corpus file (default: built-in corpus)")
+    parser.add_argument('--concurrency', type=int, default=2, help="max requests in flight per tool")
+    parser.add_argument('--repeat', type=int, default=3, help="times each corpus entry is sent")
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help="retries of a rate-limited request before it counts as failed")
+    parser.add_argument('--timeout', type=float, help="client timeout per request in seconds (default 60)")
+    parser.add_argument('--mock', help="base URL of the mock_llm server the backend calls, to report overhead")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    tools = [t for t in args.tools.split(',') if t] if args.tools else list(corpus)
+    unknown = [t for t in tools if t not in corpus]
+    if unknown:
+        parser.error(f"no corpus entries for: {', '.join(unknown)}")
+
+    bench = AiBench(concurrency=max(1, args.concurrency), repeat=max(1, args.repeat),
+                    max_retries=args.max_retries, timeout=args.timeout, mock_url=args.mock)
+    print(f"🤖 AI benchmark against {API_URL}: {len(tools)} tools, concurrency {bench.concurrency}, "
+          f"repeat {bench.repeat}")
+    print_header()
+    results = []
+    for tool in tools:
+        result = bench.run_tool(tool, corpus[tool])
+        print_row(result)
+        results.append(result)
+
+    report = {
+        'base_url': BASE_URL,
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'concurrency': bench.concurrency,
+        'repeat': bench.repeat,
+        'corpus': args.corpus or 'built-in',
+        'mock': args.mock,
+        'results': results,
+    }
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"ai_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {os.path.relpath(path)}")
+    return 0 if all(r['ok'] and not r['failed'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Login token cache shared across test scripts and processes.
+
+POST /api/auth/login is deliberately slow (bcrypt), and every script logs
+in as the same demo clinic, lab and owner accounts. cached_login() is a
+drop-in replacement for client.post(f"{BASE_URL}/auth/login", json=...):
+on a hit it returns a CachedResponse holding the stored {token, user}
+body, on a miss it performs the real login and stores the result.
+
+Entries are keyed by API host + role + email + a hash of the password,
+so a wrong or changed password never reuses another login's token. They
+are evicted when the JWT `exp` claim is near. The cache persists to a
+JSON file guarded by an flock so concurrent suites share it.
+
+Environment:
+    VETBUDDY_TOKEN_CACHE   cache file path, or "off" to always log in (no file
+                           or in-process caching)
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from tests.harness import client
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+CACHE_PATH = os.getenv('VETBUDDY_TOKEN_CACHE',
+                       os.path.join(tempfile.gettempdir(), 'vetbuddy-token-cache.json'))
+# Tokens expiring within this many seconds are treated as expired
+EXPIRY_SKEW = 120
+# TTL for tokens without an `exp` claim
+DEFAULT_TTL = 3600
+
+_memory = {}
+_memory_lock = threading.Lock()
+_key_locks = {}
+
+
+class CachedResponse:
+    """Minimal stand-in for a requests.Response built from a cached login"""
+
+    status_code = 200
+    ok = True
+    from_cache = True
+
+    def __init__(self, body):
+        self._body = body
+        self.text = json.dumps(body)
+        self.headers = {'content-type': 'application/json'}
+
+    def json(self):
+        return dict(self._body)
+
+
+def token_expiry(token):
+    """Return the JWT `exp` claim (unverified) or None"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def cache_key(url, email, password, role=None):
+    host = urlsplit(url).netloc
+    secret = hashlib.sha256(f"{email}:{password}".encode()).hexdigest()[:16]
+    return f"{host}|{role or '*'}|{email.lower()}|{secret}"
+
+
+def _fresh(entry):
+    return entry is not None and entry['expires'] - EXPIRY_SKEW > time.time()
+
+
+@contextmanager
+def _file_lock(exclusive):
+    if fcntl is None:
+        yield
+        return
+    with open(CACHE_PATH + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_file():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_file(entries):
+    directory = os.path.dirname(CACHE_PATH) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.vetbuddy-tokens-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(entries, f)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def _lookup(key):
+    with _memory_lock:
+        entry = _memory.get(key)
+    if _fresh(entry):
+        return entry
+    with _file_lock(exclusive=False):
+        entry = _read_file().get(key)
+    if _fresh(entry):
+        with _memory_lock:
+            _memory[key] = entry
+        return entry
+    return None
+
+
+def _store(key, body):
+    expires = token_expiry(body['token']) or time.time() + DEFAULT_TTL
+    entry = {'expires': expires, 'body': {'token': body['token'], 'user': body.get('user')}}
+    with _memory_lock:
+        _memory[key] = entry
+    with _file_lock(exclusive=True):
+        entries = {k: v for k, v in _read_file().items() if _fresh(v)}
+        entries[key] = entry
+        _write_file(entries)
+
+
+def cached_login(url, json=None, role=None, **kwargs):
+    """POST to /auth/login unless a fresh token for these credentials is cached"""
+    if CACHE_PATH == 'off':
+        return client.post(url, json=json, **kwargs)
+    email, password = json['email'], json['password']
+    key = cache_key(url, email, password, role)
+    with _memory_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    # One login per key at a time, so parallel runner tasks share the result
+    with key_lock:
+        entry = _lookup(key)
+        if entry is not None:
+            return CachedResponse(entry['body'])
+        response = client.post(url, json=json, **kwargs)
+        if response.status_code == 200:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            if body.get('token') and (role is None or (body.get('user') or {}).get('role') == role):
+                _store(key, body)
+        return response
+
@@ -0,0 +1,216 @@
+"""
+Performance baseline store and regression gate.
+
+A baseline is one small JSON file per endpoint in tests/baselines/,
+holding latency quantiles (median across repeated sample rounds) and
+response payload sizes. `compare` samples the same endpoints again, or
+reads latency reports written by the test scripts, and exits non-zero
+when an endpoint regressed:
+
+    p95 regression   median of the round p95s exceeds baseline p95 by more
+                     than --tolerance, AND every round's p95 is above the
+                     baseline p95 (one noisy round cannot fail the gate)
+    size regression  mean payload grew by more than --size-tolerance
+
+    python -m tests.harness.baseline record --repeat 5
+    python -m tests.harness.baseline compare --repeat 5 --tolerance 0.2
+    python -m tests.harness.baseline compare --from-reports test_reports/latency/*.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+from datetime import datetime
+
+from tests.harness.auth_cache import cached_login
+from tests.harness.client import ApiClient
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), '..', 'baselines')
+
+CLINIC_CREDENTIALS = {'email': 'demo@vetbuddy.it', 'password': 'VetBuddy2025!Secure'}
+
+# Aggregation and export endpoints that regress silently; (path, needs clinic auth)
+BENCH_ENDPOINTS = [
+    ('clinic/value-metrics?period=year', True),
+    ('clinic/value-metrics?period=month', True),
+    ('invoices/export?format=csv', True),
+    ('invoices/export?format=json', True),
+    ('roi-dashboard', True),
+    ('clinic/morning-briefing', True),
+    ('prescriptions/stats', True),
+    ('invoices', True),
+    ('pets', True),
+    ('directory/clinics', False),
+]
+
+
+def baseline_filename(key):
+    """'GET /api/clinic/value-metrics?period=year' -> 'GET_api_clinic_value-metrics_period-year.json'"""
+    return re.sub(r'[^A-Za-z0-9-]+', '_', key.replace('=', '-')).strip('_') + '.json'
+
+
+def sample_rounds(repeat, samples):
+    """Hit BENCH_ENDPOINTS `samples` times per round; return one stats dict per round"""
+    http = ApiClient()
+    response = cached_login(f"{API_URL}/auth/login", json=CLINIC_CREDENTIALS)
+    token = response.json().get('token') if response.status_code == 200 else None
+    if not token:
+        print(f"⚠️  Clinic login failed ({response.status_code}); authenticated endpoints will be skipped")
+    rounds = []
+    for round_index in range(repeat):
+        http.reset_stats()
+        for path, needs_auth in BENCH_ENDPOINTS:
+            if needs_auth and not token:
+                continue
+            headers = {'Authorization': f'Bearer {token}'} if needs_auth else {}
+            url = f"{API_URL}/{path}"
+            http.session.get(url, headers=headers, timeout=120)  # warm-up, not recorded
+            for _ in range(samples):
+                http.get(url, headers=headers)
+        rounds.append(round_stats(http.latency_report(), http.size_stats()))
+        print(f"  round {round_index + 1}/{repeat} done")
+    return rounds
+
+
+def round_stats(endpoints, sizes):
+    """Reduce one run's latency report to {endpoint: quantiles + sizes}"""
+    stats = {}
+    for key, phases in endpoints.items():
+        total = phases['total']
+        size = sizes.get(key, {})
+        stats[key] = {
+            'count': total['count'],
+            'p50_ms': total['p50_ms'],
+            'p95_ms': total['p95_ms'],
+            'p99_ms': total['p99_ms'],
+            'mean_bytes': size.get('mean_bytes', 0),
+            'max_bytes': size.get('max_bytes', 0),
+        }
+    return stats
+
+
+def rounds_from_reports(paths):
+    """Treat each latency report written by a test script as one sample round"""
+    rounds = []
+    for path in paths:
+        with open(path) as f:
+            report = json.load(f)
+        rounds.append(round_stats(report['endpoints'], report.get('sizes', {})))
+    return rounds
+
+
+def aggregate(rounds):
+    """{endpoint: baseline entry} using medians across the rounds that hit it"""
+    keys = sorted({key for r in rounds for key in r})
+    result = {}
+    for key in keys:
+        hits = [r[key] for r in rounds if key in r]
+        result[key] = {
+            'endpoint': key,
+            'repeats': len(hits),
+            'samples': sum(h['count'] for h in hits),
+            'p50_ms': statistics.median(h['p50_ms'] for h in hits),
+            'p95_ms': statistics.median(h['p95_ms'] for h in hits),
+            'p99_ms': statistics.median(h['p99_ms'] for h in hits),
+            'p95_rounds_ms': [h['p95_ms'] for h in hits],
+            'mean_bytes': statistics.median(h['mean_bytes'] for h in hits),
+            'max_bytes': max(h['max_bytes'] for h in hits),
+        }
+    return result
+
+
+def save_baseline(entries, directory=BASELINE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    recorded = datetime.now().isoformat(timespec='seconds')
+    for key, entry in entries.items():
+        with open(os.path.join(directory, baseline_filename(key)), 'w') as f:
+            json.dump(dict(entry, recorded=recorded, base_url=BASE_URL), f, indent=2)
+            f.write('\n')
+    print(f"💾 Baseline written for {len(entries)} endpoints in {os.path.relpath(directory)}/")
+
+
+def load_baseline(directory=BASELINE_DIR):
+    entries = {}
+    if not os.path.isdir(directory):
+        return entries
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                entry = json.load(f)
+            entries[entry['endpoint']] = entry
+    return entries
+
+
+def compare(baseline, current, tolerance, size_tolerance):
+    """Return [(endpoint, verdict, detail)]; verdict is ok, REGRESSED, new or not sampled"""
+    results = []
+    for key in sorted(set(baseline) | set(current)):
+        if key not in baseline:
+            results.append((key, 'new', 'no baseline'))
+            continue
+        if key not in current:
+            results.append((key, 'not sampled', ''))
+            continue
+        base, cur = baseline[key], current[key]
+        limit = base['p95_ms'] * (1 + tolerance)
+        slowest_ok = min(cur['p95_rounds_ms']) <= base['p95_ms']
+        detail = (f"p95 {base['p95_ms']:.0f} -> {cur['p95_ms']:.0f}ms "
+                  f"(limit {limit:.0f}ms, rounds {', '.join(f'{v:.0f}' for v in cur['p95_rounds_ms'])})")
+        verdict = 'ok'
+        if cur['p95_ms'] > limit and not slowest_ok:
+            verdict = 'REGRESSED'
+        if base['mean_bytes'] and cur['mean_bytes'] > base['mean_bytes'] * (1 + size_tolerance):
+            verdict = 'REGRESSED'
+            detail += f"; size {base['mean_bytes']:.0f} -> {cur['mean_bytes']:.0f}B"
+        results.append((key, verdict, detail))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VetBuddy performance baseline and regression gate")
+    parser.add_argument('command', choices=['record', 'compare'])
+    parser.add_argument('--repeat', type=int, default=5, help="sample rounds (noise control)")
+    parser.add_argument('--samples', type=int, default=10, help="requests per endpoint per round")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p95 growth (0.2 = 20%%)")
+    parser.add_argument('--size-tolerance', type=float, default=0.25, help="allowed payload growth")
+    parser.add_argument('--from-reports', nargs='+', metavar='REPORT',
+                        help="use test_reports/latency/*.json files as rounds instead of sampling")
+    parser.add_argument('--baseline-dir', default=BASELINE_DIR)
+    args = parser.parse_args()
+
+    if args.from_reports:
+        rounds = rounds_from_reports(args.from_reports)
+    else:
+        print(f"📏 Sampling {len(BENCH_ENDPOINTS)} endpoints: {args.repeat} rounds x {args.samples} requests")
+        rounds = sample_rounds(args.repeat, args.samples)
+    current = aggregate(rounds)
+    if len(rounds) < 3:
+        print(f"⚠️  Only {len(rounds)} round(s): noise is not controlled, use --repeat 3 or more")
+
+    if args.command == 'record':
+        save_baseline(current, args.baseline_dir)
+        return 0
+
+    baseline = load_baseline(args.baseline_dir)
+    if not baseline:
+        print(f"❌ No baseline in {args.baseline_dir}; run 'record' first")
+        return 1
+    results = compare(baseline, current, args.tolerance, args.size_tolerance)
+    print(f"\n{'='*100}")
+    print(f"PERFORMANCE GATE - tolerance p95 +{args.tolerance*100:.0f}%, size +{args.size_tolerance*100:.0f}%")
+    print(f"{'='*100}")
+    symbols = {'ok': '✅', 'REGRESSED': '❌', 'new': 'ℹ️ ', 'not sampled': '⚠️ '}
+    for key, verdict, detail in results:
+        print(f"{symbols[verdict]} {key:<50} {verdict:<12} {detail}")
+    regressions = [r for r in results if r[1] == 'REGRESSED']
+    print(f"\n{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Pooled HTTP client for the VetBuddy backend test scripts.
+
+One keep-alive requests.Session per process, with tuned connection pools,
+per-endpoint timeouts and retries on transient failures. The module-level
+get/post/put/delete/patch functions are drop-in replacements for the
+matching requests.* calls used throughout the test scripts.
+
+Every request is recorded into per-endpoint HDR-style histograms split
+into connect (TCP + TLS, zero on a reused connection), TTFB and total
+time. At exit a JSON summary is written to test_reports/latency/.
+
+Environment:
+    VETBUDDY_HTTP_POOL_SIZE   connections kept alive per host (default 32)
+    VETBUDDY_HTTP_RETRIES     retries on connect errors, and on 502-504 for GET/HEAD/OPTIONS (default 2)
+    VETBUDDY_HTTP_TIMEOUT     default timeout in seconds (default 30)
+    VETBUDDY_HTTP_STATS       print connection reuse and latency at exit
+    VETBUDDY_LATENCY_REPORT   report directory, or "off" to skip the summary
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from tests.harness.histogram import EndpointHistograms
+
+DEFAULT_POOL_SIZE = int(os.getenv('VETBUDDY_HTTP_POOL_SIZE', '32'))
+DEFAULT_RETRIES = int(os.getenv('VETBUDDY_HTTP_RETRIES', '2'))
+DEFAULT_TIMEOUT = float(os.getenv('VETBUDDY_HTTP_TIMEOUT', '30'))
+LATENCY_REPORT_DIR = os.getenv(
+    'VETBUDDY_LATENCY_REPORT',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'test_reports', 'latency'),
+)
+
+# Per-endpoint timeouts (seconds), matched on the longest path prefix
+ENDPOINT_TIMEOUTS = {
+    '/api/auth/login': 15,
+    '/api/health': 10,
+    '/api/ai': 60,
+    '/api/chat': 60,
+    '/api/tutorials/download': 60,
+    '/api/invoices/export': 120,
+    '/api/invoices/download-all': 120,
+    '/api/documents/download-all': 120,
+    '/api/previsit/upload': 60,
+    '/api/cron': 120,
+}
+
+# Path segments that identify a single resource rather than an endpoint
+_ID_SEGMENT = re.compile(
+    r'^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+    r'|[0-9a-f]{24}|\d+|cs_\w+|sub_\w+|cus_\w+|evt_\w+)$',
+    re.IGNORECASE,
+)
+# Query parameters whose value is part of the endpoint identity
+_KEY_PARAMS = {'period', 'format', 'type', 'action', 'status', 'tool'}
+
+
+def endpoint_key(method, url):
+    """Normalize a request into an endpoint key, e.g. 'GET /api/pets/{id}'"""
+    parts = urlsplit(url)
+    segments = ['{id}' if _ID_SEGMENT.match(s) else s for s in parts.path.split('/')]
+    key = f"{method.upper()} {'/'.join(segments) or '/'}"
+    params = sorted((k, v) for k, v in parse_qsl(parts.query) if k in _KEY_PARAMS)
+    if params:
+        key += '?' + '&'.join(f"{k}={v}" for k, v in params)
+    return key
+
+
+# Seconds spent opening connections during the current request, per thread
+_timing = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _timing.connect = getattr(_timing, 'connect', 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _timing.connect = getattr(_timing, 'connect', 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools time TCP connect + TLS handshake"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class ApiClient:
+    """Thread-safe keep-alive client with connection reuse and latency stats"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, timeouts=None):
+        self.timeouts = dict(ENDPOINT_TIMEOUTS, **(timeouts or {}))
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            # A 502/504 from the proxy can arrive after the backend applied a write;
+            # replaying PUT/DELETE then fails with a 404 that is not a real failure
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            raise_on_status=False,
+        )
+        adapter = _TimedAdapter(pool_connections=8, pool_maxsize=pool_size,
+                              max_retries=retry, pool_block=False)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._adapter = adapter
+        self.histograms = EndpointHistograms()
+        self._sizes = {}
+        self._sizes_lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        """Send a request on the pooled session, applying the endpoint timeout"""
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self._timeout_for(url)
+        _timing.connect = 0.0
+        started = time.perf_counter()
+        response = self.session.request(method, url, **kwargs)
+        total = time.perf_counter() - started
+        connect = _timing.connect
+        # elapsed runs from sending the request to parsing the response headers
+        ttfb = max(0.0, response.elapsed.total_seconds() - connect)
+        if kwargs.get('params'):
+            url += ('&' if '?' in url else '?') + urlencode(kwargs['params'], doseq=True)
+        key = endpoint_key(method, url)
+        self.histograms.record(key, connect=connect, ttfb=ttfb, total=total)
+        if kwargs.get('stream'):
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        self._record_size(key, size)
+        return response
+
+    def _record_size(self, key, size):
+        with self._sizes_lock:
+            count, total, largest = self._sizes.get(key, (0, 0, 0))
+            self._sizes[key] = (count + 1, total + size, max(largest, size))
+
+    def reset_stats(self):
+        """Start a fresh recording window (latency histograms and payload sizes)"""
+        self.histograms = EndpointHistograms()
+        with self._sizes_lock:
+            self._sizes = {}
+
+    def size_stats(self):
+        """Return {endpoint: {'count', 'mean_bytes', 'max_bytes'}} of response bodies"""
+        with self._sizes_lock:
+            return {
+                key: {'count': count, 'mean_bytes': total / count, 'max_bytes': largest}
+                for key, (count, total, largest) in sorted(self._sizes.items())
+            }
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def _timeout_for(self, url):
+        path = urlsplit(url).path
+        matches = [p for p in self.timeouts if path.startswith(p)]
+        return self.timeouts[max(matches, key=len)] if matches else DEFAULT_TIMEOUT
+
+    def connection_stats(self):
+        """Return requests sent vs TCP/TLS connections opened across all pools"""
+        pools = self._adapter.poolmanager.pools
+        connections = requests_sent = 0
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+        reuse = 1 - connections / requests_sent if requests_sent else 0.0
+        return {'requests': requests_sent, 'connections': connections, 'reuse_ratio': reuse}
+
+    def latency_stats(self, phase='total'):
+        """Return {endpoint: summary} for one phase (connect, ttfb or total)"""
+        return {key: phases[phase] for key, phases in self.latency_report().items()}
+
+    def latency_report(self):
+        """Return {endpoint: {phase: summary + buckets}} for every recorded request"""
+        return self.histograms.to_dict()
+
+    def print_stats(self):
+        """Print connection reuse and per-endpoint latency"""
+        conn = self.connection_stats()
+        print(f"\n{'='*80}")
+        print("HTTP CLIENT STATS")
+        print(f"{'='*80}")
+        print(f"Requests: {conn['requests']}  Connections opened: {conn['connections']}  "
+              f"Reuse: {conn['reuse_ratio']*100:.1f}%")
+        for key, phases in self.latency_report().items():
+            s, c = phases['total'], phases['connect']
+            print(f"  {key:<55} n={s['count']:<4} p50={s['p50_ms']:7.1f}ms p95={s['p95_ms']:7.1f}ms "
+                  f"p99={s['p99_ms']:7.1f}ms connect={c['mean_ms']:6.1f}ms")
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _print_stats_at_exit():
+    if _client is not None:
+        _client.print_stats()
+
+
+def write_latency_report(directory=LATENCY_REPORT_DIR):
+    """Write this process's latency histograms as JSON; returns the path or None"""
+    if _client is None or not _client.histograms.endpoints or directory == 'off':
+        return None
+    script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0] or 'python'
+    report = {
+        'script': script,
+        'pid': os.getpid(),
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'connections': _client.connection_stats(),
+        'endpoints': _client.latency_report(),
+        'sizes': _client.size_stats(),
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{script}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+    return path
+
+
+if os.getenv('VETBUDDY_HTTP_STATS'):
+    atexit.register(_print_stats_at_exit)
+atexit.register(write_latency_report)
+
+
+def get_client():
+    """Return the process-wide ApiClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ApiClient()
+    return _client
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, timeouts=None):
+    """Replace the process-wide client with one using the given settings"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = ApiClient(pool_size=pool_size, retries=retries, timeouts=timeouts)
+    return _client
+
+
+def request(method, url, **kwargs):
+    return get_client().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+
+def put(url, **kwargs):
+    return get_client().put(url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return get_client().patch(url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return get_client().delete(url, **kwargs)
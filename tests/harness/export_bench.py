@@ -0,0 +1,302 @@
+"""
+Large-export benchmark for GET /api/invoices/export.
+
+For every size in --sizes a throwaway clinic with that many invoices is
+seeded with FixtureRun. The benchmark logs in as that clinic and
+downloads each format with streaming reads:
+
+    csv    the whole year, parsed incrementally with csv.reader; the row
+           count must equal the number of invoice items in MongoDB
+    json   the whole year, walked item by item with stream_json; the
+           'fatture' count must equal the number of invoices
+    html   one invoice per request (the route only renders single
+           invoices), --html-samples times
+
+Each download reports TTFB, total time and bytes. The peak client memory
+comes from a second pass of the same download under tracemalloc, whose
+timings are discarded because tracing slows the parsing; --no-memory
+skips that pass. A download fails when the server stays silent
+for longer than the export endpoint's client timeout (120s, or
+--timeout), which is how year-end accountant exports fail for clinics.
+The clinic's documents are torn down after each size.
+Results are written to test_reports/export_bench/.
+
+    python -m tests.harness.export_bench --sizes 1000,10000,100000 --formats csv,json,html [--no-memory]
+
+Requires pymongo, bcrypt (the fixture clinic has to log in) and MONGO_URL.
+"""
+
+import argparse
+import codecs
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import requests
+
+from tests.harness import client, mongo, stream_json
+from tests.harness.auth_cache import cached_login
+from tests.harness.fixtures import FixtureRun, ensure_indexes
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+MONGO_URL = os.getenv('MONGO_URL')
+DB_NAME = os.getenv('DB_NAME', 'vetbuddy')
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'test_reports', 'export_bench')
+
+FORMATS = ('csv', 'json', 'html')
+CSV_COLUMNS = 20
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_ints(text):
+    return [int(float(v)) for v in text.split(',') if v.strip()]
+
+
+def _lines(chunks, encoding='utf-8'):
+    """Decoded lines, line endings kept, so csv.reader sees quoted newlines intact"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    pending = ''
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # The last piece may be the start of a longer line
+        pending = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        yield from lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+class Measured:
+    """Stream one response while timing it"""
+
+    def __init__(self, response, started):
+        self.response = response
+        self.started = started
+        self.ttfb = time.perf_counter() - started
+        self.bytes = 0
+
+    def chunks(self):
+        for chunk in self.response.iter_content(chunk_size=CHUNK_SIZE):
+            self.bytes += len(chunk)
+            yield chunk
+
+
+def download(url, headers, consume, timeout=None, trace_memory=False):
+    """GET url with a streaming read; consume(measured) parses it and returns a dict.
+
+    With trace_memory the peak client memory is recorded instead of the
+    timings, which tracemalloc inflates.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = {'url': url}
+    try:
+        response = client.get(url, headers=headers, stream=True, timeout=timeout)
+        measured = Measured(response, started)
+        result.update(status=response.status_code, ttfb_ms=measured.ttfb * 1000)
+        if response.status_code == 200:
+            result.update(consume(measured))
+        else:
+            result['error'] = response.text[:300]
+        response.close()
+        result['bytes'] = measured.bytes
+    except requests.exceptions.RequestException as e:
+        result.setdefault('status', None)
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        result['total_ms'] = (time.perf_counter() - started) * 1000
+        if trace_memory:
+            result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            result.pop('ttfb_ms', None)
+            result.pop('total_ms')
+    return result
+
+
+def measure(url, headers, consume, timeout=None, memory=True):
+    """Timed download, then (memory=True) a separate traced one for the peak client memory"""
+    result = download(url, headers, consume, timeout)
+    result['peak_memory_bytes'] = None
+    if memory and result.get('status') == 200:
+        traced = download(url, headers, consume, timeout, trace_memory=True)
+        result['peak_memory_bytes'] = traced.get('peak_memory_bytes')
+    return result
+
+
+def consume_csv(measured):
+    reader = csv.reader(_lines(measured.chunks(), measured.response.encoding or 'utf-8'))
+    header = next(reader, None)
+    rows = malformed = 0
+    for row in reader:
+        rows += 1
+        if len(row) != CSV_COLUMNS:
+            malformed += 1
+    return {'rows': rows, 'malformed_rows': malformed, 'columns': len(header or [])}
+
+
+def consume_json(measured):
+    stream = stream_json.StreamedList(measured.response, key='fatture', chunks=measured.chunks())
+    invoices = sum(1 for _ in stream)
+    return {'rows': invoices, 'declared': stream.fields.get('totale_fatture')}
+
+
+def consume_html(measured):
+    size = sum(len(chunk) for chunk in measured.chunks())
+    return {'rows': 1 if size else 0}
+
+
+class ExportBench:
+    """Seeds one clinic per size, measures its exports, removes it"""
+
+    def __init__(self, db, timeout=None, html_samples=10, memory=True):
+        self.db = db
+        self.timeout = timeout
+        self.html_samples = html_samples
+        self.memory = memory
+
+    def expected(self, clinic_id, year):
+        """(invoices, csv rows) the export of `year` should contain"""
+        match = {'clinicId': clinic_id, 'issueDate': {'$gte': f"{year}-01-01", '$lte': f"{year}-12-31"}}
+        totals = list(self.db.invoices.aggregate([
+            {'$match': match},
+            {'$group': {'_id': None, 'invoices': {'$sum': 1}, 'rows': {'$sum': {'$size': '$items'}}}},
+        ]))
+        return (totals[0]['invoices'], totals[0]['rows']) if totals else (0, 0)
+
+    def run_size(self, size, formats, year):
+        with FixtureRun(self.db) as run:
+            seeded = time.perf_counter()
+            scenario = run.clinic_scenario(owners=max(10, size // 25), pets=max(10, size // 10),
+                                           appointments=0, prescriptions=0, invoices=size)
+            run.flush()
+            seed_seconds = time.perf_counter() - seeded
+            if not scenario['password']:
+                raise RuntimeError("bcrypt is not installed: the fixture clinic cannot log in")
+            login = cached_login(f"{API_URL}/auth/login",
+                                 json={'email': scenario['email'], 'password': scenario['password']})
+            if login.status_code != 200:
+                raise RuntimeError(f"fixture clinic login failed: {login.status_code} {login.text[:200]}")
+            headers = {'Authorization': f"Bearer {login.json()['token']}"}
+            invoices, rows = self.expected(scenario['clinic_id'], year)
+            print(f"\n🌱 {size} invoices seeded in {seed_seconds:.1f}s "
+                  f"({invoices} issued in {year}, {rows} CSV rows expected)")
+
+            period = f"from={year}-01-01&to={year}-12-31"
+            results = []
+            for fmt in formats:
+                if fmt == 'csv':
+                    r = measure(f"{API_URL}/invoices/export?format=csv&{period}", headers, consume_csv,
+                                self.timeout, self.memory)
+                    r['expected_rows'] = rows
+                elif fmt == 'json':
+                    r = measure(f"{API_URL}/invoices/export?format=json&{period}", headers, consume_json,
+                                self.timeout, self.memory)
+                    r['expected_rows'] = invoices
+                else:
+                    r = self.run_html(scenario['clinic_id'], headers)
+                r.update(size=size, format=fmt)
+                r['ok'] = r.get('status') == 200 and r.get('rows') == r.get('expected_rows') \
+                    and r.get('declared', r.get('rows')) == r.get('rows') \
+                    and not r.get('malformed_rows') and 'error' not in r
+                print_row(r)
+                results.append(r)
+            return results
+
+    def run_html(self, clinic_id, headers):
+        ids = [doc['id'] for doc in self.db.invoices.find({'clinicId': clinic_id}, {'id': 1})
+               .limit(self.html_samples)]
+        samples = [measure(f"{API_URL}/invoices/export?format=html&id={invoice_id}", headers, consume_html,
+                           self.timeout, self.memory) for invoice_id in ids]
+        ok = [s for s in samples if s.get('status') == 200]
+        failed = [s for s in samples if s.get('status') != 200]
+        result = {
+            'status': failed[0].get('status') if failed else 200,
+            'rows': len(ok),
+            'expected_rows': len(samples),
+            'bytes': sum(s.get('bytes', 0) for s in samples),
+            'ttfb_ms': statistics.median(s['ttfb_ms'] for s in ok) if ok else None,
+            'total_ms': statistics.median(s['total_ms'] for s in ok) if ok else None,
+            'peak_memory_bytes': max((s['peak_memory_bytes'] for s in samples
+                                      if s['peak_memory_bytes'] is not None), default=None),
+        }
+        errors = [s['error'] for s in samples if 'error' in s]
+        if errors:
+            result['error'] = errors[0]
+        return result
+
+
+def _fmt(value, unit='ms'):
+    return f"{value:>8.0f}{unit}" if value is not None else f"{'-':>{8 + len(unit)}}"
+
+
+def print_header():
+    print(f"\n{'invoices':>9} {'format':<6} {'status':>6} {'TTFB':>10} {'total':>10} {'MB':>8} "
+          f"{'peak mem':>9} {'rows':>15}")
+
+
+def print_row(r):
+    rows = f"{r.get('rows', '-')}/{r.get('expected_rows', '-')}"
+    peak = f"{r['peak_memory_bytes'] / 1024:>7.0f}KB" if r['peak_memory_bytes'] is not None else f"{'-':>9}"
+    flag = '✅' if r['ok'] else '❌'
+    print(f"{r['size']:>9} {r['format']:<6} {str(r.get('status')):>6} {_fmt(r.get('ttfb_ms'))} "
+          f"{_fmt(r.get('total_ms'))} {r.get('bytes', 0) / 1e6:>8.2f} "
+          f"{peak} {rows:>15} {flag} {r.get('error', '')[:80]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invoice export benchmark (csv, json, html)")
+    parser.add_argument('--sizes', type=parse_ints, default=parse_ints('1000,10000,100000'),
+                        help="invoices to seed per run, comma-separated")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="comma-separated subset of csv,json,html")
+    parser.add_argument('--html-samples', type=int, default=10, help="single-invoice HTML exports per size")
+    parser.add_argument('--timeout', type=float, help="client timeout per download in seconds (default 120)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the second, traced download that measures peak client memory")
+    parser.add_argument('--year', type=int, default=date.today().year, help="export period (fixtures are this year)")
+    args = parser.parse_args()
+
+    formats = [f for f in args.formats.split(',') if f]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+    if not MONGO_URL:
+        print("❌ MONGO_URL is not set: the benchmark seeds its invoices in MongoDB")
+        return 1
+
+    db = mongo.get_db(MONGO_URL, DB_NAME)
+    ensure_indexes(db)
+    bench = ExportBench(db, timeout=args.timeout, html_samples=args.html_samples, memory=not args.no_memory)
+    print(f"📤 Export benchmark against {API_URL}: {args.sizes} invoices x {', '.join(formats)}")
+    print_header()
+    results = []
+    for size in args.sizes:
+        try:
+            results += bench.run_size(size, formats, args.year)
+        except RuntimeError as e:
+            print(f"❌ {size} invoices: {e}")
+            return 1
+
+    report = {
+        'base_url': BASE_URL,
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'year': args.year,
+        'results': results,
+    }
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"export_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {os.path.relpath(path)}")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
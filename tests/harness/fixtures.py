@@ -0,0 +1,309 @@
+"""
+Bulk MongoDB fixtures: whole clinic scenarios seeded in unordered batches.
+
+Every document a FixtureRun writes carries the run's tag in FIXTURE_FIELD,
+so teardown is one delete per collection on an indexed field instead of a
+chain of id lists and regexes. Documents are buffered per collection and
+written with unordered insert_many batches as the buffer fills, so a
+10k-pet clinic is seeded in a few dozen round trips with bounded memory:
+
+    with FixtureRun(db) as run:
+        scenario = run.clinic_scenario(owners=4000, pets=10000, appointments=20000)
+        run.flush()
+        ...  # log in with scenario['email'] / scenario['password']
+    # all documents tagged with run.tag are gone here
+
+    python -m tests.harness.fixtures seed --pets 10000
+    python -m tests.harness.fixtures teardown --tag run-1a2b3c4d5e6f
+    python -m tests.harness.fixtures purge
+
+Clinic and owner passwords are bcrypt-hashed once per run when the bcrypt
+package is installed (pip install bcrypt); without it the data is seeded
+the same way but the fixture users cannot log in.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from pymongo.errors import BulkWriteError
+
+from tests.harness import mongo
+
+FIXTURE_FIELD = '_fixtureRun'
+FIXTURE_PASSWORD = 'Fixture2025!'
+COLLECTIONS = ('users', 'pets', 'appointments', 'prescriptions', 'invoices')
+DEFAULT_BATCH_SIZE = 1000
+
+SPECIES = [('cane', ['Labrador', 'Meticcio', 'Pastore Tedesco', 'Beagle', 'Golden Retriever']),
+           ('gatto', ['Europeo', 'Persiano', 'Maine Coon', 'Siamese']),
+           ('coniglio', ['Ariete', 'Nano'])]
+PET_NAMES = ['Luna', 'Max', 'Bella', 'Rocky', 'Milo', 'Nala', 'Leo', 'Kira', 'Otto', 'Zoe', 'Birba', 'Pepe']
+FIRST_NAMES = ['Marco', 'Giulia', 'Luca', 'Francesca', 'Alessandro', 'Sara', 'Matteo', 'Chiara', 'Davide', 'Elena']
+LAST_NAMES = ['Rossi', 'Bianchi', 'Romano', 'Colombo', 'Ricci', 'Marino', 'Greco', 'Bruno', 'Gallo', 'Conti']
+SERVICES = [('Visita generale', 45.0), ('Vaccinazione', 35.0), ('Controllo post-operatorio', 30.0),
+            ('Esami del sangue', 60.0), ('Pulizia dentale', 120.0), ('Ecografia', 80.0)]
+APPOINTMENT_STATUSES = ['scheduled', 'completed', 'completed', 'completed', 'cancelled', 'pending']
+PRESCRIPTION_STATUSES = ['DRAFT', 'EMITTED', 'EMITTED', 'REGISTERED_MANUALLY']
+INVOICE_STATUSES = ['issued', 'issued', 'paid', 'paid', 'paid', 'draft']
+
+
+def hash_password(password):
+    """bcrypt hash compatible with lib/auth.js, or None when bcrypt is missing"""
+    try:
+        import bcrypt
+    except ImportError:
+        return None
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(10)).decode()
+
+
+def ensure_indexes(db, collections=COLLECTIONS):
+    """Sparse index on the run tag, so teardown never scans real data"""
+    for name in collections:
+        db[name].create_index(FIXTURE_FIELD, sparse=True, name='fixture_run')
+
+
+def purge(db, tag=None, collections=COLLECTIONS):
+    """Delete one run's documents, or every fixture document when tag is None"""
+    query = {FIXTURE_FIELD: tag} if tag else {FIXTURE_FIELD: {'$exists': True}}
+    return {name: db[name].delete_many(query).deleted_count for name in collections}
+
+
+class FixtureRun:
+    """Run-scoped fixture writer; use as a context manager to tear down on exit"""
+
+    def __init__(self, db, tag=None, batch_size=DEFAULT_BATCH_SIZE, seed=None):
+        self.db = db
+        self.tag = tag or f"run-{uuid.uuid4().hex[:12]}"
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.inserted = {}
+        self.batches = 0
+        self._pending = {}
+        self._collections = set()
+        self._password_hash = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.teardown()
+
+    def add(self, collection, document):
+        """Tag and buffer a document; full buffers are written immediately"""
+        document[FIXTURE_FIELD] = self.tag
+        buffer = self._pending.setdefault(collection, [])
+        buffer.append(document)
+        self._collections.add(collection)
+        if len(buffer) >= self.batch_size:
+            self._write(collection)
+        return document
+
+    def add_many(self, collection, documents):
+        for document in documents:
+            self.add(collection, document)
+
+    def _write(self, collection):
+        documents = self._pending.pop(collection, [])
+        if not documents:
+            return
+        try:
+            result = self.db[collection].insert_many(documents, ordered=False)
+            written = len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered: everything but the failing documents is written
+            written = e.details.get('nInserted', 0)
+            errors = e.details.get('writeErrors', [])
+            print(f"⚠️  {collection}: {len(errors)} fixture document(s) rejected: "
+                  f"{errors[0].get('errmsg') if errors else e}")
+        self.inserted[collection] = self.inserted.get(collection, 0) + written
+        self.batches += 1
+
+    def flush(self):
+        """Write all buffered documents; returns {collection: documents written so far}"""
+        for collection in list(self._pending):
+            self._write(collection)
+        return dict(self.inserted)
+
+    def teardown(self):
+        """One indexed delete per collection this run touched"""
+        self._pending.clear()
+        if not self._collections:
+            return {}
+        collections = sorted(self._collections)
+        ensure_indexes(self.db, collections)
+        return purge(self.db, self.tag, collections)
+
+    def password_hash(self):
+        if self._password_hash is False:
+            self._password_hash = hash_password(FIXTURE_PASSWORD)
+        return self._password_hash
+
+    def _person(self):
+        return f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}"
+
+    def _day(self, start, span_days):
+        return (start + timedelta(days=self.random.randrange(span_days))).isoformat()
+
+    def clinic_scenario(self, owners=50, pets=100, appointments=200, prescriptions=50, invoices=100,
+                        city='Milano'):
+        """Buffer a clinic with its owners, pets, appointments, prescriptions and invoices"""
+        rnd = self.random
+        now = datetime.utcnow().isoformat()
+        today = date.today()
+        suffix = uuid.uuid4().hex[:8]
+        clinic_id = str(uuid.uuid4())
+        clinic_name = f"Clinica Fixture {suffix}"
+        email = f"fixture-clinic-{suffix}@vetbuddy.test"
+        clinic = self.add('users', {
+            'id': clinic_id, 'email': email, 'password': self.password_hash(),
+            'name': clinic_name, 'role': 'clinic', 'clinicName': clinic_name,
+            'phone': '+39 02 0000000', 'address': 'Via Fixture 1', 'city': city,
+            'vatNumber': '00000000000', 'services': [], 'emailVerified': True,
+            'phoneVerified': True, 'createdAt': now,
+        })
+
+        owner_docs = []
+        for i in range(max(1, owners)):
+            name = self._person()
+            owner_docs.append(self.add('users', {
+                'id': str(uuid.uuid4()), 'email': f"fixture-owner-{suffix}-{i}@vetbuddy.test",
+                'password': self.password_hash(), 'name': name, 'role': 'owner',
+                'clinicId': clinic_id, 'phone': f"+39 3{rnd.randrange(10**8, 10**9)}",
+                'city': city, 'emailVerified': True, 'createdAt': now,
+            }))
+
+        pet_docs = []
+        for i in range(pets):
+            owner = owner_docs[i % len(owner_docs)]
+            species, breeds = rnd.choice(SPECIES)
+            pet_docs.append(self.add('pets', {
+                'id': str(uuid.uuid4()), 'name': rnd.choice(PET_NAMES), 'species': species,
+                'breed': rnd.choice(breeds), 'birthDate': self._day(today - timedelta(days=15 * 365), 14 * 365),
+                'weight': round(rnd.uniform(2, 40), 1), 'microchip': f"380{rnd.randrange(10**11, 10**12)}",
+                'sterilized': rnd.random() < 0.6, 'allergies': '', 'medications': '', 'notes': '',
+                'ownerId': owner['id'], 'ownerName': owner['name'], 'clinicId': clinic_id, 'createdAt': now,
+            }))
+
+        def pick_pet():
+            return rnd.choice(pet_docs) if pet_docs else {'id': None, 'name': None, 'ownerId': owner_docs[0]['id'],
+                                                          'ownerName': owner_docs[0]['name']}
+
+        for _ in range(appointments):
+            pet = pick_pet()
+            service, _price = rnd.choice(SERVICES)
+            self.add('appointments', {
+                'id': str(uuid.uuid4()), 'clinicId': clinic_id, 'ownerId': pet['ownerId'],
+                'ownerName': pet['ownerName'], 'petId': pet['id'], 'petName': pet['name'],
+                'date': self._day(today - timedelta(days=180), 270),
+                'time': f"{rnd.randrange(8, 19):02d}:{rnd.choice(['00', '30'])}",
+                'type': 'visita', 'duration': 30, 'reason': service, 'notes': '',
+                'status': rnd.choice(APPOINTMENT_STATUSES), 'createdAt': now,
+            })
+
+        for _ in range(prescriptions):
+            pet = pick_pet()
+            status = rnd.choice(PRESCRIPTION_STATUSES)
+            self.add('prescriptions', {
+                'id': str(uuid.uuid4()), 'clinicId': clinic_id, 'petId': pet['id'], 'petName': pet['name'],
+                'ownerId': pet['ownerId'], 'ownerName': pet['ownerName'],
+                'veterinarianUserId': clinic_id, 'veterinarianName': clinic_name,
+                'createdByUserId': clinic_id, 'createdByName': clinic_name, 'status': status,
+                'prescriptionType': 'standard', 'diagnosisNote': 'Fixture', 'dosageInstructions': '1 cp/die',
+                'treatmentDuration': '7 giorni', 'issueDate': None if status == 'DRAFT' else now,
+                'externalSystem': 'vetinfo', 'externalPrescriptionNumber': None, 'externalPin': None,
+                'externalStatus': None, 'visibleToOwner': status != 'DRAFT',
+                'createdAt': now, 'updatedAt': now,
+            })
+
+        year = today.year
+        number = 0
+        for _ in range(invoices):
+            pet = pick_pet()
+            items = [{'id': str(uuid.uuid4()), 'description': description, 'quantity': 1,
+                      'unitPrice': price, 'total': price}
+                     for description, price in rnd.sample(SERVICES, rnd.randrange(1, 4))]
+            subtotal = sum(item['total'] for item in items)
+            vat = round(subtotal * 0.22, 2)
+            bollo = 2.0 if subtotal > 77.47 else 0
+            status = rnd.choice(INVOICE_STATUSES)
+            issue = None if status == 'draft' else self._day(date(year, 1, 1), max(1, today.timetuple().tm_yday))
+            if status != 'draft':
+                number += 1
+            self.add('invoices', {
+                'id': str(uuid.uuid4()), 'invoiceNumber': None if status == 'draft' else f"{year}/{number:03d}",
+                'clinicId': clinic_id, 'clinicName': clinic_name, 'clinicEmail': email,
+                'customerId': pet['ownerId'], 'customerName': pet['ownerName'], 'items': items,
+                'totals': {'subtotal': round(subtotal, 2), 'vatRate': 22, 'vatAmount': vat,
+                           'bolloAmount': bollo, 'total': round(subtotal + vat + bollo, 2)},
+                'petId': pet['id'], 'petName': pet['name'], 'notes': '', 'status': status,
+                'issueDate': issue, 'dueDate': None, 'paidDate': issue if status == 'paid' else None,
+                'exportedTo': None, 'exportedAt': None, 'externalId': None,
+                'createdAt': now, 'createdBy': clinic_id, 'updatedAt': now,
+            })
+
+        return {
+            'tag': self.tag,
+            'clinic_id': clinic['id'],
+            'email': email,
+            'password': FIXTURE_PASSWORD if clinic['password'] else None,
+            'owner_ids': [o['id'] for o in owner_docs],
+            'pet_ids': [p['id'] for p in pet_docs],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed or remove bulk VetBuddy MongoDB fixtures")
+    parser.add_argument('command', choices=['seed', 'teardown', 'purge'])
+    parser.add_argument('--tag', help="run tag (teardown; optional for seed)")
+    parser.add_argument('--clinics', type=int, default=1)
+    parser.add_argument('--owners', type=int, default=4000, help="owners per clinic")
+    parser.add_argument('--pets', type=int, default=10000, help="pets per clinic")
+    parser.add_argument('--appointments', type=int, default=20000, help="appointments per clinic")
+    parser.add_argument('--prescriptions', type=int, default=2000, help="prescriptions per clinic")
+    parser.add_argument('--invoices', type=int, default=5000, help="invoices per clinic")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, help="random seed for reproducible data")
+    args = parser.parse_args()
+
+    if not os.getenv('MONGO_URL'):
+        print("❌ MONGO_URL is not set")
+        return 1
+    db = mongo.get_db()
+
+    if args.command == 'teardown':
+        if not args.tag:
+            parser.error("teardown needs --tag")
+        ensure_indexes(db)
+        print(f"🧹 Removed {purge(db, args.tag)}")
+        return 0
+    if args.command == 'purge':
+        ensure_indexes(db)
+        print(f"🧹 Removed all fixture documents: {purge(db)}")
+        return 0
+
+    ensure_indexes(db)
+    run = FixtureRun(db, tag=args.tag, batch_size=args.batch_size, seed=args.seed)
+    started = time.perf_counter()
+    scenarios = [run.clinic_scenario(owners=args.owners, pets=args.pets, appointments=args.appointments,
+                                     prescriptions=args.prescriptions, invoices=args.invoices)
+                 for _ in range(args.clinics)]
+    counts = run.flush()
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"🌱 Seeded {total} documents in {run.batches} batches, {elapsed:.1f}s "
+          f"({total / elapsed:.0f} docs/s): {counts}")
+    for scenario in scenarios:
+        login = f"{scenario['email']} / {scenario['password']}" if scenario['password'] else \
+            f"{scenario['email']} (no password: install bcrypt to enable login)"
+        print(f"   clinic {scenario['clinic_id']}: {login}")
+    print(f"   remove with: python -m tests.harness.fixtures teardown --tag {run.tag}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
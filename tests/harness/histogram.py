@@ -0,0 +1,156 @@
+"""
+HDR-style latency histograms.
+
+Values are recorded in microseconds into log-linear buckets: exact below
+128us, then 64 sub-buckets per power of two up to ~17 minutes, giving
+~1.6% worst-case relative error in a fixed 1,600-counter array no matter
+how many samples are recorded. Histograms merge by adding counters, so
+per-thread and per-process recordings combine losslessly.
+"""
+
+import json
+import threading
+
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS          # 64 sub-buckets per octave
+LINEAR_LIMIT = SUB_BUCKETS * 2              # values below this are exact
+MAX_VALUE_US = (1 << 30) - 1                # ~17.9 minutes
+BUCKET_COUNT = LINEAR_LIMIT + (30 - SUB_BUCKET_BITS - 1) * SUB_BUCKETS
+PHASES = ('connect', 'ttfb', 'total')
+
+
+def bucket_index(value_us):
+    if value_us < LINEAR_LIMIT:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + ((value_us >> shift) - SUB_BUCKETS)
+
+
+def bucket_upper_bound(index):
+    """Highest value (us) that maps to a bucket"""
+    if index < LINEAR_LIMIT:
+        return index
+    shift, sub = divmod(index - LINEAR_LIMIT, SUB_BUCKETS)
+    shift += 1
+    return ((sub + SUB_BUCKETS + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-memory, mergeable latency histogram (seconds in, milliseconds out)"""
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds):
+        value = min(MAX_VALUE_US, max(0, int(seconds * 1_000_000)))
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def quantile_ms(self, q):
+        """Value at quantile q (0-1), as the bucket's upper bound capped at the max"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_upper_bound(i), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'min_ms': (self.min_us or 0) / 1000,
+            'mean_ms': self.total_us / self.count / 1000 if self.count else 0.0,
+            'p50_ms': self.quantile_ms(0.50),
+            'p90_ms': self.quantile_ms(0.90),
+            'p95_ms': self.quantile_ms(0.95),
+            'p99_ms': self.quantile_ms(0.99),
+            'max_ms': self.max_us / 1000,
+        }
+
+    def to_dict(self):
+        """Summary plus sparse bucket counts, enough to rebuild and merge"""
+        data = self.summary()
+        data['total_us'] = self.total_us
+        data['buckets'] = {str(i): n for i, n in enumerate(self.counts) if n}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        for i, n in data.get('buckets', {}).items():
+            histogram.counts[int(i)] = n
+        histogram.count = data['count']
+        histogram.total_us = data.get('total_us', 0)
+        histogram.min_us = int(data['min_ms'] * 1000) if data['count'] else None
+        histogram.max_us = int(data['max_ms'] * 1000)
+        return histogram
+
+
+class EndpointHistograms:
+    """Thread-safe {endpoint: {phase: LatencyHistogram}} for connect/TTFB/total"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, key, **phases):
+        """record(key, connect=s, ttfb=s, total=s); omitted phases are not recorded"""
+        with self._lock:
+            histograms = self.endpoints.get(key)
+            if histograms is None:
+                histograms = self.endpoints[key] = {phase: LatencyHistogram() for phase in PHASES}
+            for phase, seconds in phases.items():
+                if seconds is not None:
+                    histograms[phase].record(seconds)
+
+    def merge(self, other):
+        with self._lock:
+            for key, phases in other.endpoints.items():
+                mine = self.endpoints.setdefault(key, {phase: LatencyHistogram() for phase in PHASES})
+                for phase, histogram in phases.items():
+                    mine[phase].merge(histogram)
+        return self
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                key: {phase: h.to_dict() for phase, h in phases.items()}
+                for key, phases in sorted(self.endpoints.items())
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        result = cls()
+        for key, phases in data.items():
+            result.endpoints[key] = {phase: LatencyHistogram.from_dict(h) for phase, h in phases.items()}
+        return result
+
+
+def merge_report_files(paths):
+    """Merge the 'endpoints' histograms of several latency report files"""
+    merged = EndpointHistograms()
+    for path in paths:
+        with open(path) as f:
+            merged.merge(EndpointHistograms.from_dict(json.load(f)['endpoints']))
+    return merged
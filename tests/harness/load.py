@@ -0,0 +1,233 @@
+"""
+Asyncio load generator for the VetBuddy API.
+
+Virtual clinics, owners and labs arrive as a Poisson process at a
+configurable rate. Each one runs a short journey over the endpoints the
+backend test scripts already cover (pets, appointments, prescriptions,
+invoices, directory, morning briefing, ROI dashboard, lab requests),
+with think time between requests. Per-endpoint latency percentiles and
+error rates are printed and written to test_reports/load/.
+
+The demo accounts are shared by all virtual users of a role (one login
+per role through the token cache), so load concentrates on the demo
+clinic's data - the same data the functional tests exercise.
+
+    python -m tests.harness.load --rate 20 --duration 60 --mix clinic=6,owner=3,lab=1
+
+Requires httpx (pip install httpx).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from tests.harness.auth_cache import cached_login
+from tests.harness.client import endpoint_key
+from tests.harness.histogram import EndpointHistograms
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'test_reports', 'load')
+
+ACCOUNTS = {
+    'clinic': {'email': 'demo@vetbuddy.it', 'password': 'VetBuddy2025!Secure'},
+    'owner': {'email': 'proprietario.demo@vetbuddy.it', 'password': 'demo123'},
+    'lab': {'email': 'laboratorio1@vetbuddy.it', 'password': 'Lab2025!'},
+}
+
+# (method, path, weight) per role, taken from the functional test scripts
+JOURNEYS = {
+    'clinic': [
+        ('GET', 'pets', 5),
+        ('GET', 'appointments', 5),
+        ('GET', 'prescriptions', 3),
+        ('GET', 'prescriptions/stats', 2),
+        ('GET', 'invoices', 3),
+        ('GET', 'clinic/morning-briefing', 2),
+        ('GET', 'roi-dashboard', 1),
+        ('GET', 'clinic/value-metrics?period=month', 1),
+    ],
+    'owner': [
+        ('GET', 'pets', 5),
+        ('GET', 'appointments', 4),
+        ('GET', 'prescriptions', 2),
+        ('GET', 'directory/clinics', 3),
+        ('GET', 'connect/completion-score', 1),
+    ],
+    'lab': [
+        ('GET', 'lab-requests', 5),
+        ('GET', 'lab/stripe-settings', 1),
+        ('GET', 'directory/labs', 1),
+    ],
+    'public': [
+        ('GET', 'directory/clinics', 4),
+        ('GET', 'directory/clinics?city=milano', 2),
+        ('GET', 'directory/labs', 2),
+        ('GET', 'health', 1),
+    ],
+}
+
+
+class LoadStats:
+    """Per-endpoint latency histograms and error counts"""
+
+    def __init__(self):
+        self.histograms = EndpointHistograms()
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, key, seconds, status):
+        self.histograms.record(key, total=seconds)
+        codes = self.statuses.setdefault(key, {})
+        codes[status] = codes.get(status, 0) + 1
+        if status == 'error' or status >= 400:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def summary(self, elapsed):
+        result = {}
+        for key, phases in self.histograms.to_dict().items():
+            total = phases['total']
+            errors = self.errors.get(key, 0)
+            result[key] = {
+                'count': total['count'],
+                'errors': errors,
+                'error_rate': errors / total['count'],
+                'rps': total['count'] / elapsed if elapsed else 0.0,
+                'p50_ms': total['p50_ms'],
+                'p95_ms': total['p95_ms'],
+                'p99_ms': total['p99_ms'],
+                'max_ms': total['max_ms'],
+                'statuses': {str(k): v for k, v in self.statuses[key].items()},
+                'histogram': total,
+            }
+        return result
+
+
+async def virtual_user(http, role, token, steps, think_time, stats):
+    """Run one journey of weighted-random requests for a role"""
+    endpoints = JOURNEYS[role]
+    weights = [w for _, _, w in endpoints]
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    for method, path, _ in random.choices(endpoints, weights=weights, k=steps):
+        url = f"{API_URL}/{path}"
+        key = endpoint_key(method, url)
+        started = time.perf_counter()
+        try:
+            response = await http.request(method, url, headers=headers)
+            await response.aread()
+            status = response.status_code
+        except Exception:
+            status = 'error'
+        stats.record(key, time.perf_counter() - started, status)
+        if think_time:
+            await asyncio.sleep(random.expovariate(1 / think_time))
+
+
+async def run_load(rate, duration, mix, steps=5, think_time=1.0, max_users=2000, timeout=30):
+    """Spawn virtual users at `rate` arrivals/s for `duration` seconds"""
+    import httpx
+
+    tokens = {}
+    for role in mix:
+        if role in ACCOUNTS:
+            response = await asyncio.to_thread(cached_login, f"{API_URL}/auth/login", json=ACCOUNTS[role])
+            tokens[role] = response.json().get('token') if response.status_code == 200 else None
+            if not tokens[role]:
+                print(f"⚠️  {role} login failed ({response.status_code}); its requests will be unauthenticated")
+
+    roles = list(mix)
+    weights = [mix[r] for r in roles]
+    stats = LoadStats()
+    slots = asyncio.Semaphore(max_users)
+    limits = httpx.Limits(max_connections=max_users, max_keepalive_connections=min(max_users, 200))
+    users = set()
+    dropped = 0
+
+    async def session(role):
+        try:
+            await virtual_user(http, role, tokens.get(role), steps, think_time, stats)
+        finally:
+            slots.release()
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as http:
+        started = time.perf_counter()
+        deadline = started + duration
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(random.expovariate(rate))
+            if slots.locked():
+                dropped += 1
+                continue
+            await slots.acquire()
+            role = random.choices(roles, weights=weights)[0]
+            task = asyncio.create_task(session(role))
+            users.add(task)
+            task.add_done_callback(users.discard)
+        if users:
+            await asyncio.gather(*users)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'base_url': BASE_URL,
+        'rate': rate,
+        'duration': duration,
+        'mix': mix,
+        'elapsed': elapsed,
+        'dropped_arrivals': dropped,
+        'endpoints': stats.summary(elapsed),
+    }
+
+
+def print_report(report):
+    print(f"\n{'='*100}")
+    print(f"LOAD TEST - {report['rate']} users/s for {report['duration']}s, mix={report['mix']}")
+    print(f"{'='*100}")
+    print(f"{'Endpoint':<50} {'n':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for key, s in report['endpoints'].items():
+        print(f"{key:<50} {s['count']:>6} {s['error_rate']*100:>5.1f}% "
+              f"{s['p50_ms']:>6.0f}ms {s['p95_ms']:>6.0f}ms {s['p99_ms']:>6.0f}ms")
+    if report['dropped_arrivals']:
+        print(f"⚠️  {report['dropped_arrivals']} arrivals dropped (max concurrent users reached)")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        role, _, weight = part.partition('=')
+        if role not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f"unknown role '{role}' (choose from {', '.join(JOURNEYS)})")
+        mix[role] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VetBuddy API load generator")
+    parser.add_argument('--rate', type=float, default=10, help="virtual user arrivals per second")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to keep arriving")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('clinic=6,owner=3,lab=1'),
+                        help="role weights, e.g. clinic=6,owner=3,lab=1,public=2")
+    parser.add_argument('--steps', type=int, default=5, help="requests per virtual user")
+    parser.add_argument('--think-time', type=float, default=1.0, help="mean seconds between requests")
+    parser.add_argument('--max-users', type=int, default=2000, help="cap on concurrent virtual users")
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error("--rate must be greater than 0")
+    if args.think_time < 0:
+        parser.error("--think-time must not be negative")
+
+    report = asyncio.run(run_load(args.rate, args.duration, args.mix, steps=args.steps,
+                                  think_time=args.think_time, max_users=args.max_users))
+    print_report(report)
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {os.path.relpath(path)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Local stand-in for the LLM provider behind /api/ai and /api/chat.
+
+Serves POST */chat/completions in the OpenAI shape the routes call
+(choices[0].message.content, usage), so the AI endpoints run offline and
+their latency is whatever this server is told to add. The backend's own
+overhead (prompt building, post-processing, disclaimer injection) is then
+the endpoint latency minus the upstream latency reported here.
+
+    latency   --latency fixed:400 | uniform:200,800 | normal:400,100 |
+              lognormal:400,0.5 (median ms, sigma); time to the full
+              response, or to the first token when streaming
+    stream    requests with "stream": true get server-sent events, one
+              chunk per token at --token-rate tokens/sec, then [DONE]
+    outputs   canned Italian answers chosen from the tool's system prompt,
+              long enough for the assertions in ai_backend_test.py;
+              --canned FILE.json adds {system prompt substring: answer}
+    errors    --error-rate 0.1 answers that share of requests with
+              --error-status (429 by default, with Retry-After)
+
+GET /stats returns request counters and the upstream latency histogram,
+and POST /stats/reset clears them. ai_bench --mock uses them to report
+backend overhead per tool.
+
+    python -m tests.harness.mock_llm --port 8790 --latency lognormal:600,0.4
+    LLM_API_URL=http://127.0.0.1:8790/v1/chat/completions yarn dev
+    python ai_backend_test.py
+    python -m tests.harness.ai_bench --mock http://127.0.0.1:8790
+
+LLM_API_URL takes precedence over the provider keys in both routes, and the
+routes then send the placeholder key "mock" instead of a real one.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tests.harness.histogram import LatencyHistogram
+
+DEFAULT_PORT = 8790
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_RATE = 80
+
+# (substring of the tool's system prompt, answer); the first match wins
+CANNED = [
+    ('referti di laboratorio', """**Tipo di esame**: Emocromo completo.
+
+**Valori nella norma**: globuli rossi, emoglobina e piastrine rientrano negli intervalli di riferimento.
+
+**Valori fuori norma**: i globuli bianchi sono leggermente aumentati (18.5 rispetto a un massimo di 16.9). \
+Può succedere in presenza di un'infiammazione, di uno stress o di un'infezione in corso.
+
+**Significato clinico**: un aumento lieve e isolato dei globuli bianchi non è di per sé preoccupante, \
+ma va interpretato insieme alla visita.
+
+**Cosa fare**: discuti il risultato con il tuo veterinario, che potrà consigliare un controllo tra qualche settimana."""),
+    ('estrarre tutte le date', """📅 **15/03/2025** — Vaccino — Antirabbica effettuata
+🔔 **15/03/2026** — Richiamo vaccino — Richiamo antirabbica previsto
+📅 **30/06/2026** — Assicurazione — Scadenza della polizza"""),
+    ('pet sitter', """🐾 **ISTRUZIONI PER IL PET SITTER DI MAX**
+
+🍽️ **Alimentazione**
+- Due pasti al giorno, mattina e sera
+- ⚠️ Allergie: NON dare pollo né alimenti con grano
+
+💊 **Farmaci**
+- Nessuna terapia in corso
+
+🚶 **Passeggiate**
+- Almeno tre uscite al giorno, sempre al guinzaglio
+
+🚨 **Emergenze**
+- Contattare subito la clinica veterinaria di riferimento"""),
+    ('checklist completa per viaggiare', """✈️ **CHECKLIST VIAGGIO CON MAX**
+📍 Destinazione: Barcellona (Spagna)
+🚗 Mezzo: Auto
+
+📋 **PRIMA DELLA PARTENZA**
+- [ ] Verifica vaccini aggiornati (antirabbica valida fino al 15/03/2026)
+- [ ] Passaporto europeo per animali da compagnia
+- [ ] Microchip verificato e registrato
+- [ ] Certificato di buona salute dal veterinario
+
+🧳 **COSA PORTARE**
+- [ ] Cibo abituale per 10 giorni
+- [ ] Ciotole per acqua e cibo
+- [ ] Guinzaglio, pettorina e museruola
+- [ ] Sacchetti igienici
+
+🏨 **ALLA DESTINAZIONE**
+- [ ] Verifica struttura pet-friendly
+- [ ] Contatto veterinario locale di emergenza"""),
+    ('suggerire cosa manca', """📊 **ANALISI PASSPORT DI MAX**
+
+✅ **Dati completi:**
+- Anagrafica, specie e razza
+- QR code attivo
+
+⚠️ **Dati mancanti o incompleti:**
+- 🟡 Media: foto dell'animale, utile se si smarrisce
+- 🔴 Alta: documenti sanitari, necessari per viaggi ed emergenze
+
+💡 **Suggerimenti:**
+- Carica una foto recente e il libretto vaccinale"""),
+]
+FALLBACK = ("Visita di controllo con esito regolare: l'animale è in buona salute, il peso è stabile e non sono "
+            "state rilevate anomalie. Si consiglia di proseguire con l'alimentazione attuale e di programmare "
+            "il prossimo controllo tra sei mesi.")
+
+
+def parse_latency(spec):
+    """'fixed:400', 'uniform:200,800', 'normal:400,100', 'lognormal:400,0.5' -> sampler() in seconds"""
+    kind, _, args = spec.partition(':')
+    try:
+        values = [float(v) for v in args.split(',') if v.strip()]
+    except ValueError:
+        raise ValueError(f"bad latency spec {spec!r}") from None
+    if kind == 'fixed' and len(values) == 1:
+        sample = lambda: values[0]
+    elif kind == 'uniform' and len(values) == 2:
+        sample = lambda: random.uniform(*values)
+    elif kind == 'normal' and len(values) == 2:
+        sample = lambda: random.gauss(*values)
+    elif kind == 'lognormal' and len(values) == 2:
+        mu = math.log(values[0])
+        sample = lambda: random.lognormvariate(mu, values[1])
+    else:
+        raise ValueError(f"bad latency spec {spec!r}: use fixed:MS, uniform:LO,HI, normal:MEAN,SD "
+                         f"or lognormal:MEDIAN,SIGMA")
+    return lambda: max(0.0, sample()) / 1000
+
+
+def tokens(text):
+    """Split into streaming tokens of roughly CHARS_PER_TOKEN chars, whitespace kept"""
+    return re.findall(r'\s*\S{1,%d}|\s+' % CHARS_PER_TOKEN, text)
+
+
+class MockLLM:
+    """Answers chat completions; shared by every handler thread"""
+
+    def __init__(self, latency='fixed:0', token_rate=DEFAULT_TOKEN_RATE, error_rate=0.0, error_status=429,
+                 canned=None):
+        self.sample_latency = parse_latency(latency)
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.canned = list((canned or {}).items()) + CANNED
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = self.streamed = self.errors = 0
+            self.latency = LatencyHistogram()
+
+    def answer(self, messages):
+        system = next((m.get('content', '') for m in messages if m.get('role') == 'system'), '')
+        for marker, text in self.canned:
+            if marker in system:
+                return text
+        return FALLBACK
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'streamed': self.streamed, 'errors': self.errors,
+                    'latency': self.latency.summary()}
+
+    def record(self, seconds=None, streamed=False, error=False):
+        with self._lock:
+            self.requests += 1
+            self.streamed += streamed
+            self.errors += error
+            if seconds is not None:
+                self.latency.record(seconds)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mock = None  # bound per server by MockLLMServer
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._json(200, self.mock.stats())
+        else:
+            self._json(404, {'error': {'message': f"no route {self.path}"}})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if self.path.rstrip('/') == '/stats/reset':
+            self.mock.reset()
+            return self._json(200, {'reset': True})
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._json(404, {'error': {'message': f"no route {self.path}"}})
+        try:
+            body = json.loads(raw or b'{}')
+            messages = body['messages']
+        except (ValueError, KeyError):
+            return self._json(400, {'error': {'message': "body needs a 'messages' list"}})
+
+        mock = self.mock
+        if mock.error_rate and random.random() < mock.error_rate:
+            mock.record(error=True)
+            return self._json(mock.error_status, {'error': {'message': 'Rate limit reached (mock)',
+                                                            'type': 'rate_limit_exceeded'}},
+                              {'Retry-After': '1'} if mock.error_status == 429 else None)
+
+        text = mock.answer(messages)
+        max_tokens = body.get('max_tokens')
+        if max_tokens:
+            text = text[:max_tokens * CHARS_PER_TOKEN]
+        time.sleep(mock.sample_latency())
+        completion_id = f"chatcmpl-mock{random.getrandbits(48):012x}"
+        model = body.get('model', 'mock')
+        if body.get('stream'):
+            self.stream(completion_id, model, text)
+            mock.record(time.perf_counter() - started, streamed=True)
+            return
+        usage = {
+            'prompt_tokens': sum(len(m.get('content', '')) for m in messages) // CHARS_PER_TOKEN,
+            'completion_tokens': len(text) // CHARS_PER_TOKEN,
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        self._json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': usage,
+        })
+        mock.record(time.perf_counter() - started)
+
+    def stream(self, completion_id, model, text):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                     'model': model, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+            send(f"data: {json.dumps(chunk)}\n\n")
+
+        def send(payload):
+            data = payload.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        delay = 1 / self.mock.token_rate if self.mock.token_rate > 0 else 0
+        event({'role': 'assistant', 'content': ''})
+        for token in tokens(text):
+            event({'content': token})
+            time.sleep(delay)
+        event({}, 'stop')
+        send("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class MockLLMServer:
+    """Run a MockLLM on a background thread: with MockLLMServer(latency='fixed:200') as server: server.url"""
+
+    def __init__(self, host='127.0.0.1', port=0, **options):
+        self.mock = MockLLM(**options)
+        handler = type('MockLLMHandler', (Handler,), {'mock': self.mock})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.url = f"{self.base_url}/v1/chat/completions"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the chat-completions API used by /api/ai")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', default='lognormal:500,0.4',
+                        help="fixed:MS | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument('--token-rate', type=float, default=DEFAULT_TOKEN_RATE,
+                        help="tokens/sec when streaming (0 = no delay)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=429)
+    parser.add_argument('--canned', help="JSON file of {system prompt substring: answer}")
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned:
+        with open(args.canned, encoding='utf-8') as f:
+            canned = json.load(f)
+    try:
+        server = MockLLMServer(args.host, args.port, latency=args.latency, token_rate=args.token_rate,
+                               error_rate=args.error_rate, error_status=args.error_status, canned=canned)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"🤖 Mock LLM on {server.url} (latency {args.latency}, {args.token_rate:g} tokens/s streaming, "
+          f"{args.error_rate:.0%} {args.error_status})")
+    print(f"   LLM_API_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Process-wide pooled MongoClient for DB assertions, fixtures and cleanup.
+
+MongoClient is thread-safe and pools its own connections, but creating
+one against an Atlas mongodb+srv:// URL costs a DNS SRV lookup plus TLS
+and auth handshakes. get_mongo_client() creates one client per URL on
+first use and hands the same instance to every caller; it is closed at
+interpreter exit, so callers must not close it themselves.
+
+    from tests.harness import mongo
+    db = mongo.get_db(MONGO_URL, DB_NAME)
+
+Environment:
+    MONGO_URL                       default connection string
+    DB_NAME                         default database (default vetbuddy)
+    VETBUDDY_MONGO_POOL_SIZE        max pooled connections (default 20)
+    VETBUDDY_MONGO_TIMEOUT_MS       server selection timeout (default 10000)
+    VETBUDDY_MONGO_READ_PREFERENCE  e.g. primaryPreferred, secondaryPreferred
+                                    (default primary, so tests read their writes)
+"""
+
+import atexit
+import os
+import threading
+
+DEFAULT_POOL_SIZE = int(os.getenv('VETBUDDY_MONGO_POOL_SIZE', '20'))
+DEFAULT_TIMEOUT_MS = int(os.getenv('VETBUDDY_MONGO_TIMEOUT_MS', '10000'))
+DEFAULT_READ_PREFERENCE = os.getenv('VETBUDDY_MONGO_READ_PREFERENCE', 'primary')
+DEFAULT_DB_NAME = os.getenv('DB_NAME', 'vetbuddy')
+
+_clients = {}
+_settings = {}
+_clients_lock = threading.Lock()
+
+
+def _create(url):
+    from pymongo import MongoClient
+
+    return MongoClient(
+        url,
+        maxPoolSize=_settings.get('pool_size', DEFAULT_POOL_SIZE),
+        serverSelectionTimeoutMS=_settings.get('timeout_ms', DEFAULT_TIMEOUT_MS),
+        readPreference=_settings.get('read_preference', DEFAULT_READ_PREFERENCE),
+        retryWrites=True,
+    )
+
+
+def get_mongo_client(url=None):
+    """Return the shared MongoClient for `url` (default $MONGO_URL), creating it on first use"""
+    url = url or os.getenv('MONGO_URL')
+    if not url:
+        raise RuntimeError("MONGO_URL is not set")
+    client = _clients.get(url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(url)
+            if client is None:
+                client = _clients[url] = _create(url)
+    return client
+
+
+def get_db(url=None, name=None):
+    """Database handle on the shared client"""
+    return get_mongo_client(url)[name or DEFAULT_DB_NAME]
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE, timeout_ms=DEFAULT_TIMEOUT_MS, read_preference=DEFAULT_READ_PREFERENCE):
+    """Change the settings for clients created from now on; existing clients are closed"""
+    with _clients_lock:
+        _settings.update(pool_size=pool_size, timeout_ms=timeout_ms, read_preference=read_preference)
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def close():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+atexit.register(close)
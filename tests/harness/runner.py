@@ -0,0 +1,186 @@
+"""
+Dependency-aware parallel runner for the backend test scripts.
+
+Each task declares the values it needs (a login token, a created
+prescription id, ...) and optionally the value it provides. Independent
+tasks run concurrently on a thread pool; dependent chains run in order.
+A task whose needed value is missing (its provider failed or returned
+None) is skipped and reported as failed, like the scripts' own
+"SKIPPED (no clinic token)" branches.
+
+Task functions follow the scripts' existing conventions: they may return
+a bool, a (success, data) tuple, or a plain value. The provided value is
+`data` for tuples and the return value otherwise.
+
+    runner = TestRunner()
+    runner.add("Clinic Login", login_clinic, provides="clinic_token", report=False)
+    runner.add("Prescription Stats", test_prescription_stats, needs=["clinic_token"])
+    results = runner.run()   # [(name, success), ...] in declaration order
+
+Environment:
+    VETBUDDY_TEST_WORKERS   thread pool size (default 8, 1 runs serially)
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_WORKERS = int(os.getenv('VETBUDDY_TEST_WORKERS', '8'))
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout proxy that buffers writes per worker thread"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class Task:
+    def __init__(self, name, func, needs, after, provides, report):
+        self.name = name
+        self.func = func
+        self.needs = list(needs)
+        self.after = list(after)
+        self.provides = provides
+        self.report = report
+        self.success = False
+        self.duration = 0.0
+        self.skipped_reason = None
+
+
+class TestRunner:
+    """Schedule test tasks on a thread pool according to their dependencies"""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = max(1, workers)
+        self.tasks = []
+        self.values = {}
+
+    def provide(self, key, value):
+        """Seed a value produced outside the runner (e.g. a token from setup)"""
+        self.values[key] = value
+
+    def add(self, name, func, needs=(), after=(), provides=None, report=True):
+        """Register a task; `needs` values are passed to func positionally"""
+        self.tasks.append(Task(name, func, needs, after, provides, report))
+
+    def _validate(self):
+        names = {t.name for t in self.tasks}
+        providers = {t.provides: t for t in self.tasks if t.provides}
+        for task in self.tasks:
+            for key in task.needs:
+                if key not in providers and key not in self.values:
+                    raise ValueError(f"Task '{task.name}' needs '{key}' but nothing provides it")
+            for dep in task.after:
+                if dep not in names:
+                    raise ValueError(f"Task '{task.name}' runs after unknown task '{dep}'")
+        # Depth-first cycle check over needs + after edges
+        edges = {
+            t.name: [providers[k].name for k in t.needs if k in providers] + t.after
+            for t in self.tasks
+        }
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'active':
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 'active'
+            for dep in edges[name]:
+                visit(dep, path + [name])
+            state[name] = 'done'
+
+        for name in edges:
+            visit(name, [])
+        return providers
+
+    def _execute(self, task, args, output):
+        output.local.buffer = io.StringIO()
+        started = time.perf_counter()
+        try:
+            result = task.func(*args)
+        except Exception as e:
+            print(f"❌ {task.name} raised {type(e).__name__}: {e}")
+            result = False
+        finally:
+            task.duration = time.perf_counter() - started
+            text = output.local.buffer.getvalue()
+            output.local.buffer = None
+        if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+            task.success, value = result
+        else:
+            task.success = bool(result)
+            value = result
+        return value, text
+
+    def run(self):
+        """Run all tasks and return [(name, success)] for reported tasks"""
+        providers = self._validate()
+        pending = list(self.tasks)
+        finished = set()
+        running = {}
+        output = _ThreadOutput(sys.stdout)
+        print_lock = threading.Lock()
+        started = time.perf_counter()
+
+        def ready(task):
+            waits_on = [providers[k].name for k in task.needs if k in providers] + task.after
+            return all(name in finished for name in waits_on)
+
+        previous_stdout, sys.stdout = sys.stdout, output
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while pending or running:
+                    for task in [t for t in pending if ready(t)]:
+                        pending.remove(task)
+                        missing = [k for k in task.needs if self.values.get(k) is None]
+                        if missing:
+                            task.skipped_reason = f"missing {', '.join(missing)}"
+                            finished.add(task.name)
+                            with print_lock:
+                                print(f"\n⚠️  SKIPPED: {task.name} ({task.skipped_reason})")
+                            continue
+                        args = [self.values[k] for k in task.needs]
+                        running[pool.submit(self._execute, task, args, output)] = task
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = running.pop(future)
+                        value, text = future.result()
+                        if task.provides:
+                            self.values[task.provides] = value
+                        finished.add(task.name)
+                        with print_lock:
+                            output.stream.write(text)
+                            output.stream.flush()
+        finally:
+            sys.stdout = previous_stdout
+
+        elapsed = time.perf_counter() - started
+        serial = sum(t.duration for t in self.tasks)
+        print(f"\n⏱️  {len(self.tasks)} tasks in {elapsed:.1f}s "
+              f"({serial:.1f}s serial, {self.workers} workers)")
+        return [(t.name, t.success) for t in self.tasks if t.report]
+
+    def timings(self):
+        """Return [(name, seconds, status)] in declaration order"""
+        def status(task):
+            if task.skipped_reason:
+                return 'skipped'
+            return 'pass' if task.success else 'fail'
+        return [(t.name, t.duration, status(t)) for t in self.tasks]
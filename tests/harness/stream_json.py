@@ -0,0 +1,262 @@
+"""
+Incremental validation of large JSON list responses.
+
+response.json() holds the raw body, the decoded text and every parsed
+item in memory at once. StreamedList reads the body in chunks and yields
+the items of one list as each one completes. The list is either the
+top-level array or the array under a top-level key such as 'invoices'.
+Only the current item and one undecoded chunk are held, so /api/invoices
+can be checked at tens of thousands of invoices. Other top-level fields
+(stats, total, ...) are collected into .fields as they go past.
+
+    result = stream_json.validate_list(f"{BASE_URL}/invoices", key='invoices',
+                                       headers=headers, validate=check_invoice)
+    print(result['items'], result['items_per_sec'], result['peak_memory_bytes'])
+
+    python -m tests.harness.stream_json https://.../api/invoices --key invoices --token $TOKEN
+
+Seed realistic sizes first with `python -m tests.harness.fixtures seed`.
+"""
+
+import argparse
+import codecs
+import json
+import sys
+import time
+import tracemalloc
+
+from tests.harness import client
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 20
+WHITESPACE = ' \t\n\r'
+# Characters that can continue a JSON number
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+_decoder = json.JSONDecoder()
+
+
+class StreamError(ValueError):
+    """The body is not the JSON shape StreamedList was asked to walk"""
+
+
+class StreamedList:
+    """Iterate one JSON list from a streamed requests.Response, item by item"""
+
+    def __init__(self, response, key=None, chunk_size=DEFAULT_CHUNK_SIZE, chunks=None):
+        """chunks: the body as an iterable of bytes (default response.iter_content)"""
+        self.response = response
+        self.key = key
+        self.chunk_size = chunk_size
+        self.fields = {}
+        self.count = 0
+        self.bytes_read = 0
+        self.max_buffer = 0
+        self._chunks = iter(chunks) if chunks is not None else None
+        self._text_decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    # Buffer management
+
+    def _fill(self):
+        """Append the next chunk to the buffer; False at end of body"""
+        if self._eof:
+            return False
+        if self._chunks is None:
+            self._chunks = self.response.iter_content(chunk_size=self.chunk_size)
+        # Drop everything already consumed before growing the buffer
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            return False
+        self.bytes_read += len(chunk)
+        self._buffer += self._text_decoder.decode(chunk)
+        self.max_buffer = max(self.max_buffer, len(self._buffer))
+        return True
+
+    def _peek(self):
+        """Next non-whitespace character (not consumed), or '' at end of body"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        ch = self._peek()
+        if ch not in chars or not ch:
+            raise StreamError(f"expected one of {chars!r} at byte ~{self.bytes_read}, got {ch or 'end of body'!r}")
+        self._pos += 1
+        return ch
+
+    def _value(self):
+        """Decode one complete JSON value, reading more of the body until it parses"""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending exactly at the buffer end may continue in the next chunk, and so
+            # may a number cut short before its fraction or exponent ('1234.' | '56', '1e' | '5')
+            if not self._eof and (end == len(self._buffer) or (
+                    isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and self._buffer[end] in NUMBER_CHARS)) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    # Walking the document
+
+    def _items(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+
+    def __iter__(self):
+        if self.key is None:
+            for item in self._items():
+                self.count += 1
+                yield item
+            return
+        self._expect('{')
+        found = False
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                name = self._value()
+                self._expect(':')
+                if name == self.key and self._peek() == '[':
+                    found = True
+                    for item in self._items():
+                        self.count += 1
+                        yield item
+                else:
+                    self.fields[name] = self._value()
+                if self._expect(',}') == '}':
+                    break
+        if not found:
+            raise StreamError(f"no {self.key!r} list in response (keys: {', '.join(self.fields) or 'none'})")
+
+
+def validate_list(url, key=None, validate=None, method='GET', chunk_size=DEFAULT_CHUNK_SIZE,
+                  measure_memory=True, **kwargs):
+    """Stream url's JSON list through validate(item) without loading the body.
+
+    validate returns None/True for a good item, or False / an error string.
+    Exceptions it raises are recorded as errors too. Returns the status,
+    item and error counts, top-level fields, items/sec and the peak memory
+    traced while parsing (tracemalloc; measure_memory=False skips it).
+    """
+    response = client.request(method, url, stream=True, **kwargs)
+    result = {'status': response.status_code, 'items': 0, 'errors': [], 'error_count': 0, 'fields': {}}
+    if response.status_code != 200:
+        result['body'] = response.text[:500]
+        return result
+
+    tracing = measure_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    elif measure_memory:
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+    started = time.perf_counter()
+    stream = StreamedList(response, key, chunk_size)
+    try:
+        for index, item in enumerate(stream):
+            if validate is None:
+                continue
+            try:
+                outcome = validate(item)
+            except Exception as e:
+                outcome = f"{type(e).__name__}: {e}"
+            if outcome is None or outcome is True:
+                continue
+            result['error_count'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append((index, outcome if isinstance(outcome, str) else 'invalid item'))
+    except (StreamError, json.JSONDecodeError) as e:
+        result['parse_error'] = str(e)
+    finally:
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - baseline if measure_memory else None
+        if tracing:
+            tracemalloc.stop()
+        response.close()
+
+    result.update(
+        items=stream.count,
+        fields=stream.fields,
+        bytes=stream.bytes_read,
+        seconds=seconds,
+        items_per_sec=stream.count / seconds if seconds > 0 else 0.0,
+        peak_memory_bytes=peak,
+        max_buffer_chars=stream.max_buffer,
+    )
+    return result
+
+
+def format_result(result):
+    if result['status'] != 200:
+        return f"HTTP {result['status']}: {result.get('body', '')[:200]}"
+    peak = result['peak_memory_bytes']
+    line = (f"{result['items']} items, {result['bytes'] / 1024:.0f} KB in {result['seconds'] * 1000:.0f}ms "
+            f"({result['items_per_sec']:.0f} items/s)")
+    if peak is not None:
+        line += f", peak memory {peak / 1024:.0f} KB"
+    if result['error_count']:
+        line += f", {result['error_count']} invalid"
+    if 'parse_error' in result:
+        line += f", parse error: {result['parse_error']}"
+    return line
+
+
+def require_fields(*fields):
+    """validate callback: item must be an object with all the given fields"""
+    def check(item):
+        if not isinstance(item, dict):
+            return f"expected object, got {type(item).__name__}"
+        missing = [f for f in fields if f not in item]
+        return f"missing {', '.join(missing)}" if missing else None
+    return check
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream-validate a JSON list endpoint")
+    parser.add_argument('url')
+    parser.add_argument('--key', help="top-level key holding the list (default: the body is the list)")
+    parser.add_argument('--token', help="Bearer token")
+    parser.add_argument('--require', default='', help="comma-separated fields every item must have")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    headers = {'Authorization': f'Bearer {args.token}'} if args.token else {}
+    fields = [f for f in args.require.split(',') if f]
+    result = validate_list(args.url, key=args.key, headers=headers, chunk_size=args.chunk_size,
+                           validate=require_fields(*fields) if fields else None)
+    print(format_result(result))
+    for index, error in result['errors']:
+        print(f"  item {index}: {error}")
+    scalars = {k: v for k, v in result['fields'].items() if not isinstance(v, (dict, list))}
+    if scalars:
+        print(f"  fields: {scalars}")
+    return 0 if result['status'] == 200 and not result['error_count'] and 'parse_error' not in result else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
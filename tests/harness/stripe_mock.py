@@ -0,0 +1,664 @@
+"""
+Local Stripe stand-in and signed webhook generator for the payment paths.
+
+serve   answers the Stripe API calls the backend makes, in Stripe's JSON
+        shape, so /api/stripe/checkout/*, /api/stripe/portal and
+        /api/payments/* run without Stripe test mode:
+
+            POST /v1/checkout/sessions            GET /v1/checkout/sessions/{id}
+            POST /v1/customers                    GET /v1/customers/{id}
+            POST /v1/subscriptions                GET /v1/subscriptions/{id}
+            DELETE /v1/subscriptions/{id}         POST /v1/billing_portal/sessions
+
+        With --webhook-url the stand-in behaves like Stripe after payment:
+        POST /v1/test_helpers/checkout/sessions/{id}/complete (?trial=1)
+        marks the session paid and delivers a signed
+        checkout.session.completed; cancelling a subscription delivers
+        customer.subscription.deleted.
+
+fire    sends signed checkout.session.completed (paid and trial),
+        customer.subscription.updated (trialing),
+        customer.subscription.trial_will_end and
+        customer.subscription.deleted events to /api/webhook/stripe at
+        --rate events/sec. --duplicates N delivers every event N times
+        (same id and payload, freshly signed, as Stripe retries do); the
+        deliveries of one event must all get the same status. Reports
+        events/sec, latency percentiles and status counts, and can write
+        the events as JSONL (--log) for replaying.
+
+        Every event belongs to its own synthetic user, which does not
+        exist in MongoDB, so by default the route answers 200 without
+        changing anything. --check (requires MONGO_URL) seeds those users
+        first: a checkout's user without a subscription, a subscription
+        event's user with the active subscription the event names. After
+        the run their subscription fields must match one delivery of their
+        event, which is what makes duplicates idempotent. The users are
+        removed afterwards.
+
+Signatures follow Stripe's scheme (Stripe-Signature: t=<ts>,v1=<HMAC-SHA256
+of "<ts>.<payload>">), so they verify with the backend's constructEvent
+when STRIPE_WEBHOOK_SECRET matches --secret.
+
+    python -m tests.harness.stripe_mock serve --port 12111 --webhook-url http://localhost:3000/api/webhook/stripe
+    STRIPE_API_BASE=http://127.0.0.1:12111 STRIPE_WEBHOOK_SECRET=whsec_test yarn dev
+    python -m tests.harness.stripe_mock fire --events 2000 --rate 200 --concurrency 16 --duplicates 2 --check
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import string
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from tests.harness import client, mongo
+from tests.harness.fixtures import FixtureRun, ensure_indexes
+from tests.harness.histogram import LatencyHistogram
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+MONGO_URL = os.getenv('MONGO_URL')
+DB_NAME = os.getenv('DB_NAME', 'vetbuddy')
+WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', 'whsec_test')
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'test_reports', 'stripe_webhooks')
+
+DEFAULT_PORT = 12111
+API_VERSION = '2023-10-16'
+EVENT_MIX = ('checkout_paid', 'checkout_trial', 'trialing', 'trial_will_end', 'deleted')
+
+
+def new_id(prefix, length=24):
+    return f"{prefix}_{''.join(random.choices(string.ascii_letters + string.digits, k=length))}"
+
+
+# Signing
+
+def sign(payload, secret=WEBHOOK_SECRET, timestamp=None):
+    """Stripe-Signature header value for payload (bytes)"""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    signed = f"{timestamp}.".encode() + payload
+    digest = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def signed_request(event, secret=WEBHOOK_SECRET):
+    """(body bytes, headers) for delivering event the way Stripe does"""
+    payload = json.dumps(event, separators=(',', ':')).encode()
+    return payload, {'Content-Type': 'application/json', 'Stripe-Signature': sign(payload, secret)}
+
+
+# Events, in the shape /api/webhook/stripe reads
+
+def event(event_type, obj):
+    return {
+        'id': new_id('evt'),
+        'object': 'event',
+        'api_version': API_VERSION,
+        'created': int(time.time()),
+        'livemode': False,
+        'pending_webhooks': 1,
+        'type': event_type,
+        'data': {'object': obj},
+    }
+
+
+def checkout_completed(user_id, plan_id='pro', customer=None, subscription=None, trial=False, session_id=None,
+                       amount=0):
+    return event('checkout.session.completed', {
+        'id': session_id or new_id('cs_test'),
+        'object': 'checkout.session',
+        'mode': 'subscription',
+        'status': 'complete',
+        'payment_status': 'no_payment_required' if trial else 'paid',
+        'amount_total': 0 if trial else amount,
+        'currency': 'eur',
+        'customer': customer or new_id('cus', 14),
+        'subscription': subscription or new_id('sub'),
+        'metadata': {'type': 'subscription', 'userId': user_id, 'planId': plan_id},
+    })
+
+
+def subscription(customer, subscription_id, status='active', trial_days=0, metadata=None):
+    now = int(time.time())
+    return {
+        'id': subscription_id,
+        'object': 'subscription',
+        'customer': customer,
+        'status': status,
+        'created': now,
+        'current_period_start': now,
+        'current_period_end': now + max(trial_days, 30) * 86400,
+        'trial_end': now + trial_days * 86400 if trial_days else None,
+        'cancel_at_period_end': False,
+        'metadata': metadata or {},
+    }
+
+
+def subscription_trialing(customer, subscription_id, trial_days=90, metadata=None):
+    return event('customer.subscription.updated',
+                 subscription(customer, subscription_id, 'trialing', trial_days, metadata))
+
+
+def trial_will_end(customer, subscription_id, metadata=None):
+    return event('customer.subscription.trial_will_end',
+                 subscription(customer, subscription_id, 'trialing', 3, metadata))
+
+
+def subscription_deleted(customer, subscription_id, user_id=None):
+    obj = subscription(customer, subscription_id, 'canceled', metadata={'userId': user_id} if user_id else None)
+    obj['canceled_at'] = obj['ended_at'] = int(time.time())
+    return event('customer.subscription.deleted', obj)
+
+
+def invoice_event(event_type, customer, subscription_id, amount=7900):
+    """invoice.payment_succeeded / invoice.payment_failed for a subscription renewal"""
+    paid = event_type == 'invoice.payment_succeeded'
+    return event(event_type, {
+        'id': new_id('in'),
+        'object': 'invoice',
+        'customer': customer,
+        'subscription': subscription_id,
+        'billing_reason': 'subscription_cycle',
+        'amount_due': amount,
+        'amount_paid': amount if paid else 0,
+        'currency': 'eur',
+        'paid': paid,
+        'status': 'paid' if paid else 'open',
+    })
+
+
+def generate_events(count, mix=EVENT_MIX, user_prefix='webhook-bench'):
+    """count events cycling through mix, each for its own synthetic user"""
+    events = []
+    for i in range(count):
+        kind = mix[i % len(mix)]
+        user_id = f"{user_prefix}-{i}"
+        customer, sub_id = new_id('cus', 14), new_id('sub')
+        if kind == 'checkout_paid':
+            events.append(checkout_completed(user_id, customer=customer, subscription=sub_id, amount=7900))
+        elif kind == 'checkout_trial':
+            events.append(checkout_completed(user_id, customer=customer, subscription=sub_id, trial=True))
+        elif kind == 'trialing':
+            events.append(subscription_trialing(customer, sub_id, metadata={'userId': user_id}))
+        elif kind == 'trial_will_end':
+            events.append(trial_will_end(customer, sub_id, metadata={'userId': user_id}))
+        elif kind == 'deleted':
+            events.append(subscription_deleted(customer, sub_id, user_id))
+        else:
+            raise ValueError(f"unknown event kind {kind!r}: use {', '.join(EVENT_MIX)}")
+    return events
+
+
+def starting_state(events):
+    """{user id: subscription fields} the users of generate_events() need in MongoDB beforehand.
+
+    A checkout's user has no subscription yet; the user of a subscription
+    event has the active one it names (the route looks it up by
+    stripeCustomerId).
+    """
+    users = {}
+    for evt in events:
+        obj = evt['data']['object']
+        user_id = (obj.get('metadata') or {}).get('userId')
+        if not user_id:
+            continue
+        if evt['type'] == 'checkout.session.completed':
+            users[user_id] = {}
+        else:
+            users[user_id] = {'subscriptionStatus': 'active', 'subscriptionPlan': 'pro',
+                              'stripeCustomerId': obj['customer'], 'stripeSubscriptionId': obj['id']}
+    return users
+
+
+# Subscription state in MongoDB, shared with webhook_replay
+
+STATE_FIELDS = ('subscriptionStatus', 'subscriptionPlan', 'stripeCustomerId', 'stripeSubscriptionId')
+MAX_REPORTED_MISMATCHES = 20
+
+
+class Record:
+    """One logged event: the parsed event plus the raw body to send, if one was recorded"""
+
+    def __init__(self, event, body=None, line=None):
+        self.event = event
+        self.body = body
+        self.line = line
+
+    @property
+    def created(self):
+        return self.event.get('created') or 0
+
+    @property
+    def customer(self):
+        return (self.event.get('data') or {}).get('object', {}).get('customer')
+
+
+def expected_state(records):
+    """{user id: subscription fields} from applying the log in `created` order, as the route does"""
+    users, by_customer = {}, {}
+    for record in sorted(records, key=lambda r: r.created):
+        event_type, obj = record.event['type'], record.event['data']['object']
+        if event_type == 'checkout.session.completed':
+            if obj.get('payment_status') not in ('paid', 'no_payment_required'):
+                continue
+            metadata = obj.get('metadata') or {}
+            if metadata.get('type') == 'subscription' and metadata.get('userId') and metadata.get('planId'):
+                user_id = metadata['userId']
+            elif metadata.get('clinicId') and metadata.get('planId'):
+                user_id = metadata['clinicId']
+            else:
+                continue
+            users[user_id] = {
+                'subscriptionPlan': metadata['planId'],
+                'subscriptionStatus': 'trialing' if obj['payment_status'] == 'no_payment_required' else 'active',
+                'stripeCustomerId': obj.get('customer'),
+                'stripeSubscriptionId': obj.get('subscription'),
+            }
+            by_customer[obj.get('customer')] = user_id
+            continue
+        user_id = by_customer.get(obj.get('customer'))
+        if user_id is None:
+            continue
+        if event_type == 'customer.subscription.updated':
+            users[user_id]['subscriptionStatus'] = obj.get('status')
+        elif event_type == 'customer.subscription.deleted':
+            users[user_id].update(subscriptionStatus='cancelled', subscriptionPlan=None)
+        elif event_type == 'invoice.payment_succeeded' and obj.get('subscription'):
+            users[user_id]['subscriptionStatus'] = 'active'
+        elif event_type == 'invoice.payment_failed' and obj.get('subscription'):
+            users[user_id]['subscriptionStatus'] = 'past_due'
+    return users
+
+
+def compare_state(db, expected):
+    """[(user id, field, expected, actual)] for every field that differs in MongoDB"""
+    projection = {field: 1 for field in STATE_FIELDS}
+    projection['id'] = 1
+    actual = {doc['id']: doc for doc in db.users.find({'id': {'$in': list(expected)}}, projection)}
+    mismatches = []
+    for user_id, fields in expected.items():
+        doc = actual.get(user_id)
+        if doc is None:
+            mismatches.append((user_id, 'user', 'present', 'missing'))
+            continue
+        for field, value in fields.items():
+            if doc.get(field) != value:
+                mismatches.append((user_id, field, value, doc.get(field)))
+    return mismatches
+
+
+def seed_users(run, user_ids, state=None):
+    """Create user_ids as clinics without email; state maps a user id to the fields it starts with"""
+    now = datetime.utcnow().isoformat()
+    for user_id in user_ids:
+        user = {'id': user_id, 'role': 'clinic', 'name': f"Webhook replay {user_id}",
+                'clinicName': f"Webhook replay {user_id}", 'subscriptionStatus': None,
+                'subscriptionPlan': None, 'createdAt': now}
+        user.update((state or {}).get(user_id, {}))
+        run.add('users', user)
+    return run.flush()
+
+
+# The API stand-in
+
+def parse_form(body):
+    """Stripe's form encoding (a[b][0][c]=v, expand[]=x) into nested dicts and lists"""
+    result = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        parts = key.replace(']', '').split('[')
+        node = result
+        for part in parts[:-1]:
+            node = node.setdefault(part or str(len(node)), {})
+        node[parts[-1] or str(len(node))] = value
+
+    def lists(value):
+        """{'0': ..., '1': ...} -> [...]"""
+        if not isinstance(value, dict):
+            return value
+        if value and all(k.isdigit() for k in value):
+            return [lists(value[k]) for k in sorted(value, key=int)]
+        return {k: lists(v) for k, v in value.items()}
+    return lists(result)
+
+
+class StripeError(Exception):
+    def __init__(self, status, message, code='resource_missing'):
+        super().__init__(message)
+        self.status = status
+        self.body = {'error': {'type': 'invalid_request_error', 'code': code, 'message': message}}
+
+
+class StripeMock:
+    """In-memory Stripe objects, shared by every handler thread"""
+
+    def __init__(self, base_url, webhook_url=None, secret=WEBHOOK_SECRET):
+        self.base_url = base_url
+        self.webhook_url = webhook_url
+        self.secret = secret
+        self.sessions = {}
+        self.customers = {}
+        self.subscriptions = {}
+        self.deliveries = Counter()
+        self._lock = threading.Lock()
+
+    def _get(self, store, kind, object_id):
+        with self._lock:
+            obj = store.get(object_id)
+        if obj is None:
+            raise StripeError(404, f"No such {kind}: '{object_id}'")
+        return obj
+
+    def create_customer(self, params):
+        customer = {'id': new_id('cus', 14), 'object': 'customer', 'created': int(time.time()),
+                    'email': params.get('email'), 'name': params.get('name'),
+                    'metadata': params.get('metadata', {}), 'livemode': False}
+        with self._lock:
+            self.customers[customer['id']] = customer
+        return customer
+
+    def create_subscription(self, params):
+        customer = params.get('customer') or self.create_customer({})['id']
+        trial_days = int(params.get('trial_period_days') or 0)
+        sub = subscription(customer, new_id('sub'), 'trialing' if trial_days else 'active', trial_days,
+                           params.get('metadata'))
+        with self._lock:
+            self.subscriptions[sub['id']] = sub
+        return sub
+
+    def create_session(self, params):
+        if not params.get('line_items') and not params.get('customer'):
+            raise StripeError(400, "Missing required param: line_items.", 'parameter_missing')
+        amount = sum(int(item.get('price_data', {}).get('unit_amount', 0)) * int(item.get('quantity', 1))
+                     for item in params.get('line_items', []))
+        session_id = new_id('cs_test', 58)
+        session = {
+            'id': session_id,
+            'object': 'checkout.session',
+            'mode': params.get('mode', 'payment'),
+            'status': 'open',
+            'payment_status': 'unpaid',
+            'amount_total': amount,
+            'currency': (params.get('line_items') or [{}])[0].get('price_data', {}).get('currency', 'eur'),
+            'customer': params.get('customer'),
+            'customer_email': params.get('customer_email'),
+            'subscription': None,
+            'metadata': params.get('metadata', {}),
+            'success_url': params.get('success_url'),
+            'cancel_url': params.get('cancel_url'),
+            'trial_period_days': int(params.get('subscription_data', {}).get('trial_period_days') or 0),
+            'url': f"{self.base_url}/pay/{session_id}",
+            'created': int(time.time()),
+            'livemode': False,
+        }
+        with self._lock:
+            self.sessions[session_id] = session
+        return session
+
+    def complete_session(self, session_id, trial=False):
+        """What Stripe does after the customer pays: session, customer, subscription, webhook"""
+        session = self._get(self.sessions, 'checkout.session', session_id)
+        trial = trial or bool(session['trial_period_days'])
+        if not session['customer']:
+            session['customer'] = self.create_customer({'email': session['customer_email']})['id']
+        if session['mode'] == 'subscription' and not session['subscription']:
+            session['subscription'] = self.create_subscription({
+                'customer': session['customer'], 'metadata': session['metadata'],
+                'trial_period_days': session['trial_period_days'] if trial else 0})['id']
+        session.update(status='complete', payment_status='no_payment_required' if trial else 'paid')
+        self.deliver(event('checkout.session.completed', session))
+        return session
+
+    def cancel_subscription(self, subscription_id):
+        sub = self._get(self.subscriptions, 'subscription', subscription_id)
+        sub.update(status='canceled', canceled_at=int(time.time()), ended_at=int(time.time()))
+        self.deliver(event('customer.subscription.deleted', sub))
+        return sub
+
+    def portal_session(self, params):
+        customer = params.get('customer')
+        if not customer:
+            raise StripeError(400, "Missing required param: customer.", 'parameter_missing')
+        session_id = new_id('bps')
+        return {'id': session_id, 'object': 'billing_portal.session', 'customer': customer,
+                'return_url': params.get('return_url'), 'url': f"{self.base_url}/portal/{session_id}",
+                'created': int(time.time()), 'livemode': False}
+
+    def deliver(self, evt):
+        if not self.webhook_url:
+            return
+
+        def send():
+            body, headers = signed_request(evt, self.secret)
+            try:
+                status = requests.post(self.webhook_url, data=body, headers=headers, timeout=30).status_code
+            except requests.exceptions.RequestException:
+                status = 'error'
+            with self._lock:
+                self.deliveries[f"{evt['type']} {status}"] += 1
+        threading.Thread(target=send, daemon=True).start()
+
+    def route(self, method, path, params):
+        parts = [p for p in path.split('/') if p][1:]  # drop 'v1'
+        if method == 'POST' and parts == ['checkout', 'sessions']:
+            return self.create_session(params)
+        if method == 'GET' and parts[:2] == ['checkout', 'sessions'] and len(parts) == 3:
+            return self._get(self.sessions, 'checkout.session', parts[2])
+        if method == 'POST' and parts[:3] == ['test_helpers', 'checkout', 'sessions'] and parts[4:] == ['complete']:
+            return self.complete_session(parts[3], trial=params.get('trial') in ('1', 'true'))
+        if method == 'POST' and parts == ['customers']:
+            return self.create_customer(params)
+        if method == 'GET' and parts[:1] == ['customers'] and len(parts) == 2:
+            return self._get(self.customers, 'customer', parts[1])
+        if method == 'POST' and parts == ['subscriptions']:
+            return self.create_subscription(params)
+        if method == 'GET' and parts[:1] == ['subscriptions'] and len(parts) == 2:
+            return self._get(self.subscriptions, 'subscription', parts[1])
+        if method == 'DELETE' and parts[:1] == ['subscriptions'] and len(parts) == 2:
+            return self.cancel_subscription(parts[1])
+        if method == 'POST' and parts == ['billing_portal', 'sessions']:
+            return self.portal_session(params)
+        if method == 'GET' and parts == ['_stats']:
+            with self._lock:
+                return {'sessions': len(self.sessions), 'customers': len(self.customers),
+                        'subscriptions': len(self.subscriptions), 'deliveries': dict(self.deliveries)}
+        raise StripeError(404, f"Unrecognized request URL ({method}: {path})", 'url_invalid')
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    stripe = None  # bound per server by serve()
+
+    def log_message(self, *args):
+        pass
+
+    def handle_request(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode() if length else ''
+        params = parse_form('&'.join(p for p in (url.query, body) if p))
+        try:
+            status, payload = 200, self.stripe.route(self.command, url.path, params)
+        except StripeError as e:
+            status, payload = e.status, e.body
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Request-Id', new_id('req', 14))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = handle_request
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, webhook_url=None, secret=WEBHOOK_SECRET):
+    """(server, StripeMock); run server.serve_forever() or serve it from a thread"""
+    stripe = StripeMock(f"http://{host}:{port}", webhook_url, secret)
+    handler = type('StripeMockHandler', (Handler,), {'stripe': stripe})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    stripe.base_url = f"http://{host}:{server.server_address[1]}"
+    return server, stripe
+
+
+# Webhook load
+
+def fire(url, events, secret=WEBHOOK_SECRET, rate=None, concurrency=8, duplicates=1):
+    """Deliver events (each `duplicates` times) at up to `rate` per second; returns the measurements"""
+    deliveries = [(index, evt) for index, evt in enumerate(events) for _ in range(duplicates)]
+    latency = LatencyHistogram()
+    statuses = Counter()
+    by_event = {}
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def deliver(slot, index, evt):
+        if rate:
+            delay = started + slot / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        body, headers = signed_request(evt, secret)
+        sent = time.perf_counter()
+        try:
+            status = client.post(url, data=body, headers=headers).status_code
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - sent
+        with lock:
+            latency.record(elapsed)
+            statuses[f"{evt['type']} {status}"] += 1
+            by_event.setdefault(index, set()).add(status)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(deliver, slot, index, evt) for slot, (index, evt) in enumerate(deliveries)]:
+            future.result()
+    seconds = time.perf_counter() - started
+    ok = sum(n for key, n in statuses.items() if key.endswith(' 200'))
+    return {
+        'url': url,
+        'events': len(events),
+        'deliveries': len(deliveries),
+        'duplicates': duplicates,
+        'seconds': seconds,
+        'events_per_sec': len(deliveries) / seconds if seconds else 0.0,
+        'ok': ok,
+        'statuses': dict(sorted(statuses.items())),
+        'inconsistent_duplicates': sum(1 for s in by_event.values() if len(s) > 1),
+        'latency': latency.summary(),
+    }
+
+
+def write_log(path, events):
+    with open(path, 'w', encoding='utf-8') as f:
+        for evt in events:
+            f.write(json.dumps(evt) + '\n')
+
+
+def print_fire(result):
+    lat = result['latency']
+    print(f"\n📨 {result['deliveries']} deliveries ({result['events']} events x {result['duplicates']}) "
+          f"in {result['seconds']:.1f}s: {result['events_per_sec']:.0f} events/s")
+    print(f"   latency p50 {lat['p50_ms']:.0f}ms  p95 {lat['p95_ms']:.0f}ms  p99 {lat['p99_ms']:.0f}ms  "
+          f"max {lat['max_ms']:.0f}ms")
+    for key, n in result['statuses'].items():
+        print(f"   {'✅' if key.endswith(' 200') else '❌'} {key}: {n}")
+    if result['duplicates'] > 1:
+        flag = '✅' if not result['inconsistent_duplicates'] else '❌'
+        print(f"   {flag} {result['inconsistent_duplicates']} event(s) answered differently across duplicate deliveries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Stripe stand-in and signed webhook generator")
+    parser.add_argument('command', choices=['serve', 'fire'])
+    parser.add_argument('--secret', default=WEBHOOK_SECRET, help="webhook signing secret (STRIPE_WEBHOOK_SECRET)")
+    parser.add_argument('--host', default='127.0.0.1', help="serve: bind address")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="serve: port")
+    parser.add_argument('--webhook-url', help="serve: deliver webhooks here; fire: target "
+                                              "(default $NEXT_PUBLIC_BASE_URL/api/webhook/stripe)")
+    parser.add_argument('--events', type=int, default=500, help="fire: distinct events to generate")
+    parser.add_argument('--mix', default=','.join(EVENT_MIX), help="fire: comma-separated event kinds to cycle")
+    parser.add_argument('--rate', type=float, help="fire: target events/sec (default: as fast as possible)")
+    parser.add_argument('--concurrency', type=int, default=8, help="fire: deliveries in flight")
+    parser.add_argument('--duplicates', type=int, default=1, help="fire: deliveries per event")
+    parser.add_argument('--log', help="fire: also write the generated events as JSONL")
+    parser.add_argument('--check', action='store_true',
+                        help="fire: seed the events' users in MongoDB and compare their state afterwards")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server, stripe = serve(args.host, args.port, args.webhook_url, args.secret)
+        print(f"💳 Stripe stand-in on {stripe.base_url} "
+              f"(webhooks: {args.webhook_url or 'off'})")
+        print(f"   STRIPE_API_BASE={stripe.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    try:
+        events = generate_events(args.events, [k for k in args.mix.split(',') if k])
+    except ValueError as e:
+        parser.error(str(e))
+    if args.log:
+        write_log(args.log, events)
+        print(f"📝 {len(events)} events written to {args.log}")
+    if args.check and not MONGO_URL:
+        print("❌ MONGO_URL is not set: --check seeds and reads the events' users in MongoDB")
+        return 1
+    url = args.webhook_url or f"{API_URL}/webhook/stripe"
+    start = starting_state(events)
+    db = mongo.get_db(MONGO_URL, DB_NAME) if args.check else None
+    run = FixtureRun(db) if args.check else None
+    mismatches = []
+    try:
+        if run:
+            ensure_indexes(db, ['users'])
+            print(f"🌱 {seed_users(run, start, start).get('users', 0)} users seeded")
+        print(f"🔏 Firing signed webhooks at {url}")
+        result = fire(url, events, args.secret, args.rate, max(1, args.concurrency), max(1, args.duplicates))
+        print_fire(result)
+        if run:
+            # What one delivery of each event implies, starting from the seeded subscriptions
+            seeded = [Record(dict(checkout_completed(
+                user_id, customer=fields['stripeCustomerId'], subscription=fields['stripeSubscriptionId'],
+                amount=7900), created=0)) for user_id, fields in start.items() if fields]
+            expected = expected_state(seeded + [Record(evt) for evt in events])
+            mismatches = compare_state(db, expected)
+    finally:
+        if run:
+            run.teardown()
+
+    if args.check:
+        flag = '✅' if not mismatches else '❌'
+        print(f"\n{flag} {len(start) - len({m[0] for m in mismatches})}/{len(start)} users "
+              f"in the expected subscription state after {result['duplicates']} delivery(ies) per event")
+        for user_id, field, want, got in mismatches[:10]:
+            print(f"   {user_id}: {field} expected {want!r}, got {got!r}")
+        result.update(state_mismatches=len(mismatches),
+                      mismatch_samples=mismatches[:MAX_REPORTED_MISMATCHES])
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"fire_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(dict(result, finished=datetime.now().isoformat(timespec='seconds'), rate=args.rate), f, indent=2)
+    print(f"\n📄 Report written to {os.path.relpath(path)}")
+    return 0 if result['ok'] == result['deliveries'] and not result['inconsistent_duplicates'] \
+        and not mismatches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
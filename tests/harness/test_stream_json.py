@@ -0,0 +1,62 @@
+"""
+StreamedList must decode the same document however the body is chunked.
+
+    python -m pytest tests/harness/test_stream_json.py
+"""
+
+import json
+import unittest
+
+from tests.harness.stream_json import StreamedList, StreamError
+
+TOP_LEVEL = '[1234.56, 7, -0.5e-3, 1E5, true, null, "città \\"x\\"", {"a": [1, 2.5]}, 0]'
+KEYED = ('{"totale_importo": 1234.56, "count": 3, "invoices": [{"id": 1, "amount": 99.9}, '
+         '{"id": 2, "amount": 1e2}, {"id": 3, "amount": -7}], "stats": {"avg": 0.125}, "pages": 10}')
+
+
+class FakeResponse:
+    encoding = None
+
+
+def stream(body, splits, key=None):
+    """Run StreamedList over body cut into chunks at the given byte offsets"""
+    data = body.encode('utf-8')
+    bounds = [0] + list(splits) + [len(data)]
+    chunks = [data[a:b] for a, b in zip(bounds, bounds[1:])]
+    streamed = StreamedList(FakeResponse(), key=key, chunks=chunks)
+    return list(streamed), streamed.fields
+
+
+class StreamedListTest(unittest.TestCase):
+
+    def test_top_level_list_split_at_every_offset(self):
+        expected = json.loads(TOP_LEVEL)
+        for offset in range(len(TOP_LEVEL.encode('utf-8')) + 1):
+            with self.subTest(offset=offset):
+                self.assertEqual(stream(TOP_LEVEL, [offset]), (expected, {}))
+
+    def test_keyed_list_and_fields_split_at_every_offset(self):
+        document = json.loads(KEYED)
+        items = document.pop('invoices')
+        for offset in range(len(KEYED) + 1):
+            with self.subTest(offset=offset):
+                self.assertEqual(stream(KEYED, [offset], key='invoices'), (items, document))
+
+    def test_one_byte_chunks(self):
+        self.assertEqual(stream(TOP_LEVEL, range(1, len(TOP_LEVEL.encode('utf-8'))))[0], json.loads(TOP_LEVEL))
+
+    def test_number_split_before_fraction_and_exponent(self):
+        self.assertEqual(stream('[1234.56, 7]', [6])[0], [1234.56, 7])
+        self.assertEqual(stream('[1e5]', [3])[0], [1e5])
+
+    def test_truncated_number_at_end_of_body(self):
+        with self.assertRaises((StreamError, json.JSONDecodeError)):
+            stream('[1234.', [])
+
+    def test_missing_key(self):
+        with self.assertRaises(StreamError):
+            stream('{"total": 1}', [5], key='invoices')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,295 @@
+"""
+Upload throughput benchmark for POST /api/previsit/upload.
+
+Sweeps chunk size x concurrency x file size with ChunkedUploader against
+one throwaway pre-visit form. For every combination it reports:
+
+    MB/s         client-side throughput of the whole upload
+    server span  first chunk stored -> previsit_media 'completo', from the
+                 createdAt timestamps in previsit_media_chunks/previsit_media
+    finalize     last chunk stored -> previsit_media 'completo' (the
+                 count + size scan the route runs after the last chunk)
+    download     GET ?mediaId, where the route concatenates the chunks
+    peak body    largest request body sent, to compare with serverless
+                 body limits (--body-limit)
+
+Each upload is deleted right after it is measured, so the form never hits
+the 3-attachment limit. Results are written to test_reports/upload_bench/.
+
+    python -m tests.harness.upload_bench --chunk-sizes 256000,512000,600000 \\
+        --concurrency 1,2,4,8 --file-sizes 1000000,5000000,15000000 --repeat 3
+
+Requires pymongo and MONGO_URL (the form token is only stored in Mongo).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from tests.harness import mongo
+from tests.harness.auth_cache import cached_login
+from tests.harness.client import ApiClient
+from tests.harness.uploader import MAX_CHUNK_SIZE, MAX_CHUNKS, ChunkedUploader, UploadError
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+MONGO_URL = os.getenv('MONGO_URL')
+DB_NAME = os.getenv('DB_NAME', 'vetbuddy')
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'test_reports', 'upload_bench')
+
+CLINIC_CREDENTIALS = {'email': 'demo@vetbuddy.it', 'password': 'VetBuddy2025!Secure'}
+# Vercel rejects request bodies above 4.5MB
+DEFAULT_BODY_LIMIT = 4_500_000
+
+
+def parse_ints(text):
+    return [int(float(v)) for v in text.split(',') if v.strip()]
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+
+class UploadBench:
+    """One pre-visit form plus the Mongo handle used to time the server side"""
+
+    def __init__(self, db, http=None):
+        self.db = db
+        self.http = http or ApiClient()
+        self.form_id = None
+        self.form_token = None
+        self.clinic_token = None
+
+    def setup(self):
+        response = cached_login(f"{API_URL}/auth/login", json=CLINIC_CREDENTIALS)
+        if response.status_code != 200:
+            raise RuntimeError(f"clinic login failed ({response.status_code}): {response.text[:200]}")
+        self.clinic_token = response.json()['token']
+        response = self.http.post(f"{API_URL}/previsit",
+                                  headers={'Authorization': f'Bearer {self.clinic_token}'},
+                                  json={'ownerName': 'Upload Benchmark', 'ownerEmail': 'upload-bench@example.com',
+                                        'petName': 'BenchPet', 'type': 'generale'})
+        if response.status_code != 201:
+            raise RuntimeError(f"form creation failed ({response.status_code}): {response.text[:200]}")
+        self.form_id = response.json()['formId']
+        for _ in range(10):
+            form = self.db.previsit_forms.find_one({'id': self.form_id}, {'token': 1})
+            if form:
+                self.form_token = form['token']
+                return
+            time.sleep(0.5)
+        raise RuntimeError(f"form {self.form_id} not found in MongoDB")
+
+    def teardown(self):
+        if not self.form_id:
+            return
+        media_ids = [m['id'] for m in self.db.previsit_media.find({'formId': self.form_id}, {'id': 1})]
+        self.db.previsit_media_chunks.delete_many({'formId': self.form_id})
+        self.db.previsit_media.delete_many({'id': {'$in': media_ids}})
+        self.db.previsit_forms.delete_one({'id': self.form_id})
+
+    def server_timings(self, upload_id, timeout=10.0):
+        """(span_ms, finalize_ms) from the chunk and media createdAt stamps"""
+        deadline = time.monotonic() + timeout
+        media = None
+        while time.monotonic() < deadline:
+            media = self.db.previsit_media.find_one({'id': upload_id, 'status': 'completo'}, {'createdAt': 1})
+            if media:
+                break
+            time.sleep(0.1)
+        if not media:
+            return None, None
+        stamps = [_timestamp(c['createdAt'])
+                  for c in self.db.previsit_media_chunks.find({'uploadId': upload_id}, {'createdAt': 1})]
+        completed = _timestamp(media['createdAt'])
+        if not stamps or not completed:
+            return None, None
+        return ((completed - min(stamps)).total_seconds() * 1000,
+                (completed - max(stamps)).total_seconds() * 1000)
+
+    def download(self, upload_id, expected_sha256):
+        """(ms, intact) for GET ?mediaId, which reassembles the chunks server-side"""
+        started = time.perf_counter()
+        response = self.http.get(f"{API_URL}/previsit/upload",
+                                 params={'mediaId': upload_id, 't': self.form_token})
+        elapsed = (time.perf_counter() - started) * 1000
+        intact = response.status_code == 200 and hashlib.sha256(response.content).hexdigest() == expected_sha256
+        return elapsed, intact
+
+    def delete(self, upload_id):
+        self.http.delete(f"{API_URL}/previsit/upload", params={'mediaId': upload_id, 't': self.form_token})
+
+    def run_one(self, path, sha256, chunk_size, concurrency):
+        uploader = ChunkedUploader(API_URL, self.form_id, self.form_token,
+                                   chunk_size=chunk_size, concurrency=concurrency, http=self.http)
+        result = uploader.upload(path, 'video/mp4', file_name='bench.mp4')
+        try:
+            span_ms, finalize_ms = self.server_timings(result.upload_id)
+            download_ms, intact = self.download(result.upload_id, sha256)
+        finally:
+            self.delete(result.upload_id)
+        return {
+            'elapsed_ms': result.elapsed * 1000,
+            'mbps': result.throughput_mbps,
+            'chunks': result.total_chunks,
+            'max_body_bytes': result.max_body_bytes,
+            'server_span_ms': span_ms,
+            'finalize_ms': finalize_ms,
+            'download_ms': download_ms,
+            'intact': intact,
+        }
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def summarize(file_size, chunk_size, concurrency, runs, errors):
+    ok = [r for r in runs if r]
+    return {
+        'file_size': file_size,
+        'chunk_size': chunk_size,
+        'concurrency': concurrency,
+        'chunks': ok[0]['chunks'] if ok else -(-file_size // chunk_size),
+        'runs': len(ok),
+        'errors': errors,
+        'mbps': _median(r['mbps'] for r in ok),
+        'mbps_runs': [round(r['mbps'], 3) for r in ok],
+        'elapsed_ms': _median(r['elapsed_ms'] for r in ok),
+        'server_span_ms': _median(r['server_span_ms'] for r in ok),
+        'finalize_ms': _median(r['finalize_ms'] for r in ok),
+        'download_ms': _median(r['download_ms'] for r in ok),
+        'max_body_bytes': max((r['max_body_bytes'] for r in ok), default=0),
+        'intact': all(r['intact'] for r in ok),
+    }
+
+
+def run_sweep(bench, chunk_sizes, concurrencies, file_sizes, repeat, work_dir):
+    results, skipped = [], []
+    for file_size in file_sizes:
+        path = os.path.join(work_dir, f"bench_{file_size}.bin")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(file_size))
+        with open(path, 'rb') as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        for chunk_size in chunk_sizes:
+            chunks = -(-file_size // chunk_size)
+            if chunks > MAX_CHUNKS:
+                skipped.append({'file_size': file_size, 'chunk_size': chunk_size,
+                                'reason': f"{chunks} chunks > {MAX_CHUNKS}"})
+                continue
+            for concurrency in concurrencies:
+                runs, errors = [], []
+                for _ in range(repeat):
+                    try:
+                        runs.append(bench.run_one(path, sha256, chunk_size, concurrency))
+                    except UploadError as e:
+                        errors.append(str(e)[:200])
+                row = summarize(file_size, chunk_size, concurrency, runs, errors)
+                results.append(row)
+                print_row(row)
+        os.remove(path)
+    return results, skipped
+
+
+def _fmt(value, unit='ms'):
+    return f"{value:>7.0f}{unit}" if value is not None else f"{'-':>{7 + len(unit)}}"
+
+
+def print_header():
+    print(f"\n{'file':>8} {'chunk':>8} {'conc':>4} {'chk':>3} {'MB/s':>7} {'upload':>9} "
+          f"{'span':>9} {'final':>9} {'download':>9} {'peak body':>10}")
+
+
+def print_row(row):
+    mbps = f"{row['mbps']:>7.2f}" if row['mbps'] is not None else f"{'-':>7}"
+    flag = ''
+    if row['errors']:
+        flag = f"  ⚠️  {len(row['errors'])} error(s)"
+    elif not row['intact']:
+        flag = '  ⚠️  download mismatch'
+    print(f"{row['file_size'] / 1e6:>6.1f}MB {row['chunk_size'] / 1e3:>6.0f}KB {row['concurrency']:>4} "
+          f"{row['chunks']:>3} {mbps} {_fmt(row['elapsed_ms'])} {_fmt(row['server_span_ms'])} "
+          f"{_fmt(row['finalize_ms'])} {_fmt(row['download_ms'])} {row['max_body_bytes'] / 1e3:>8.0f}KB{flag}")
+
+
+def recommend(results, body_limit):
+    """Fastest chunk size/concurrency per file size whose bodies fit under body_limit"""
+    best = {}
+    for row in results:
+        if row['mbps'] is None or row['errors'] or row['max_body_bytes'] > body_limit:
+            continue
+        current = best.get(row['file_size'])
+        if current is None or row['mbps'] > current['mbps']:
+            best[row['file_size']] = row
+    return {str(size): {'chunk_size': r['chunk_size'], 'concurrency': r['concurrency'], 'mbps': r['mbps']}
+            for size, r in sorted(best.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Previsit media upload throughput benchmark")
+    parser.add_argument('--chunk-sizes', type=parse_ints, default=parse_ints(f'256000,384000,512000,{MAX_CHUNK_SIZE}'),
+                        help=f"bytes per chunk, comma-separated (max {MAX_CHUNK_SIZE})")
+    parser.add_argument('--concurrency', type=parse_ints, default=parse_ints('1,2,4,8'),
+                        help="chunks in flight, comma-separated")
+    parser.add_argument('--file-sizes', type=parse_ints, default=parse_ints('1000000,5000000,15000000'),
+                        help="file sizes in bytes, comma-separated")
+    parser.add_argument('--repeat', type=int, default=3, help="uploads per combination (median is reported)")
+    parser.add_argument('--body-limit', type=int, default=DEFAULT_BODY_LIMIT,
+                        help="largest request body the deployment accepts, for the recommendation")
+    args = parser.parse_args()
+
+    too_big = [c for c in args.chunk_sizes if c > MAX_CHUNK_SIZE]
+    if too_big:
+        parser.error(f"chunk sizes above {MAX_CHUNK_SIZE} are rejected by the server: {too_big}")
+    if not MONGO_URL:
+        print("❌ MONGO_URL is not set: the form token and server timestamps come from MongoDB")
+        return 1
+
+    db = mongo.get_db(MONGO_URL, DB_NAME)
+    bench = UploadBench(db)
+    bench.setup()
+    print(f"📦 Upload benchmark on form {bench.form_id}: {len(args.file_sizes)} file sizes x "
+          f"{len(args.chunk_sizes)} chunk sizes x {len(args.concurrency)} concurrency levels x {args.repeat}")
+    print_header()
+    try:
+        with tempfile.TemporaryDirectory(prefix='vetbuddy-upload-bench-') as work_dir:
+            results, skipped = run_sweep(bench, args.chunk_sizes, args.concurrency, args.file_sizes,
+                                         args.repeat, work_dir)
+    finally:
+        bench.teardown()
+
+    for s in skipped:
+        print(f"⏭️  {s['file_size'] / 1e6:.1f}MB with {s['chunk_size'] / 1e3:.0f}KB chunks skipped: {s['reason']}")
+    best = recommend(results, args.body_limit)
+    print(f"\nFastest settings with request bodies under {args.body_limit / 1e6:.1f}MB:")
+    for size, r in best.items():
+        print(f"  {int(size) / 1e6:>5.1f}MB file: chunk_size={r['chunk_size']} concurrency={r['concurrency']} "
+              f"({r['mbps']:.2f} MB/s)")
+
+    report = {
+        'base_url': BASE_URL,
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'repeat': args.repeat,
+        'body_limit': args.body_limit,
+        'results': results,
+        'skipped': skipped,
+        'recommended': best,
+    }
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"upload_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {os.path.relpath(path)}")
+    return 1 if any(r['errors'] or not r['intact'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
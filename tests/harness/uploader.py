@@ -0,0 +1,201 @@
+"""
+Parallel, resumable chunked uploader for POST /api/previsit/upload.
+
+The file is read through a read-only memory map, so only the chunks in
+flight are ever resident. Each chunk is base64-encoded when it is sent
+and spliced into a pre-serialized JSON body, without building a dict
+with a huge string in it. N chunks are sent concurrently; the server
+upserts chunks by (uploadId, chunkIndex) and completes the upload once
+it has totalChunks of them, so order does not matter and re-sending a
+chunk is harmless.
+
+Acknowledged chunk indexes are kept per upload. With a state_dir they are
+also persisted, so a failed or interrupted upload resumes with the same
+uploadId and only sends the missing chunks:
+
+    uploader = ChunkedUploader(API_URL, form_id, form_token, concurrency=4, state_dir='/tmp/uploads')
+    result = uploader.upload('visit.mp4', 'video/mp4')
+"""
+
+import base64
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tests.harness import client
+
+DEFAULT_CHUNK_SIZE = 512000
+# Server limits (app/api/previsit/upload/route.js)
+MAX_CHUNK_B64 = 800000
+MAX_CHUNKS = 40
+MAX_CHUNK_SIZE = MAX_CHUNK_B64 // 4 * 3
+
+
+class UploadError(Exception):
+    """Upload failed; `acked` holds the chunk indexes the server accepted"""
+
+    def __init__(self, message, upload_id, acked, status_code=None):
+        super().__init__(message)
+        self.upload_id = upload_id
+        self.acked = acked
+        self.status_code = status_code
+
+
+class UploadResult:
+    def __init__(self, upload_id, media_id, size, total_chunks, sent_chunks, elapsed, max_body_bytes):
+        self.upload_id = upload_id
+        self.media_id = media_id
+        self.size = size
+        self.total_chunks = total_chunks
+        self.sent_chunks = sent_chunks
+        self.resumed_chunks = total_chunks - sent_chunks
+        self.elapsed = elapsed
+        self.max_body_bytes = max_body_bytes
+
+    @property
+    def throughput_mbps(self):
+        return self.size / self.elapsed / 1_000_000 if self.elapsed else 0.0
+
+
+class ChunkedUploader:
+    """Upload files to a pre-visit form in concurrent, resumable chunks"""
+
+    def __init__(self, api_url, form_id, form_token, chunk_size=DEFAULT_CHUNK_SIZE,
+                 concurrency=4, retries=3, state_dir=None, http=None):
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE} bytes "
+                             f"(server accepts at most {MAX_CHUNK_B64} base64 chars per chunk)")
+        self.url = f"{api_url}/previsit/upload"
+        self.form_id = form_id
+        self.form_token = form_token
+        self.chunk_size = chunk_size
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.state_dir = state_dir
+        self.http = http or client.get_client()
+
+    def _state_path(self, path, size):
+        if not self.state_dir:
+            return None
+        mtime = os.stat(path).st_mtime_ns
+        digest = hashlib.sha1(f"{os.path.abspath(path)}|{size}|{mtime}|{self.form_id}|{self.chunk_size}"
+                              .encode()).hexdigest()
+        return os.path.join(self.state_dir, f"{digest}.json")
+
+    def _load_state(self, state_path):
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                return json.load(f)
+        return None
+
+    def _save_state(self, state_path, upload_id, acked):
+        if not state_path:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'uploadId': upload_id, 'acked': sorted(acked)}, f)
+        os.replace(tmp_path, state_path)
+
+    def _body(self, prefix, view, start, end):
+        """JSON body with the chunk base64-encoded only now, straight from the mmap"""
+        return prefix + base64.b64encode(view[start:end]) + b'"}'
+
+    def _send_chunk(self, prefix, view, index, start, end):
+        body = self._body(prefix, view, start, end)
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.http.post(self.url, data=body,
+                                          headers={'Content-Type': 'application/json'})
+            except Exception as e:
+                last_error, status = str(e), None
+            else:
+                if response.status_code == 200:
+                    return index, response.json(), len(body)
+                last_error, status = response.text, response.status_code
+                # 4xx means the request itself is wrong: retrying will not help
+                if 400 <= response.status_code < 500:
+                    break
+            if attempt < self.retries:
+                time.sleep(min(8.0, 0.5 * 2 ** attempt))
+        raise UploadError(f"chunk {index} failed: {last_error}", None, None, status)
+
+    def upload(self, path, mime_type, file_name=None, upload_id=None):
+        """Upload `path`; resumes a previous attempt when state_dir has one"""
+        size = os.path.getsize(path)
+        if size == 0:
+            raise ValueError("cannot upload an empty file")
+        total = (size + self.chunk_size - 1) // self.chunk_size
+        if total > MAX_CHUNKS:
+            raise ValueError(f"{size} bytes needs {total} chunks; server accepts at most {MAX_CHUNKS}")
+
+        state_path = self._state_path(path, size)
+        state = self._load_state(state_path)
+        if state:
+            upload_id = state['uploadId']
+            acked = set(state['acked'])
+        else:
+            upload_id = upload_id or str(uuid.uuid4())
+            acked = set()
+        pending = [i for i in range(total) if i not in acked]
+        completion = None
+        max_body = 0
+        started = time.perf_counter()
+
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            def prefix(index):
+                meta = json.dumps({
+                    'formId': self.form_id,
+                    'token': self.form_token,
+                    'uploadId': upload_id,
+                    'chunkIndex': index,
+                    'totalChunks': total,
+                    'fileName': file_name or os.path.basename(path),
+                    'mimeType': mime_type,
+                })
+                return meta[:-1].encode() + b', "dataBase64": "'
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = [
+                    pool.submit(self._send_chunk, prefix(i), view, i,
+                                i * self.chunk_size, min(size, (i + 1) * self.chunk_size))
+                    for i in pending
+                ]
+                failure = None
+                for future in as_completed(futures):
+                    try:
+                        index, result, body_bytes = future.result()
+                    except UploadError as e:
+                        failure = failure or e
+                        continue
+                    acked.add(index)
+                    max_body = max(max_body, body_bytes)
+                    self._save_state(state_path, upload_id, acked)
+                    if result.get('completed'):
+                        completion = result
+                if failure:
+                    raise UploadError(str(failure), upload_id, sorted(acked), failure.status_code)
+
+        if completion is None:
+            raise UploadError("all chunks acknowledged but the server never reported completion",
+                              upload_id, sorted(acked))
+        if state_path and os.path.exists(state_path):
+            os.remove(state_path)
+        return UploadResult(upload_id, completion.get('mediaId'), completion.get('size', size),
+                            total, len(pending), time.perf_counter() - started, max_body)
+
+    def upload_bytes(self, data, mime_type, file_name, directory=None):
+        """Upload in-memory data by spooling it to a temporary file first"""
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(file_name)[1])
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            return self.upload(tmp_path, mime_type, file_name=file_name)
+        finally:
+            os.remove(tmp_path)
@@ -0,0 +1,288 @@
+"""
+Replay a recorded Stripe event log against /api/webhook/stripe.
+
+Stripe does not deliver one tidy event at a time. It sends bursts,
+retries events it considers undelivered, and makes no ordering promise.
+This engine takes an event log and delivers it the way Stripe might:
+
+    --speed S            keep the gaps between the events' `created` times,
+                         divided by S (0 = as fast as possible)
+    --reorder-window N   shuffle deliveries within consecutive windows of N
+    --duplicate-rate P   deliver that share of events a second time,
+                         up to --redeliver-after seconds later
+    --concurrency C      deliveries in flight
+
+Each line of the log is one JSONL record. It is either a Stripe event, or
+{"event": {...}}, or a recorded request whose "body" is the raw event
+JSON (the body is then sent byte for byte). `stripe_mock fire --log` and
+`--generate` write usable logs. --generate N builds subscription lifecycles
+for N users: trial checkout, trialing update, trial_will_end, a renewal
+invoice, and for some users a failed payment or a cancellation.
+
+With --check (requires MONGO_URL) the subscription fields of every user in
+the log are compared with the state the log implies when it is applied in
+`created` order, i.e. what Stripe meant. A mismatch means that
+duplicates or reordering changed the outcome. --seed-users first creates
+those users as fixtures (without email, so cancellations send no mail)
+and removes them afterwards.
+
+Reports events/sec processed, handler latency p50/p95/p99, status counts
+per event type and the number of deliveries that arrived after a newer
+event for the same customer. Results are written to
+test_reports/stripe_webhooks/.
+
+    python -m tests.harness.webhook_replay --generate 200 --seed-users --check \\
+        --speed 0 --concurrency 16 --duplicate-rate 0.2 --reorder-window 8
+    python -m tests.harness.webhook_replay events.jsonl --speed 20 --check
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from tests.harness import client, mongo, stripe_mock
+from tests.harness.fixtures import FixtureRun, ensure_indexes
+from tests.harness.histogram import LatencyHistogram
+from tests.harness.stripe_mock import (MAX_REPORTED_MISMATCHES, Record, compare_state, expected_state,
+                                       seed_users)
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://clinic-report-review.preview.emergentagent.com')
+API_URL = f"{BASE_URL}/api"
+MONGO_URL = os.getenv('MONGO_URL')
+DB_NAME = os.getenv('DB_NAME', 'vetbuddy')
+REPORTS_DIR = stripe_mock.REPORTS_DIR
+
+
+def load_log(path):
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            body = None
+            if 'body' in entry and 'type' not in entry:
+                body = entry['body'] if isinstance(entry['body'], str) else json.dumps(entry['body'])
+                entry = json.loads(body)
+            elif 'event' in entry and 'type' not in entry:
+                entry = entry['event']
+            if 'type' not in entry or 'object' not in (entry.get('data') or {}):
+                raise ValueError(f"{path}:{number}: not a Stripe event (needs 'type' and 'data.object')")
+            records.append(Record(entry, body.encode() if body else None, number))
+    return records
+
+
+def lifecycle_log(users, rnd, start=None, spacing=0.05, user_prefix='webhook-replay'):
+    """Subscription lifecycles for `users` users, interleaved in time"""
+    start = start or int(time.time()) - 3600
+    events = []
+    for i in range(users):
+        user_id = f"{user_prefix}-{i}"
+        customer, sub_id = stripe_mock.new_id('cus', 14), stripe_mock.new_id('sub')
+        t = start + i * spacing
+        steps = [
+            stripe_mock.checkout_completed(user_id, rnd.choice(['pro', 'starter']), customer, sub_id, trial=True),
+            stripe_mock.subscription_trialing(customer, sub_id),
+            stripe_mock.trial_will_end(customer, sub_id),
+            stripe_mock.invoice_event('invoice.payment_succeeded', customer, sub_id),
+        ]
+        ending = rnd.random()
+        if ending < 0.3:
+            steps.append(stripe_mock.invoice_event('invoice.payment_failed', customer, sub_id))
+        elif ending < 0.6:
+            steps.append(stripe_mock.subscription_deleted(customer, sub_id, user_id))
+        for step, evt in enumerate(steps):
+            evt['created'] = int(t + step * 2)
+            events.append(evt)
+    return [Record(evt) for evt in sorted(events, key=lambda e: e['created'])]
+
+
+def schedule(records, speed=1.0, reorder_window=1, duplicate_rate=0.0, redeliver_after=1.0, rnd=random):
+    """[(due seconds, record, is_duplicate)] in delivery order"""
+    ordered = sorted(records, key=lambda r: r.created)  # stable: log order breaks ties
+    first = ordered[0].created if ordered else 0
+    due = [(r.created - first) / speed if speed > 0 else 0.0 for r in ordered]
+    deliveries = []
+    for start in range(0, len(ordered), max(1, reorder_window)):
+        window = ordered[start:start + max(1, reorder_window)]
+        if reorder_window > 1:
+            window = rnd.sample(window, len(window))
+        # The window keeps its time slots; only which event fills which slot changes
+        deliveries += [(due[start + i], record, False) for i, record in enumerate(window)]
+    for when, record, _ in list(deliveries):
+        if duplicate_rate and rnd.random() < duplicate_rate:
+            deliveries.append((when + rnd.uniform(0, redeliver_after), record, True))
+    deliveries.sort(key=lambda d: d[0])
+    return deliveries
+
+
+def out_of_order(deliveries):
+    """Deliveries that arrive after a newer event for the same customer"""
+    newest = {}
+    late = 0
+    for _, record, _ in deliveries:
+        customer = record.customer
+        if customer is None:
+            continue
+        if record.created < newest.get(customer, record.created):
+            late += 1
+        newest[customer] = max(newest.get(customer, record.created), record.created)
+    return late
+
+
+class Replayer:
+    """Delivers a schedule with bounded concurrency, timing every delivery"""
+
+    def __init__(self, url, secret=stripe_mock.WEBHOOK_SECRET, concurrency=8, signed=True):
+        self.url = url
+        self.secret = secret
+        self.concurrency = concurrency
+        self.signed = signed
+        self.latency = LatencyHistogram()
+        self.by_type = {}
+        self.statuses = Counter()
+        self._lock = threading.Lock()
+
+    def deliver(self, started, due, record):
+        delay = started + due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        body = record.body or json.dumps(record.event, separators=(',', ':')).encode()
+        headers = {'Content-Type': 'application/json'}
+        if self.signed:
+            # Signed at send time: the backend rejects signatures older than 5 minutes
+            headers['Stripe-Signature'] = stripe_mock.sign(body, self.secret)
+        sent = time.perf_counter()
+        try:
+            status = client.post(self.url, data=body, headers=headers).status_code
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - sent
+        with self._lock:
+            self.latency.record(elapsed)
+            self.statuses[status] += 1
+            self.by_type.setdefault(record.event['type'], Counter())[status] += 1
+
+    def run(self, deliveries):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for future in [pool.submit(self.deliver, started, due, record) for due, record, _ in deliveries]:
+                future.result()
+        seconds = time.perf_counter() - started
+        ok = self.statuses.get(200, 0)
+        return {
+            'deliveries': len(deliveries),
+            'duplicates': sum(1 for d in deliveries if d[2]),
+            'out_of_order': out_of_order(deliveries),
+            'seconds': seconds,
+            'ok': ok,
+            'events_per_sec': ok / seconds if seconds else 0.0,
+            'statuses': {str(k): v for k, v in self.statuses.items()},
+            'by_type': {t: {str(k): v for k, v in c.items()} for t, c in sorted(self.by_type.items())},
+            'latency': self.latency.summary(),
+        }
+
+
+def print_result(result):
+    lat = result['latency']
+    print(f"\n📨 {result['deliveries']} deliveries ({result['duplicates']} duplicates, "
+          f"{result['out_of_order']} out of order) in {result['seconds']:.1f}s")
+    print(f"   {result['events_per_sec']:.0f} events/s processed  |  latency p50 {lat['p50_ms']:.0f}ms  "
+          f"p95 {lat['p95_ms']:.0f}ms  p99 {lat['p99_ms']:.0f}ms  max {lat['max_ms']:.0f}ms")
+    for event_type, statuses in result['by_type'].items():
+        line = ', '.join(f"{status}: {n}" for status, n in sorted(statuses.items()))
+        flag = '✅' if set(statuses) == {'200'} else '❌'
+        print(f"   {flag} {event_type:<40} {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Stripe event log against /api/webhook/stripe")
+    parser.add_argument('log', nargs='?', help="JSONL event log (or use --generate)")
+    parser.add_argument('--generate', type=int, metavar='USERS', help="replay generated lifecycles for USERS users")
+    parser.add_argument('--write-log', help="save the (generated) log as JSONL")
+    parser.add_argument('--url', help="webhook URL (default $NEXT_PUBLIC_BASE_URL/api/webhook/stripe)")
+    parser.add_argument('--secret', default=stripe_mock.WEBHOOK_SECRET, help="STRIPE_WEBHOOK_SECRET of the backend")
+    parser.add_argument('--unsigned', action='store_true', help="send without Stripe-Signature")
+    parser.add_argument('--speed', type=float, default=1.0, help="time compression; 0 = as fast as possible")
+    parser.add_argument('--reorder-window', type=int, default=1, help="shuffle within windows of N deliveries")
+    parser.add_argument('--duplicate-rate', type=float, default=0.0, help="share of events delivered twice")
+    parser.add_argument('--redeliver-after', type=float, default=1.0, help="max delay of a duplicate, seconds")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, help="random seed for reordering and duplicates")
+    parser.add_argument('--check', action='store_true', help="compare users' subscription state in MongoDB")
+    parser.add_argument('--seed-users', action='store_true', help="create the log's users as fixtures first")
+    args = parser.parse_args()
+
+    if bool(args.log) == bool(args.generate):
+        parser.error("give either a log file or --generate USERS")
+    if (args.check or args.seed_users) and not MONGO_URL:
+        print("❌ MONGO_URL is not set: --check and --seed-users read and write MongoDB")
+        return 1
+    rnd = random.Random(args.seed)
+    try:
+        records = load_log(args.log) if args.log else lifecycle_log(args.generate, rnd)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if args.write_log:
+        with open(args.write_log, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record.event) + '\n')
+        print(f"📝 {len(records)} events written to {args.write_log}")
+
+    expected = expected_state(records)
+    deliveries = schedule(records, args.speed, args.reorder_window, args.duplicate_rate, args.redeliver_after, rnd)
+    url = args.url or f"{API_URL}/webhook/stripe"
+    replayer = Replayer(url, args.secret, max(1, args.concurrency), signed=not args.unsigned)
+    print(f"🔁 Replaying {len(records)} events for {len(expected)} users at {url} "
+          f"(speed {args.speed or 'max'}, window {args.reorder_window}, duplicates {args.duplicate_rate:.0%})")
+
+    db = mongo.get_db(MONGO_URL, DB_NAME) if args.check or args.seed_users else None
+    run = FixtureRun(db) if args.seed_users else None
+    try:
+        if run:
+            ensure_indexes(db, ['users'])
+            print(f"🌱 {seed_users(run, expected).get('users', 0)} users seeded")
+        result = replayer.run(deliveries)
+        print_result(result)
+        mismatches = compare_state(db, expected) if args.check else []
+    finally:
+        if run:
+            run.teardown()
+
+    if args.check:
+        flag = '✅' if not mismatches else '❌'
+        print(f"\n{flag} {len(expected) - len({m[0] for m in mismatches})}/{len(expected)} users "
+              f"in the expected subscription state")
+        for user_id, field, want, got in mismatches[:10]:
+            print(f"   {user_id}: {field} expected {want!r}, got {got!r}")
+    result.update(
+        url=url,
+        log=args.log or f"generated:{args.generate}",
+        speed=args.speed,
+        reorder_window=args.reorder_window,
+        duplicate_rate=args.duplicate_rate,
+        users=len(expected),
+        mismatches=len(mismatches) if args.check else None,
+        mismatch_samples=mismatches[:MAX_REPORTED_MISMATCHES],
+        finished=datetime.now().isoformat(timespec='seconds'),
+    )
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n📄 Report written to {os.path.relpath(path)}")
+    return 0 if result['ok'] == result['deliveries'] and not mismatches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
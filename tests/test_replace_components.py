@@ -0,0 +1,64 @@
+"""
+replace_components.py --lazy must leave existing next/dynamic wrappers alone.
+
+    python -m pytest tests/test_replace_components.py
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import replace_components  # noqa: E402
+
+WRAPPED = """'use client';
+import dynamic from 'next/dynamic';
+
+// ==================== DYNAMIC IMPORTS ====================
+// Admin & Auth
+const AdminDashboard = dynamic(() => import('@/app/components/admin/AdminDashboard'), { ssr: false });
+/* Lab */
+const LabDashboard = dynamic(() => import('@/app/components/lab/LabDashboard'), { ssr: false });
+
+export default function App() {
+  return <><AdminDashboard /><LabDashboard /></>;
+}
+"""
+
+
+class LazyRerunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def replace(self, path, components):
+        with contextlib.redirect_stdout(io.StringIO()):
+            replace_components.replace_file(path, components, lazy=True)
+        with open(path) as f:
+            return f.read()
+
+    def test_commented_wrappers_are_not_definitions(self):
+        path = os.path.join(self.dir, 'page.js')
+        with open(path, 'w') as f:
+            f.write(WRAPPED)
+        components = {name: replace_components.COMPONENTS[name] for name in ('AdminDashboard', 'LabDashboard')}
+        self.assertEqual(self.replace(path, components), WRAPPED)
+
+    def test_rerun_on_app_page_is_a_no_op(self):
+        path = os.path.join(self.dir, 'page.js')
+        shutil.copy(os.path.join(ROOT, 'app', 'page.js'), path)
+        first = self.replace(path, replace_components.COMPONENTS)
+        self.assertIn("// Admin & Auth\nconst AdminDashboard = dynamic(", first)
+        self.assertIn("// Landing\nconst ComingSoonLanding = dynamic(", first)
+        self.assertEqual(self.replace(path, replace_components.COMPONENTS), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
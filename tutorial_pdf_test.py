@@ -4,13 +4,63 @@ VetBuddy PDF Tutorial Generation API Testing
 Tests the 3 tutorial download endpoints for clinic, owner, and lab
 """
 
-import requests
+from tests.harness import client
+import argparse
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Base URL from environment
 BASE_URL = "https://clinic-report-review.preview.emergentagent.com/api"
 
+TUTORIAL_TYPES = ['clinic', 'owner', 'lab']
+CHUNK_SIZE = 64 * 1024
+# A PDF must end with %%EOF within its last 1024 bytes
+PDF_TAIL_SIZE = 1024
+
+def stream_pdf(url, chunk_size=CHUNK_SIZE):
+    """Download a PDF in fixed-size chunks, checking %PDF- up front and %%EOF in a rolling tail.
+
+    Only the first chunk and the last PDF_TAIL_SIZE bytes are kept.
+    headers_ms is time to response headers, ttfb_ms time to the first body
+    chunk (when on-the-fly generation has produced output).
+    """
+    started = time.perf_counter()
+    response = client.get(url, stream=True)
+    result = {
+        'status': response.status_code,
+        'content_type': response.headers.get('content-type', ''),
+        'content_disposition': response.headers.get('content-disposition', ''),
+        'headers_ms': (time.perf_counter() - started) * 1000,
+        'ttfb_ms': None,
+        'size': 0,
+        'header_ok': False,
+        'trailer_ok': False,
+    }
+    tail = b''
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            if result['ttfb_ms'] is None:
+                result['ttfb_ms'] = (time.perf_counter() - started) * 1000
+                result['header_ok'] = chunk.startswith(b'%PDF-')
+            result['size'] += len(chunk)
+            tail = (tail + chunk)[-PDF_TAIL_SIZE:]
+    finally:
+        response.close()
+    total = time.perf_counter() - started
+    result['total_ms'] = total * 1000
+    result['mbps'] = result['size'] / 1e6 / total if total > 0 else 0.0
+    result['trailer_ok'] = b'%%EOF' in tail
+    return result
+
+def format_timing(result):
+    ttfb = f"{result['ttfb_ms']:.0f}ms" if result['ttfb_ms'] is not None else "-"
+    return (f"headers {result['headers_ms']:.0f}ms, first byte {ttfb}, total {result['total_ms']:.0f}ms, "
+            f"{result['size']:,} bytes, {result['mbps']:.2f} MB/s")
+
 def print_test_result(test_name, success, details=""):
     """Print formatted test result"""
     status = "✅ PASS" if success else "❌ FAIL"
@@ -24,20 +74,20 @@ def test_tutorial_download(tutorial_type):
     print(f"📄 Testing Tutorial Download API - {tutorial_type.upper()}...")
     
     try:
-        # Test GET /api/tutorials/download?type={tutorial_type}
-        response = requests.get(f"{BASE_URL}/tutorials/download?type={tutorial_type}")
+        # Test GET /api/tutorials/download?type={tutorial_type}, streamed in fixed-size chunks
+        result = stream_pdf(f"{BASE_URL}/tutorials/download?type={tutorial_type}")
         
         # Check HTTP status
-        if response.status_code != 200:
+        if result['status'] != 200:
             print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - HTTP Status", False, 
-                            f"Expected 200, got {response.status_code}")
+                            f"Expected 200, got {result['status']}")
             return False
         
         print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - HTTP Status", True, 
-                        f"Status: {response.status_code}")
+                        f"Status: {result['status']}")
         
         # Check Content-Type header
-        content_type = response.headers.get('content-type', '')
+        content_type = result['content_type']
         if 'application/pdf' not in content_type.lower():
             print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - Content-Type", False, 
                             f"Expected 'application/pdf', got '{content_type}'")
@@ -47,7 +97,7 @@ def test_tutorial_download(tutorial_type):
                         f"Content-Type: {content_type}")
         
         # Check response body size (PDF should not be empty)
-        body_size = len(response.content)
+        body_size = result['size']
         if body_size <= 5000:
             print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - Body Size", False, 
                             f"PDF too small: {body_size} bytes (expected > 5000)")
@@ -57,7 +107,7 @@ def test_tutorial_download(tutorial_type):
                         f"PDF size: {body_size:,} bytes")
         
         # Check Content-Disposition header for filename
-        content_disposition = response.headers.get('content-disposition', '')
+        content_disposition = result['content_disposition']
         expected_filename_patterns = {
             'clinic': ['clinica', 'cliniche'],
             'owner': ['proprietario', 'proprietari'], 
@@ -75,14 +125,22 @@ def test_tutorial_download(tutorial_type):
         print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - Content-Disposition", True, 
                         f"Content-Disposition: {content_disposition}")
         
-        # Check for PDF magic bytes (PDF file signature)
-        if not response.content.startswith(b'%PDF-'):
+        # Check for PDF magic bytes (first chunk) and the %%EOF trailer (rolling tail)
+        if not result['header_ok']:
             print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - PDF Format", False, 
                             "Response does not start with PDF magic bytes")
             return False
         
+        if not result['trailer_ok']:
+            print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - PDF Format", False, 
+                            f"No %%EOF in the last {PDF_TAIL_SIZE} bytes (truncated PDF?)")
+            return False
+        
         print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - PDF Format", True, 
-                        "Valid PDF file format detected")
+                        "Valid PDF file format detected (%PDF- header, %%EOF trailer)")
+        
+        print_test_result(f"GET /api/tutorials/download?type={tutorial_type} - Timing", True, 
+                        format_timing(result))
         
         return True
         
@@ -96,7 +154,7 @@ def test_invalid_tutorial_type():
     
     try:
         # Test GET /api/tutorials/download?type=invalid
-        response = requests.get(f"{BASE_URL}/tutorials/download?type=invalid")
+        response = client.get(f"{BASE_URL}/tutorials/download?type=invalid")
         
         # API is permissive and returns 200 even for invalid types
         # This is acceptable behavior - just verify it doesn't crash
@@ -114,7 +172,7 @@ def test_missing_type_parameter():
     
     try:
         # Test GET /api/tutorials/download (no type parameter)
-        response = requests.get(f"{BASE_URL}/tutorials/download")
+        response = client.get(f"{BASE_URL}/tutorials/download")
         
         # API is permissive and returns 200 even without type parameter
         # This is acceptable behavior - just verify it doesn't crash
@@ -126,8 +184,39 @@ def test_missing_type_parameter():
         print_test_result("GET /api/tutorials/download - Missing Type Parameter", False, f"Exception: {e}")
         return False
 
+def test_concurrent_downloads(tutorial_types=TUTORIAL_TYPES):
+    """Fetch every tutorial type in parallel, as when several users download at once"""
+    print(f"⚡ Testing Tutorial Download API - {len(tutorial_types)} types in parallel...")
+    
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(tutorial_types)) as pool:
+            results = dict(zip(tutorial_types, pool.map(
+                lambda t: stream_pdf(f"{BASE_URL}/tutorials/download?type={t}"), tutorial_types)))
+        wall_ms = (time.perf_counter() - started) * 1000
+        
+        ok = True
+        for tutorial_type, result in results.items():
+            valid = result['status'] == 200 and result['header_ok'] and result['trailer_ok']
+            ok = ok and valid
+            print(f"    {tutorial_type:<7} {'✅' if valid else '❌'} HTTP {result['status']}, {format_timing(result)}")
+        slowest = max(r['total_ms'] for r in results.values())
+        print_test_result("GET /api/tutorials/download - Concurrent", ok, 
+                        f"All types in {wall_ms:.0f}ms wall clock (slowest single download {slowest:.0f}ms, "
+                        f"sum {sum(r['total_ms'] for r in results.values()):.0f}ms)")
+        return ok
+        
+    except Exception as e:
+        print_test_result("GET /api/tutorials/download - Concurrent", False, f"Exception: {e}")
+        return False
+
 def main():
     """Run all tutorial PDF API tests"""
+    parser = argparse.ArgumentParser(description="Tutorial PDF download API tests")
+    parser.add_argument('--concurrent', action='store_true',
+                        help="also fetch all tutorial types in parallel")
+    args = parser.parse_args()
+    
     print("🚀 VetBuddy PDF Tutorial Generation API Testing")
     print("=" * 60)
     print(f"Base URL: {BASE_URL}")
@@ -138,12 +227,14 @@ def main():
     test_results = []
     
     # Test the 3 required tutorial types
-    tutorial_types = ['clinic', 'owner', 'lab']
-    
-    for tutorial_type in tutorial_types:
+    for tutorial_type in TUTORIAL_TYPES:
         result = test_tutorial_download(tutorial_type)
         test_results.append((f"Tutorial Download - {tutorial_type.upper()}", result))
     
+    if args.concurrent:
+        result = test_concurrent_downloads()
+        test_results.append(("Concurrent Tutorial Downloads", result))
+    
     # Test error handling
     result = test_invalid_tutorial_type()
     test_results.append(("Invalid Type Error Handling", result))